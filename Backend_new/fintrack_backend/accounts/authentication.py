@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.cache import bump_version, get_version
+
+
+def get_auth_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'fintrack:auth-version:{user_id}'
+
+
+def bump_auth_version(user_id):
+    """Drop the cached user so the next request reloads it"""
+    bump_version(get_auth_cache(), _version_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps resolved users in a cache.
+
+    Users are stored under (user id, auth version) for
+    AUTH_USER_CACHE_TIMEOUT seconds. The version is bumped whenever the user
+    row is saved or deleted (see accounts.signals), so profile edits,
+    deactivation and password changes are picked up on the next request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        cache = get_auth_cache()
+        # Read the version before loading, so a concurrent save leaves this copy under a stale key
+        version = get_version(cache, _version_key(user_id))
+        key = f'fintrack:auth-user:{user_id}:{version}'
+
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        # Checks the parent applies to freshly loaded users
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Users whose rows are being removed by a cascade from the user itself
+_deleting_users = ContextVar('deleting_users', default=frozenset())
+
+
+@contextmanager
+def deleting_users(user_ids):
+    """
+    Mark `user_ids` as being deleted inside the block. The mark is cleared
+    however the block exits, including when the cascade raises.
+    """
+    token = _deleting_users.set(_deleting_users.get() | set(user_ids))
+    try:
+        yield
+    finally:
+        _deleting_users.reset(token)
+
+
+def user_being_deleted(user_id):
+    """
+    Whether `user_id` is being deleted in this context, so receivers can
+    skip bookkeeping for rows that the same cascade removes anyway.
+    """
+    return user_id in _deleting_users.get()
@@ -0,0 +1,43 @@
+from argparse import ArgumentTypeError
+
+from django.core.management.base import BaseCommand
+
+from accounts.provisioning import provision_users
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError(f'{value} is not a positive integer')
+    return number
+
+
+class Command(BaseCommand):
+    help = "Create many users (with default categories) in batches, e.g. for load-test seeding"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, required=True,
+                            help='Number of users to create')
+        parser.add_argument('--batch-size', type=positive_int, default=1000,
+                            help='Users per batch')
+        parser.add_argument('--prefix', default='loadtest',
+                            help='Username prefix; users are named <prefix><n>')
+        parser.add_argument('--domain', default='example.com',
+                            help='Email domain')
+        parser.add_argument('--password', default='fintrack-load-test',
+                            help='Password shared by every provisioned user')
+        parser.add_argument('--start', type=int, default=0,
+                            help='First user number, to extend an earlier run')
+
+    def handle(self, *args, **options):
+        users = provision_users(
+            count=options['count'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+            domain=options['domain'],
+            password=options['password'],
+            start=options['start'],
+            log=self.stdout.write
+        )
+        self.stdout.write(self.style.SUCCESS(f'Provisioned {len(users)} users'))
+
@@ -1,8 +1,16 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager, Group, Permission
 
+from .deletion import deleting_users
 
-class MyAccountManager(BaseUserManager):
+
+class UserQuerySet(models.QuerySet):
+    def delete(self):
+        with deleting_users(self.values_list('pk', flat=True)):
+            return super().delete()
+
+
+class MyAccountManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, username, password=None, **extra_fields):
         if not email:
             raise ValueError('Users must have an email address')
@@ -68,6 +76,11 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username}, {self.email}"
 
+    def delete(self, *args, **kwargs):
+        # Receivers skip bookkeeping for the rows this cascade removes
+        with deleting_users({self.pk}):
+            return super().delete(*args, **kwargs)
+
     def has_perms(self, perm_list, obj=None):
         return self.is_superuser
 
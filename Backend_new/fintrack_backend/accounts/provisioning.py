@@ -0,0 +1,51 @@
+"""
+Bulk user provisioning for load tests and benchmarks.
+"""
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from transactions.signals import create_default_categories_for_users
+from .models import User
+
+
+def provision_users(count, batch_size=1000, prefix='loadtest', domain='example.com',
+                    password='fintrack-load-test', start=0, log=None):
+    """
+    Bulk-create users and their default categories.
+
+    bulk_create skips the post_save signal, so categories are provisioned
+    here with one set-based INSERT per batch. Existing usernames are skipped,
+    which makes re-running the same range safe.
+
+    Returns:
+        list: The provisioned users (new and pre-existing) in the range
+    """
+    # Hashing is deliberately slow, so do it once for the whole run
+    password_hash = make_password(password)
+    provisioned = []
+
+    for offset in range(start, start + count, batch_size):
+        numbers = range(offset, min(offset + batch_size, start + count))
+        usernames = [f'{prefix}{number}' for number in numbers]
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=username,
+                        email=f'{username}@{domain}',
+                        password=password_hash
+                    )
+                    for username in usernames
+                ],
+                ignore_conflicts=True
+            )
+            # ignore_conflicts leaves primary keys unset, so read them back
+            users = list(User.objects.filter(username__in=usernames))
+            create_default_categories_for_users(users)
+
+        provisioned.extend(users)
+        if log:
+            log(f'{len(provisioned)}/{count} users')
+
+    return provisioned
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import bump_auth_version
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Signal to drop a user's cached authentication after any change to the row"""
+    bump_auth_version(instance.pk)
+
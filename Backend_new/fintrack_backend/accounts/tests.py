@@ -1,3 +1,75 @@
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
 from django.test import TestCase
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from transactions.models import Category
+from .models import User
+
+
+class RegistrationTests(APITestCase):
+
+    def test_register_creates_default_categories_in_one_insert(self):
+        payload = {'email': 'new@example.com', 'username': 'new', 'password': 'pass12345'}
+
+        # One INSERT for the user, one for all of its categories
+        with self.assertNumQueries(2):
+            response = self.client.post('/api/v1/auth/register/', payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(email='new@example.com')
+        self.assertEqual(Category.objects.filter(user=user).count(), 16)
+
+
+class ProvisionUsersCommandTests(TestCase):
+
+    def test_provisions_users_and_categories_idempotently(self):
+        call_command('provision_users', count=5, batch_size=2, stdout=StringIO())
+        call_command('provision_users', count=6, batch_size=4, stdout=StringIO())
+
+        users = User.objects.filter(username__startswith='loadtest')
+        self.assertEqual(users.count(), 6)
+        self.assertEqual(Category.objects.filter(user__in=users).count(), 6 * 16)
+        self.assertTrue(users.get(username='loadtest3').check_password('fintrack-load-test'))
+
+    def test_rejects_non_positive_batch_size(self):
+        for value in ('0', '-5', 'many'):
+            with self.assertRaises(CommandError):
+                call_command('provision_users', '--count', '1', '--batch-size', value, stdout=StringIO())
+        self.assertFalse(User.objects.filter(username__startswith='loadtest').exists())
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    """Users resolved from JWTs are cached until the user row changes"""
+
+    def setUp(self):
+        caches['auth'].clear()
+        self.user = User.objects.create_user(email='jwt@example.com', username='jwt', password='pass12345')
+        self.admin = User.objects.create_superuser(email='root@example.com', username='root', password='pass12345')
+
+    def authenticate(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_user_lookup_is_cached(self):
+        self.authenticate(self.user)
+        self.client.get('/api/v1/auth/profile/')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/auth/profile/')
+        self.assertEqual(response.data['email'], 'jwt@example.com')
+
+    def test_profile_and_admin_changes_invalidate(self):
+        self.authenticate(self.user)
+        self.client.get('/api/v1/auth/profile/')
+        self.client.patch('/api/v1/auth/profile/', {'first_name': 'Jo'}, format='json')
+        self.assertEqual(self.client.get('/api/v1/auth/profile/').data['first_name'], 'Jo')
+
+        self.authenticate(self.admin)
+        self.client.patch(f'/api/v1/auth/admin/users/{self.user.pk}/', {'is_active': False}, format='json')
 
-# Create your tests here.
+        self.authenticate(self.user)
+        self.assertEqual(self.client.get('/api/v1/auth/profile/').status_code, 401)
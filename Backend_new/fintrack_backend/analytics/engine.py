@@ -0,0 +1,199 @@
+"""
+Vectorized analytics over a user's transactions.
+
+`load_columns` fetches (id, date, amount, type, category) for every
+transaction up to the end of the requested period in one `values_list`
+query and turns them into NumPy arrays. The functions below compute
+daily series, rolling averages, month-over-month changes, cumulative
+balance and per-category anomalies from those arrays with bincount and
+cumsum instead of per-row Python loops. History before the period is
+kept so rolling windows, the opening balance and the category statistics
+have full context.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from transactions.models import Transaction
+
+
+TransactionColumns = namedtuple(
+    'TransactionColumns',
+    ['ids', 'dates', 'amounts', 'is_income', 'category_ids']
+)
+
+# Category id stored for uncategorized transactions
+NO_CATEGORY = -1
+
+ROLLING_WINDOWS = (7, 30)
+
+
+def load_columns(user, end_date=None):
+    """
+    Load a user's transactions dated up to `end_date` as columnar arrays.
+
+    Returns:
+        TransactionColumns: ids, dates (datetime64[D]), amounts (float64),
+        is_income (bool) and category_ids (int64, NO_CATEGORY when unset)
+    """
+    rows = list(
+        Transaction.objects.for_user(user).in_range(end_date=end_date).order_by().values_list(
+            'id', 'date', 'amount', 'type', 'category_id'
+        )
+    )
+    ids, dates, amounts, types, category_ids = zip(*rows) if rows else ((),) * 5
+
+    return TransactionColumns(
+        ids=np.array(ids, dtype=np.int64),
+        dates=np.array(dates, dtype='datetime64[D]'),
+        amounts=np.array(amounts, dtype=np.float64),
+        is_income=np.array(types, dtype=object) == 'income',
+        category_ids=np.array(
+            [NO_CATEGORY if category_id is None else category_id for category_id in category_ids],
+            dtype=np.int64
+        ),
+    )
+
+
+def _signed(columns):
+    return np.where(columns.is_income, columns.amounts, -columns.amounts)
+
+
+def _bucket_sums(index, weights, size, mask):
+    """Sum weights into `size` buckets, ignoring rows outside the mask"""
+    return np.bincount(index[mask], weights=weights[mask], minlength=size)[:size]
+
+
+def daily_totals(columns, start_date, end_date):
+    """
+    Zero-filled daily income and expense totals for [start_date, end_date].
+
+    Returns:
+        tuple: (days as datetime64[D], income, expense)
+    """
+    start = np.datetime64(start_date, 'D')
+    days = np.arange(start, np.datetime64(end_date, 'D') + 1)
+    index = (columns.dates - start).astype(np.int64)
+    in_range = (index >= 0) & (index < len(days))
+
+    income = _bucket_sums(index, columns.amounts, len(days), in_range & columns.is_income)
+    expense = _bucket_sums(index, columns.amounts, len(days), in_range & ~columns.is_income)
+    return days, income, expense
+
+
+def rolling_mean(values, window):
+    """
+    Trailing mean over `window` entries via a cumulative sum.
+    The first entries average over however many values precede them.
+    """
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(0, end - window)
+    return (sums[end] - sums[start]) / (end - start)
+
+
+def daily_series(columns, start_date, end_date, windows=ROLLING_WINDOWS):
+    """
+    Daily income/expense/net with rolling averages and cumulative balance.
+
+    Rolling windows reach back before `start_date`, and the balance starts
+    from the net of everything before it.
+    """
+    lead = max(windows) - 1
+    days, income, expense = daily_totals(
+        columns, np.datetime64(start_date, 'D') - lead, end_date
+    )
+    net = income - expense
+
+    before = columns.dates < np.datetime64(start_date, 'D')
+    opening_balance = _signed(columns)[before].sum()
+    balance = opening_balance + np.cumsum(net[lead:])
+
+    series = {
+        'date': days[lead:],
+        'income': income[lead:],
+        'expense': expense[lead:],
+        'net': net[lead:],
+        'balance': balance,
+    }
+    for window in windows:
+        series[f'expense_avg_{window}d'] = rolling_mean(expense, window)[lead:]
+        series[f'income_avg_{window}d'] = rolling_mean(income, window)[lead:]
+
+    return series
+
+
+def monthly_series(columns, start_date, end_date):
+    """
+    Monthly income/expense/net with month-over-month changes.
+    The month before `start_date` is included so the first change is real.
+    """
+    first = np.datetime64(start_date, 'M') - 1
+    months = np.arange(first, np.datetime64(end_date, 'M') + 1)
+    index = (columns.dates.astype('datetime64[M]') - first).astype(np.int64)
+    in_range = (
+        (index >= 0) & (index < len(months))
+        & (columns.dates <= np.datetime64(end_date, 'D'))
+    )
+
+    income = _bucket_sums(index, columns.amounts, len(months), in_range & columns.is_income)
+    expense = _bucket_sums(index, columns.amounts, len(months), in_range & ~columns.is_income)
+
+    series = {'month': months[1:]}
+    for name, values in (('income', income), ('expense', expense), ('net', income - expense)):
+        change = np.diff(values)
+        previous = values[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = np.where(previous != 0, change / np.abs(previous) * 100, np.nan)
+
+        series[name] = values[1:]
+        series[f'{name}_change'] = change
+        series[f'{name}_change_pct'] = change_pct
+
+    return series
+
+
+def category_anomalies(columns, start_date, end_date, threshold=2.5, min_count=5):
+    """
+    Flag transactions in [start_date, end_date] whose amount is at least
+    `threshold` standard deviations from their category's mean.
+
+    Mean and deviation come from each (category, type) group's full
+    history; groups with fewer than `min_count` transactions or no spread
+    are never flagged.
+
+    Returns:
+        dict: arrays for the flagged transactions, most unusual first
+    """
+    keys = columns.category_ids * 2 + columns.is_income
+    groups, group_index = np.unique(keys, return_inverse=True)
+
+    count = np.bincount(group_index, minlength=len(groups))
+    total = np.bincount(group_index, weights=columns.amounts, minlength=len(groups))
+    squares = np.bincount(group_index, weights=columns.amounts ** 2, minlength=len(groups))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(squares / count - mean ** 2, 0))
+
+        row_std = std[group_index]
+        z_scores = np.where(row_std > 0, (columns.amounts - mean[group_index]) / row_std, 0.0)
+
+    flagged = (
+        (np.abs(z_scores) >= threshold)
+        & (count[group_index] >= min_count)
+        & (columns.dates >= np.datetime64(start_date, 'D'))
+        & (columns.dates <= np.datetime64(end_date, 'D'))
+    )
+
+    order = np.argsort(-np.abs(z_scores[flagged]), kind='stable')
+    return {
+        'id': columns.ids[flagged][order],
+        'date': columns.dates[flagged][order],
+        'category': columns.category_ids[flagged][order],
+        'is_income': columns.is_income[flagged][order],
+        'amount': columns.amounts[flagged][order],
+        'category_mean': mean[group_index][flagged][order],
+        'category_std': row_std[flagged][order],
+        'z_score': z_scores[flagged][order],
+    }
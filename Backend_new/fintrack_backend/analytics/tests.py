@@ -1,3 +1,102 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from transactions.models import Category, Transaction
+from .engine import category_anomalies, daily_series, load_columns, monthly_series, rolling_mean
+
+
+class AnalyticsEngineTests(APITestCase):
+    """The vectorized engine agrees with straightforward per-day arithmetic"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='analytics@example.com', username='analytics', password='pass12345'
+        )
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.get(user=self.user, name='Food & Dining')
+        self.salary = Category.objects.get(user=self.user, name='Salary')
+
+    def create_transaction(self, **kwargs):
+        values = {
+            'user': self.user,
+            'category': self.food,
+            'amount': Decimal('10.00'),
+            'date': date(2025, 1, 10),
+            'merchant': 'Cafe',
+            'type': 'expense',
+        }
+        values.update(kwargs)
+        return Transaction.objects.create(**values)
+
+    def test_rolling_mean(self):
+        self.assertEqual(list(rolling_mean([1.0, 2.0, 3.0, 4.0], 2)), [1.0, 1.5, 2.5, 3.5])
+
+    def test_daily_series(self):
+        self.create_transaction(type='income', category=self.salary, amount=Decimal('100.00'), date=date(2024, 12, 31))
+        self.create_transaction(date=date(2025, 1, 1), amount=Decimal('14.00'))
+        self.create_transaction(date=date(2025, 1, 3), amount=Decimal('7.00'))
+        self.create_transaction(date=date(2025, 1, 5))
+
+        columns = load_columns(self.user, end_date=date(2025, 1, 3))
+        series = daily_series(columns, date(2025, 1, 1), date(2025, 1, 3))
+
+        self.assertEqual([str(day) for day in series['date']], ['2025-01-01', '2025-01-02', '2025-01-03'])
+        self.assertEqual(list(series['expense']), [14.0, 0.0, 7.0])
+        self.assertEqual(list(series['balance']), [86.0, 86.0, 79.0])
+        self.assertEqual(list(series['expense_avg_7d']), [2.0, 2.0, 3.0])
+        self.assertAlmostEqual(series['expense_avg_30d'][-1], 0.7)
+
+    def test_monthly_series(self):
+        self.create_transaction(date=date(2024, 12, 5), amount=Decimal('50.00'))
+        self.create_transaction(date=date(2025, 1, 5), amount=Decimal('75.00'))
+
+        series = monthly_series(load_columns(self.user), date(2025, 1, 1), date(2025, 2, 28))
+
+        self.assertEqual([str(month) for month in series['month']], ['2025-01', '2025-02'])
+        self.assertEqual(list(series['expense_change']), [25.0, -75.0])
+        self.assertEqual(list(series['expense_change_pct']), [50.0, -100.0])
+
+    def test_category_anomalies(self):
+        for day in range(1, 11):
+            self.create_transaction(date=date(2025, 1, day), amount=Decimal('10.00') + day % 2)
+        outlier = self.create_transaction(date=date(2025, 1, 20), amount=Decimal('60.00'))
+        # Too few salary rows to judge
+        self.create_transaction(type='income', category=self.salary, amount=Decimal('1.00'))
+        self.create_transaction(type='income', category=self.salary, amount=Decimal('900.00'))
+
+        anomalies = category_anomalies(load_columns(self.user), date(2025, 1, 1), date(2025, 1, 31))
+
+        self.assertEqual(list(anomalies['id']), [outlier.id])
+        self.assertGreater(anomalies['z_score'][0], 3)
+
+    def test_endpoints_use_one_query(self):
+        start = date(2025, 1, 1)
+        for offset in range(40):
+            self.create_transaction(date=start + timedelta(days=offset))
+
+        for url in ('daily', 'monthly', 'anomalies'):
+            with self.assertNumQueries(1):
+                response = self.client.get(
+                    f'/api/v1/analytics/{url}/', {'start_date': '2025-01-01', 'end_date': '2025-02-09'}
+                )
+            self.assertEqual(response.status_code, 200, url)
+
+        daily = self.client.get('/api/v1/analytics/daily/', {'start_date': '2025-02-09', 'end_date': '2025-02-09'})
+        self.assertEqual(daily.data['results'], [{
+            'date': '2025-02-09', 'income': 0.0, 'expense': 10.0, 'net': -10.0, 'balance': -400.0,
+            'expense_avg_7d': 10.0, 'income_avg_7d': 0.0, 'expense_avg_30d': 10.0, 'income_avg_30d': 0.0,
+        }])
+
+    def test_rejects_bad_dates(self):
+        response = self.client.get('/api/v1/analytics/daily/', {'start_date': '2025-02-30'})
+        self.assertEqual(response.status_code, 400)
+
+        for params in ({'start_date': '0001-01-01', 'end_date': '9999-12-31'}, {'end_date': '0001-01-01'}):
+            for url in ('daily', 'monthly', 'anomalies'):
+                response = self.client.get(f'/api/v1/analytics/{url}/', params)
+                self.assertEqual(response.status_code, 400, (url, params))
@@ -0,0 +1,9 @@
+# analytics/v1/urls.py
+from django.urls import path
+from .views import AnomaliesView, DailyTrendsView, MonthlyTrendsView
+
+urlpatterns = [
+    path('daily/', DailyTrendsView.as_view(), name='analytics-daily'),
+    path('monthly/', MonthlyTrendsView.as_view(), name='analytics-monthly'),
+    path('anomalies/', AnomaliesView.as_view(), name='analytics-anomalies'),
+]
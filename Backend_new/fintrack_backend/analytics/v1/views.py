@@ -1,3 +1,135 @@
-from django.shortcuts import render
+# analytics/v1/views.py
+from abc import ABCMeta, abstractmethod
+from datetime import timedelta
 
-# Create your views here.
+import numpy as np
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.cache import cached_response
+from analytics.engine import (
+    NO_CATEGORY,
+    category_anomalies,
+    daily_series,
+    load_columns,
+    monthly_series,
+)
+
+
+def _to_json(value):
+    """Convert one NumPy scalar to a JSON-friendly value"""
+    if isinstance(value, np.datetime64):
+        return str(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else round(float(value), 2)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _records(columns):
+    """Turn a dict of equal-length arrays into a list of row dicts"""
+    names = list(columns)
+    return [
+        {name: _to_json(value) for name, value in zip(names, row)}
+        for row in zip(*columns.values())
+    ]
+
+
+class AnalyticsView(APIView, metaclass=ABCMeta):
+    """Base view that parses the period and loads the user's columns once"""
+    permission_classes = [IsAuthenticated]
+    default_days = 90
+    # Longest period accepted; the engine allocates arrays per day in it
+    max_days = 3660
+
+    def get_period(self, request):
+        """Read start_date/end_date, defaulting to the last `default_days` days"""
+        today = timezone.localdate()
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+
+        end_date = parse_date(end_date) if end_date else today
+        start_date = parse_date(start_date) if start_date else end_date - timedelta(days=self.default_days - 1)
+        return start_date, end_date
+
+    def get(self, request):
+        try:
+            start_date, end_date = self.get_period(request)
+        except (ValueError, OverflowError):
+            start_date = end_date = None
+
+        if not start_date or not end_date or start_date > end_date:
+            return Response(
+                {'error': 'start_date and end_date must be valid dates (YYYY-MM-DD) in order'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end_date - start_date).days >= self.max_days:
+            return Response(
+                {'error': f'The period may span at most {self.max_days} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        columns = load_columns(request.user, end_date=end_date)
+        return Response({
+            'start_date': start_date,
+            'end_date': end_date,
+            'results': self.analyze(request, columns, start_date, end_date),
+        })
+
+    @abstractmethod
+    def analyze(self, request, columns, start_date, end_date):
+        """
+        Returns:
+            list: JSON-ready result rows for the period
+        """
+
+
+class DailyTrendsView(AnalyticsView):
+    """Daily totals with 7/30-day rolling averages and cumulative balance"""
+
+    @cached_response('analytics.daily')
+    def get(self, request):
+        return super().get(request)
+
+    def analyze(self, request, columns, start_date, end_date):
+        return _records(daily_series(columns, start_date, end_date))
+
+
+class MonthlyTrendsView(AnalyticsView):
+    """Monthly totals with month-over-month changes"""
+    default_days = 365
+
+    @cached_response('analytics.monthly')
+    def get(self, request):
+        return super().get(request)
+
+    def analyze(self, request, columns, start_date, end_date):
+        return _records(monthly_series(columns, start_date, end_date))
+
+
+class AnomaliesView(AnalyticsView):
+    """Transactions that stand out from their category's usual amounts"""
+
+    @cached_response('analytics.anomalies')
+    def get(self, request):
+        return super().get(request)
+
+    def analyze(self, request, columns, start_date, end_date):
+        try:
+            threshold = float(request.query_params.get('threshold', 2.5))
+        except ValueError:
+            threshold = 2.5
+
+        anomalies = category_anomalies(columns, start_date, end_date, threshold=threshold)
+
+        records = _records(anomalies)
+        for record in records:
+            if record['category'] == NO_CATEGORY:
+                record['category'] = None
+            record['type'] = 'income' if record.pop('is_income') else 'expense'
+        return records
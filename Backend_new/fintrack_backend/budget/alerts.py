@@ -0,0 +1,165 @@
+"""
+Budget spending totals and threshold alerts.
+
+Every budget stores `spent`, the running total of expenses in its
+category during its period. Transaction writes reach it through
+`transactions_changed`: the expense deltas are grouped by (user,
+category), the budgets whose period overlaps each group's dates are
+looked up on the (user, category, start_date, end_date) index, locked,
+and moved by the deltas that fall inside their period. The cost is one
+lookup, one bulk update and at most one alert insert per write, however
+many transactions it touched.
+
+A budget also stores `alert_level`, the highest threshold its spending
+sits at or above. Climbing past a threshold records a BudgetAlert;
+dropping back below one lowers the level, so crossing it again alerts
+again.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+
+from sync.tracking import stamp
+from transactions.models import Transaction
+from .models import Budget, BudgetAlert
+
+
+# Percentages of a budget that raise an alert when spending reaches them
+THRESHOLDS = (50, 80, 100)
+
+
+def threshold_reached(spent, amount):
+    """Highest threshold that `spent` has reached of `amount`, or 0"""
+    spent, amount = Decimal(str(spent)), Decimal(str(amount))
+    reached = 0
+    for threshold in THRESHOLDS:
+        if amount > 0 and spent * 100 >= amount * threshold:
+            reached = threshold
+    return reached
+
+
+def evaluate(budget):
+    """
+    Move `budget.alert_level` to where its spending is now.
+
+    Returns:
+        list: Unsaved BudgetAlerts for every threshold newly climbed past
+    """
+    level = threshold_reached(budget.spent, budget.amount)
+    alerts = [
+        BudgetAlert(
+            user_id=budget.user_id,
+            budget=budget,
+            threshold=threshold,
+            spent=budget.spent,
+            amount=budget.amount
+        )
+        for threshold in THRESHOLDS
+        if budget.alert_level < threshold <= level
+    ]
+    budget.alert_level = level
+    return alerts
+
+
+def compute_spent(budget):
+    """Sum a budget's expenses straight from transactions"""
+    return Transaction.objects.filter(
+        user_id=budget.user_id,
+        category_id=budget.category_id,
+        type='expense',
+        date__gte=budget.start_date,
+        date__lte=budget.end_date
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+
+def alert_level_expression():
+    """`alert_level` computed from the stored `spent`, for set-based updates"""
+    return Case(
+        *(
+            When(spent__gte=F('amount') * Decimal(threshold) / 100, then=Value(threshold))
+            for threshold in reversed(THRESHOLDS)
+        ),
+        default=Value(0)
+    )
+
+
+def rebuild(user=None):
+    """
+    Recompute stored spending from raw transactions. Thresholds spending
+    already sits past are marked as notified without raising alerts.
+
+    Args:
+        user: Optional user to limit the rebuild to
+
+    Returns:
+        int: Number of budgets rebuilt
+    """
+    budgets = Budget.objects.all()
+    if user is not None:
+        budgets = budgets.filter(user=user)
+
+    with transaction.atomic():
+        count = budgets.refresh_spent()
+        budgets.update(alert_level=alert_level_expression())
+
+    return count
+
+
+def _expense_changes(deltas):
+    """(user_id, category_id) -> {date: amount} for the expense deltas"""
+    changes = defaultdict(lambda: defaultdict(Decimal))
+    for delta in deltas:
+        if delta.type == 'expense' and delta.category_id is not None and delta.amount:
+            changes[(delta.user_id, delta.category_id)][delta.date] += delta.amount
+    return changes
+
+
+def apply_spending(deltas):
+    """
+    Add expense deltas to the budgets they fall in and record any
+    thresholds crossed.
+
+    Returns:
+        list: The BudgetAlerts created
+    """
+    changes = _expense_changes(deltas)
+    if not changes:
+        return []
+
+    lookup = Q()
+    for (user_id, category_id), amounts in changes.items():
+        lookup |= Q(
+            user_id=user_id,
+            category_id=category_id,
+            start_date__lte=max(amounts),
+            end_date__gte=min(amounts)
+        )
+
+    with transaction.atomic():
+        # Locked in id order so concurrent writers cannot deadlock
+        budgets = list(Budget.objects.select_for_update().filter(lookup).order_by('pk'))
+
+        changed = []
+        for budget in budgets:
+            amounts = changes[(budget.user_id, budget.category_id)]
+            change = sum(
+                (amount for day, amount in amounts.items() if budget.start_date <= day <= budget.end_date),
+                Decimal('0.00')
+            )
+            if change:
+                budget.spent += change
+                changed.append(budget)
+
+        if not changed:
+            return []
+
+        alerts = []
+        for budget in changed:
+            alerts += evaluate(budget)
+
+        # Clients syncing offline see the new totals too
+        stamp(changed)
+        Budget.objects.bulk_update(changed, ['spent', 'alert_level', 'change_seq'], batch_size=1000)
+        return BudgetAlert.objects.bulk_create(alerts)
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from budget.alerts import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored spending of budgets from raw transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Email of a single user to rebuild (defaults to all users)'
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(email=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+
+        count = rebuild(user=user)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt spending for {count} budgets'))
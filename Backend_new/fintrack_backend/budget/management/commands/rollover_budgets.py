@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from budget.rollover import rollover
+
+
+class Command(BaseCommand):
+    help = "Create the current period of every recurring budget (safe to run repeatedly or in parallel)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Roll up to this date, YYYY-MM-DD (defaults to today)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Recurring budgets claimed per transaction (default 1000)'
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date '{options['date']}'")
+
+        count = rollover(today=today, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Generated {count} budget periods'))
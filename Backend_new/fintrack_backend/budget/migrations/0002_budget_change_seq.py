@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budget", "0001_initial"),
+        ("transactions", "0007_change_seq"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="budget",
+            name="change_seq",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="budget",
+            name="created_seq",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="budget",
+            index=models.Index(
+                fields=["user", "change_seq"], name="budget_user_change_seq"
+            ),
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:39
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def populate_spent(apps, schema_editor):
+    Budget = apps.get_model("budget", "Budget")
+    Transaction = apps.get_model("transactions", "Transaction")
+
+    spent = (
+        Transaction.objects.filter(
+            user=OuterRef("user"),
+            category=OuterRef("category"),
+            type="expense",
+            date__gte=OuterRef("start_date"),
+            date__lte=OuterRef("end_date"),
+        )
+        .order_by()
+        .values("category")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    Budget.objects.update(
+        spent=Coalesce(
+            Subquery(
+                spent, output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            ),
+            Value(Decimal("0.00")),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        )
+    )
+
+    # Thresholds already passed count as notified
+    Budget.objects.update(
+        alert_level=Case(
+            When(spent__gte=F("amount"), then=Value(100)),
+            When(spent__gte=F("amount") * Decimal("0.8"), then=Value(80)),
+            When(spent__gte=F("amount") * Decimal("0.5"), then=Value(50)),
+            default=Value(0),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budget", "0002_budget_change_seq"),
+        ("transactions", "0007_change_seq"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="budget",
+            name="alert_level",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="budget",
+            name="spent",
+            field=models.DecimalField(
+                decimal_places=2, default=Decimal("0.00"), editable=False, max_digits=12
+            ),
+        ),
+        migrations.CreateModel(
+            name="BudgetAlert",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "threshold",
+                    models.PositiveSmallIntegerField(
+                        choices=[(50, "50%"), (80, "80%"), (100, "100%")]
+                    ),
+                ),
+                ("spent", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("is_read", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "budget",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alerts",
+                        to="budget.budget",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="budget_alerts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "is_read", "-created_at"],
+                        name="budget_alert_user_unread",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_spent, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:45
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budget", "0003_budget_spent_alerts"),
+        ("transactions", "0007_change_seq"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="budget",
+            name="carried_over",
+            field=models.DecimalField(
+                decimal_places=2, default=Decimal("0.00"), max_digits=10
+            ),
+        ),
+        migrations.CreateModel(
+            name="RecurringBudget",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        validators=[
+                            django.core.validators.MinValueValidator(Decimal("0.01"))
+                        ],
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[
+                            ("weekly", "Weekly"),
+                            ("monthly", "Monthly"),
+                            ("yearly", "Yearly"),
+                        ],
+                        default="monthly",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "carry_over",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Add each period's unused balance to the next period",
+                    ),
+                ),
+                ("next_start", models.DateField()),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_budgets",
+                        to="transactions.category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_budgets",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="budget",
+            name="recurring",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="budgets",
+                to="budget.recurringbudget",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="budget",
+            index=models.Index(
+                fields=["recurring", "end_date"], name="budget_recurring_end"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recurringbudget",
+            index=models.Index(
+                fields=["is_active", "next_start"], name="budget_recurring_due"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="recurringbudget",
+            unique_together={("user", "category", "period")},
+        ),
+    ]
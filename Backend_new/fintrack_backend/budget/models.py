@@ -1,8 +1,85 @@
 from django.db import models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from decimal import Decimal
-from transactions.models import Category
+from transactions.models import Category, Transaction
+
+
+def spent_expression():
+    """
+    Sum of expenses in a budget's category during its period, as a
+    correlated subquery against the outer budget row.
+    """
+    spent = Transaction.objects.filter(
+        user=OuterRef('user'),
+        category=OuterRef('category'),
+        type='expense',
+        date__gte=OuterRef('start_date'),
+        date__lte=OuterRef('end_date')
+    ).order_by().values('category').annotate(
+        total=Sum('amount')
+    ).values('total')
+
+    return Coalesce(
+        Subquery(spent, output_field=models.DecimalField(max_digits=12, decimal_places=2)),
+        Value(Decimal('0.00')),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2)
+    )
+
+
+class BudgetQuerySet(models.QuerySet):
+    """QuerySet helpers for budgets"""
+
+    def refresh_spent(self):
+        """Recompute the stored `spent` of every budget in the queryset with one UPDATE"""
+        return self.update(spent=spent_expression())
+
+
+class RecurringBudget(models.Model):
+    """Template the rollover job (budget.rollover) turns into one Budget per period"""
+    PERIOD_CHOICES = [
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='recurring_budgets'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='recurring_budgets'
+    )
+    amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('0.01'))]
+    )
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES, default='monthly')
+    carry_over = models.BooleanField(
+        default=False,
+        help_text="Add each period's unused balance to the next period"
+    )
+    # Start of the next period to generate; each period starts the day after the last one ends
+    next_start = models.DateField()
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = [('user', 'category', 'period')]
+        indexes = [
+            models.Index(fields=['is_active', 'next_start'], name='budget_recurring_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.category.name} - रु{self.amount} every {self.period}"
 
 
 class Budget(models.Model):
@@ -33,6 +110,28 @@ class Budget(models.Model):
     end_date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Set on periods generated from a recurring budget
+    recurring = models.ForeignKey(
+        RecurringBudget,
+        on_delete=models.SET_NULL,
+        related_name='budgets',
+        null=True,
+        blank=True
+    )
+    # Unused balance of the previous period included in `amount`
+    carried_over = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+
+    # Running total of expenses in the period, kept by budget.alerts
+    spent = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), editable=False)
+    # Highest alert threshold (percent) spending currently sits at or above, 0 for none
+    alert_level = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    # Offline sync bookkeeping (see sync.tracking)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+    created_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = BudgetQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
@@ -40,7 +139,43 @@ class Budget(models.Model):
         indexes = [
             models.Index(fields=['user', 'period'], name='budget_budg_user_id_6ecba7_idx'),
             models.Index(fields=['user', 'start_date', 'end_date'], name='budget_budg_user_id_e80fb0_idx'),
+            models.Index(fields=['user', 'change_seq'], name='budget_user_change_seq'),
+            models.Index(fields=['recurring', 'end_date'], name='budget_recurring_end'),
         ]
     
     def __str__(self):
         return f"{self.category.name} - रु{self.amount} ({self.period})"
+
+
+class BudgetAlert(models.Model):
+    """Notification that spending crossed a threshold of a budget"""
+    THRESHOLD_CHOICES = [
+        (50, '50%'),
+        (80, '80%'),
+        (100, '100%'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='budget_alerts'
+    )
+    budget = models.ForeignKey(
+        Budget,
+        on_delete=models.CASCADE,
+        related_name='alerts'
+    )
+    threshold = models.PositiveSmallIntegerField(choices=THRESHOLD_CHOICES)
+    spent = models.DecimalField(max_digits=12, decimal_places=2)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='budget_alert_user_unread'),
+        ]
+
+    def __str__(self):
+        return f"{self.budget} reached {self.threshold}%"
@@ -0,0 +1,180 @@
+"""
+Recurring budget rollover.
+
+A RecurringBudget's `next_start` is the first day of the next period to
+generate. The rollover job claims due templates in batches with
+SELECT ... FOR UPDATE SKIP LOCKED, so parallel runs split the work, and
+for each batch writes the new Budget rows with one bulk INSERT, fills in
+their spending with one UPDATE and advances the templates with one
+UPDATE per distinct next start. The rows also rely on the (user,
+category, start_date, end_date) constraint with ignore_conflicts, so a
+period that already exists, whether from an earlier run or made by
+hand, is never duplicated.
+
+A template that fell several periods behind gets every missing period,
+oldest first, so carried-over balances chain correctly. The balance
+carried into a period comes from the user's budget for the same
+category that ends the day before, whether the rollover or the user
+made it. Only a new period running on the rollover date raises alerts
+for the thresholds its spending already sits past; caught-up periods
+that have ended are marked as notified without them, as `rebuild` does.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import bump_data_versions
+from sync.tracking import stamp
+from .alerts import alert_level_expression, evaluate
+from .models import Budget, BudgetAlert, RecurringBudget
+
+
+PERIOD_LENGTHS = {
+    'weekly': relativedelta(weeks=1),
+    'monthly': relativedelta(months=1),
+    'yearly': relativedelta(years=1),
+}
+
+# RecurringBudget columns a rollover reads
+TEMPLATE_FIELDS = ('id', 'user_id', 'category_id', 'amount', 'period', 'carry_over', 'next_start')
+
+
+@lru_cache(maxsize=1024)
+def period_end(start_date, period):
+    """Last day of the period that starts on `start_date`"""
+    return start_date + PERIOD_LENGTHS[period] - timedelta(days=1)
+
+
+def _carry(previous):
+    if previous is None:
+        return Decimal('0.00')
+    return max(previous['amount'] - previous['spent'], Decimal('0.00'))
+
+
+def roll_batch(templates, today):
+    """
+    Generate every due period of the given (locked) templates and advance
+    their `next_start` past `today`.
+
+    Args:
+        templates: Dicts of TEMPLATE_FIELDS
+        today: Date to roll up to
+
+    Returns:
+        int: Number of budget periods generated
+    """
+    generated = 0
+    due = [template for template in templates if template['next_start'] <= today]
+
+    while due:
+        # Balances left in the periods just before the new ones; when two
+        # budgets end that day, the shorter (later starting) one is used
+        previous = {}
+        carrying = [template for template in due if template['carry_over']]
+        if carrying:
+            rows = Budget.objects.filter(
+                user_id__in={template['user_id'] for template in carrying},
+                category_id__in={template['category_id'] for template in carrying},
+                end_date__in={template['next_start'] - timedelta(days=1) for template in carrying}
+            ).order_by('-start_date').values('user_id', 'category_id', 'end_date', 'amount', 'spent')
+            for row in rows:
+                previous.setdefault((row['user_id'], row['category_id'], row['end_date']), row)
+
+        budgets = []
+        for template in due:
+            start_date = template['next_start']
+            carried = Decimal('0.00')
+            if template['carry_over']:
+                carried = _carry(previous.get(
+                    (template['user_id'], template['category_id'], start_date - timedelta(days=1))
+                ))
+
+            budgets.append(Budget(
+                user_id=template['user_id'],
+                category_id=template['category_id'],
+                recurring_id=template['id'],
+                amount=template['amount'] + carried,
+                carried_over=carried,
+                period=template['period'],
+                start_date=start_date,
+                end_date=period_end(start_date, template['period'])
+            ))
+
+        created = Budget.objects.filter(
+            recurring_id__in=[template['id'] for template in due],
+            start_date__in={template['next_start'] for template in due}
+        )
+        # ignore_conflicts does not report skipped rows, so note what was there
+        existing = set(created.values_list('pk', flat=True))
+
+        # bulk_create skips the save signals, so stamp and total here
+        stamp(budgets)
+        Budget.objects.bulk_create(budgets, batch_size=1000, ignore_conflicts=True)
+
+        created.refresh_spent()
+        created.update(alert_level=alert_level_expression())
+
+        alerts = []
+        current = created.filter(
+            start_date__lte=today, end_date__gte=today, alert_level__gt=0
+        ).exclude(pk__in=existing)
+        for budget in current:
+            budget.alert_level = 0
+            alerts += evaluate(budget)
+        BudgetAlert.objects.bulk_create(alerts)
+
+        generated += created.count() - len(existing)
+        for template in due:
+            template['next_start'] = period_end(template['next_start'], template['period']) + timedelta(days=1)
+        due = [template for template in due if template['next_start'] <= today]
+
+    return generated
+
+
+def rollover(today=None, batch_size=1000, templates=None):
+    """
+    Create the current period of every active recurring budget, and any
+    missed ones before it.
+
+    Args:
+        today: Date to roll up to (defaults to today)
+        batch_size: Templates claimed per transaction
+        templates: Optional RecurringBudget queryset to limit the run to
+
+    Returns:
+        int: Number of budget periods generated
+    """
+    today = today or timezone.localdate()
+    if templates is None:
+        templates = RecurringBudget.objects.all()
+
+    generated = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                templates.select_for_update(skip_locked=True).filter(
+                    is_active=True,
+                    next_start__lte=today
+                ).order_by('next_start', 'id').values(*TEMPLATE_FIELDS)[:batch_size]
+            )
+            if not batch:
+                return generated
+
+            generated += roll_batch(batch, today)
+
+            # Templates sharing a schedule land on the same date, so this is
+            # one UPDATE per distinct date rather than a CASE per row
+            advanced = defaultdict(list)
+            for template in batch:
+                advanced[template['next_start']].append(template['id'])
+            now = timezone.now()
+            for next_start, ids in advanced.items():
+                RecurringBudget.objects.filter(pk__in=ids).update(next_start=next_start, updated_at=now)
+
+            # bulk writes skip post_save, so invalidate cached responses here
+            bump_data_versions({template['user_id'] for template in batch})
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from transactions.signals import transactions_changed
+from .alerts import apply_spending, compute_spent, evaluate
+from .models import Budget, BudgetAlert
+
+
+@receiver(transactions_changed)
+def update_budget_spending(sender, deltas, **kwargs):
+    """Keep stored budget totals in step with transaction writes and raise alerts"""
+    apply_spending(deltas)
+
+
+# A save must write both for a recomputed total and its alerts to stick
+SPENDING_FIELDS = {'spent', 'alert_level'}
+
+
+@receiver(pre_save, sender=Budget)
+def recompute_budget_spent(sender, instance, update_fields=None, **kwargs):
+    """Signal to total a saved budget's period, which may have moved, from scratch"""
+    if update_fields is not None and not SPENDING_FIELDS <= update_fields:
+        instance._pending_alerts = None
+        return
+    instance.spent = compute_spent(instance)
+    instance._pending_alerts = evaluate(instance)
+
+
+@receiver(post_save, sender=Budget)
+def create_budget_alerts(sender, instance, **kwargs):
+    """Signal to record thresholds a budget edit put spending past"""
+    alerts = getattr(instance, '_pending_alerts', None)
+    if alerts:
+        BudgetAlert.objects.bulk_create(alerts)
+    instance._pending_alerts = None
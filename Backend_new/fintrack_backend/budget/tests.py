@@ -1,3 +1,392 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from transactions.models import Category, Transaction
+from transactions.services import bulk_create_transactions
+from sync.models import SyncCounter
+from .alerts import rebuild
+from .models import Budget, BudgetAlert, RecurringBudget
+from .rollover import rollover
+
+
+class BudgetListQueryTests(APITestCase):
+    """Budget list/detail should compute spending without per-row queries"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='budget@example.com', username='budget', password='pass12345'
+        )
+        self.client.force_authenticate(self.user)
+        self.categories = list(Category.objects.filter(user=self.user, type='expense'))
+
+    def _create_budgets(self, count):
+        for category in self.categories[:count]:
+            Budget.objects.create(
+                user=self.user,
+                category=category,
+                amount=Decimal('100.00'),
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 31),
+            )
+            Transaction.objects.create(
+                user=self.user,
+                category=category,
+                amount=Decimal('25.00'),
+                date=date(2025, 1, 15),
+                merchant='Shop',
+                type='expense',
+            )
+
+    def _count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/v1/budgets/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_list_query_count_is_constant(self):
+        self._create_budgets(2)
+        small_count, _ = self._count_list_queries()
+
+        Budget.objects.all().delete()
+        self._create_budgets(10)
+        large_count, data = self._count_list_queries()
+
+        self.assertEqual(len(data), 10)
+        self.assertEqual(small_count, large_count)
+
+    def test_spent_amount_values(self):
+        self._create_budgets(1)
+        Transaction.objects.create(
+            user=self.user,
+            category=self.categories[0],
+            amount=Decimal('500.00'),
+            date=date(2025, 2, 1),
+            merchant='Outside period',
+            type='expense',
+        )
+
+        _, data = self._count_list_queries()
+        self.assertEqual(data[0]['spent_amount'], 25.0)
+        self.assertEqual(data[0]['remaining_amount'], 75.0)
+        self.assertEqual(data[0]['percentage_used'], 25.0)
+
+        detail = self.client.get(f"/api/v1/budgets/{data[0]['id']}/")
+        self.assertEqual(detail.data['spent_amount'], 25.0)
+
+
+class BudgetAlertTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='alerts@example.com', username='alerts', password='pass12345'
+        )
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.get(user=self.user, name='Food & Dining')
+        self.budget = Budget.objects.create(
+            user=self.user,
+            category=self.food,
+            amount=Decimal('100.00'),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+        )
+
+    def spend(self, amount, day=15, **kwargs):
+        values = {
+            'user': self.user,
+            'category': self.food,
+            'amount': Decimal(amount),
+            'date': date(2025, 1, day),
+            'merchant': 'Shop',
+            'type': 'expense',
+        }
+        values.update(kwargs)
+        return Transaction.objects.create(**values)
+
+    def thresholds(self):
+        return list(BudgetAlert.objects.order_by('id').values_list('threshold', flat=True))
+
+    def test_writes_keep_spent_and_raise_alerts_once(self):
+        self.spend('30.00')
+        self.spend('25.00', day=2)
+        self.spend('500.00', day=1, type='income')
+        self.spend('500.00', day=1, category=None)
+        self.spend('500.00', date=date(2025, 2, 1))
+
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.spent, Decimal('55.00'))
+        self.assertEqual(self.thresholds(), [50])
+
+        # Climbing past two thresholds at once records both
+        big = self.spend('50.00')
+        self.assertEqual(self.thresholds(), [50, 80, 100])
+
+        # Dropping back under 80% and crossing it again alerts again
+        big.amount = Decimal('10.00')
+        big.save()
+        self.budget.refresh_from_db()
+        self.assertEqual((self.budget.spent, self.budget.alert_level), (Decimal('65.00'), 50))
+        self.spend('20.00')
+        self.assertEqual(self.thresholds(), [50, 80, 100, 80])
+
+        big.delete()
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.spent, Decimal('75.00'))
+
+    def test_bulk_writes_update_in_one_pass(self):
+        other = Budget.objects.create(
+            user=self.user,
+            category=Category.objects.get(user=self.user, name='Shopping'),
+            amount=Decimal('10.00'),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+        )
+        rows = [
+            Transaction(user=self.user, category=category, amount=Decimal('5.00'),
+                        date=date(2025, 1, 1 + i % 28), merchant='Shop', type='expense')
+            for i in range(40)
+            for category in (self.food, other.category)
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            bulk_create_transactions(rows)
+        budget_queries = [q for q in ctx.captured_queries if 'budget' in q['sql']]
+        # One locking lookup, one bulk update, one alert insert
+        self.assertEqual(len(budget_queries), 3)
+
+        self.budget.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.budget.spent, other.spent), (Decimal('200.00'), Decimal('200.00')))
+        self.assertEqual(BudgetAlert.objects.filter(budget=other).count(), 3)
+
+        ids = list(Transaction.objects.filter(category=self.food).values_list('id', flat=True))
+        self.client.delete('/api/v1/transactions/bulk_delete/', {'ids': ids}, format='json')
+        self.budget.refresh_from_db()
+        self.assertEqual((self.budget.spent, self.budget.alert_level), (Decimal('0.00'), 0))
+
+    def test_budget_edits_recompute_spent(self):
+        self.spend('60.00', day=31)
+        response = self.client.patch(
+            f'/api/v1/budgets/{self.budget.id}/', {'end_date': '2025-01-30'}, format='json'
+        )
+        self.assertEqual(response.data['spent_amount'], 0.0)
+
+        response = self.client.patch(
+            f'/api/v1/budgets/{self.budget.id}/', {'end_date': '2025-01-31', 'amount': '50.00'}, format='json'
+        )
+        self.assertEqual(response.data['spent_amount'], 60.0)
+        self.assertEqual(self.thresholds(), [50, 50, 80, 100])
+
+    def test_partial_saves_leave_spending_alone(self):
+        self.spend('90.00')
+        Budget.objects.filter(pk=self.budget.pk).update(alert_level=0)
+        self.budget.refresh_from_db()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.budget.save(update_fields=['amount'])
+        self.assertFalse(any('transactions_transaction' in query['sql'] for query in ctx.captured_queries))
+        self.assertEqual(self.thresholds(), [50, 80])
+
+        # A save that stores the level raises the alerts once
+        self.budget.save(update_fields=['spent', 'alert_level'])
+        self.budget.save(update_fields=['spent', 'alert_level'])
+        self.assertEqual(self.thresholds(), [50, 80, 50, 80])
+
+    def test_rebuild_matches_transactions(self):
+        self.spend('90.00')
+        Budget.objects.update(spent=0, alert_level=0)
+
+        self.assertEqual(rebuild(user=self.user), 1)
+        self.budget.refresh_from_db()
+        self.assertEqual((self.budget.spent, self.budget.alert_level), (Decimal('90.00'), 80))
+
+    def test_alerts_api(self):
+        self.spend('100.00')
+        other = User.objects.create_user(email='other@example.com', username='other', password='pass12345')
+        BudgetAlert.objects.create(user=other, budget=Budget.objects.create(
+            user=other,
+            category=Category.objects.get(user=other, name='Food & Dining'),
+            amount=Decimal('1.00'),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+        ), threshold=50, spent=1, amount=1)
+
+        response = self.client.get('/api/v1/budget-alerts/', {'unread': 'true'})
+        self.assertEqual([alert['threshold'] for alert in response.data], [100, 80, 50])
+        self.assertEqual(response.data[0]['category_name'], 'Food & Dining')
+
+        response = self.client.post('/api/v1/budget-alerts/read/', {'ids': [response.data[0]['id']]}, format='json')
+        self.assertEqual(response.data, {'updated': 1})
+        response = self.client.post('/api/v1/budget-alerts/read/', {}, format='json')
+        self.assertEqual(response.data, {'updated': 2})
+        self.assertEqual(self.client.get('/api/v1/budget-alerts/', {'unread': 'true'}).data, [])
+
+    def test_summary_is_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/v1/budgets/summary/')
+        self.assertFalse(any('transactions_transaction' in query['sql'] for query in ctx.captured_queries))
+        self.assertEqual(response.data['budget_count'], 1)
+        self.assertEqual(response.data['by_period']['monthly'], {'count': 1, 'total': Decimal('100.00')})
+        self.assertEqual(response.data['by_period']['weekly'], {'count': 0, 'total': 0})
+
+
+class RecurringBudgetTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='recurring@example.com', username='recurring', password='pass12345'
+        )
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.get(user=self.user, name='Food & Dining')
+
+    def template(self, user=None, **kwargs):
+        user = user or self.user
+        values = {
+            'user': user,
+            'category': Category.objects.get(user=user, name='Food & Dining'),
+            'amount': Decimal('100.00'),
+            'period': 'monthly',
+            'next_start': date(2025, 1, 1),
+        }
+        values.update(kwargs)
+        return RecurringBudget.objects.create(**values)
+
+    def periods(self, template):
+        return list(template.budgets.order_by('start_date').values_list('start_date', 'end_date', 'amount', 'carried_over'))
+
+    def test_catches_up_and_carries_unused_balance(self):
+        template = self.template(carry_over=True)
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('70.00'),
+            date=date(2025, 1, 20), merchant='Shop', type='expense'
+        )
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('150.00'),
+            date=date(2025, 2, 20), merchant='Shop', type='expense'
+        )
+
+        self.assertEqual(rollover(today=date(2025, 3, 5)), 3)
+
+        self.assertEqual(self.periods(template), [
+            (date(2025, 1, 1), date(2025, 1, 31), Decimal('100.00'), Decimal('0.00')),
+            (date(2025, 2, 1), date(2025, 2, 28), Decimal('130.00'), Decimal('30.00')),
+            (date(2025, 3, 1), date(2025, 3, 31), Decimal('100.00'), Decimal('0.00')),
+        ])
+        february = template.budgets.get(start_date=date(2025, 2, 1))
+        self.assertEqual((february.spent, february.alert_level), (Decimal('150.00'), 100))
+        # Periods that had already ended by the rollover raise no alerts
+        self.assertFalse(BudgetAlert.objects.exists())
+        template.refresh_from_db()
+        self.assertEqual(template.next_start, date(2025, 4, 1))
+
+    def test_carries_over_from_a_hand_made_period(self):
+        Budget.objects.create(
+            user=self.user, category=self.food, amount=Decimal('80.00'),
+            start_date=date(2024, 12, 1), end_date=date(2024, 12, 31)
+        )
+        template = self.template(carry_over=True)
+
+        self.assertEqual(rollover(today=date(2025, 1, 1)), 1)
+        self.assertEqual(self.periods(template), [
+            (date(2025, 1, 1), date(2025, 1, 31), Decimal('180.00'), Decimal('80.00')),
+        ])
+
+    def test_current_period_alerts_for_spending_already_made(self):
+        template = self.template(period='weekly', next_start=date(2025, 1, 6))
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('85.00'),
+            date=date(2025, 1, 7), merchant='Shop', type='expense'
+        )
+
+        self.assertEqual(rollover(today=date(2025, 1, 8)), 1)
+        self.assertEqual(
+            sorted(BudgetAlert.objects.filter(budget__recurring=template).values_list('threshold', flat=True)),
+            [50, 80]
+        )
+        RecurringBudget.objects.filter(pk=template.pk).update(next_start=date(2025, 1, 6))
+        rollover(today=date(2025, 1, 8))
+        self.assertEqual(BudgetAlert.objects.count(), 2)
+
+    def test_rerunning_is_idempotent(self):
+        template = self.template(period='weekly', next_start=date(2025, 1, 6))
+        # A period the user already made by hand is left alone
+        Budget.objects.create(
+            user=self.user, category=self.food, amount=Decimal('40.00'),
+            start_date=date(2025, 1, 13), end_date=date(2025, 1, 19)
+        )
+
+        # Only the periods actually inserted are counted
+        self.assertEqual(rollover(today=date(2025, 1, 14)), 1)
+        RecurringBudget.objects.filter(pk=template.pk).update(next_start=date(2025, 1, 6))
+        self.assertEqual(rollover(today=date(2025, 1, 14)), 0)
+
+        budgets = Budget.objects.filter(user=self.user).order_by('start_date')
+        self.assertEqual(
+            list(budgets.values_list('start_date', 'amount', 'recurring')),
+            [(date(2025, 1, 6), Decimal('100.00'), template.id), (date(2025, 1, 13), Decimal('40.00'), None)]
+        )
+        self.assertEqual(rollover(today=date(2025, 1, 14)), 0)
+
+    def test_batch_queries_do_not_grow_with_users(self):
+        def run(count, offset):
+            users = [
+                User.objects.create_user(email=f'r{offset + i}@example.com', username=f'r{offset + i}',
+                                         password='pass12345')
+                for i in range(count)
+            ]
+            for user in users:
+                self.template(user=user)
+            with CaptureQueriesContext(connection) as ctx:
+                rollover(today=date(2025, 1, 1))
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(2, 0), run(10, 100))
+        self.assertEqual(Budget.objects.filter(recurring__isnull=False).count(), 12)
+        # Each user's new period took a sync sequence number
+        self.assertEqual(SyncCounter.objects.filter(user__username__startswith='r').count(), 12)
+
+    def test_rollover_invalidates_cached_summary(self):
+        self.assertEqual(self.client.get('/api/v1/budgets/summary/').data['budget_count'], 0)
+        self.template()
+        rollover(today=date(2025, 1, 1))
+        self.assertEqual(self.client.get('/api/v1/budgets/summary/').data['budget_count'], 1)
+
+    def test_api_creates_current_period(self):
+        year = timezone.localdate().year
+        response = self.client.post('/api/v1/recurring-budgets/', {
+            'category': self.food.id,
+            'amount': '200.00',
+            'period': 'yearly',
+            'start_date': f'{year - 1}-01-01',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['next_start'], f'{year + 1}-01-01')
+        budgets = self.client.get('/api/v1/budgets/').data
+        self.assertEqual(
+            sorted((budget['start_date'], budget['end_date']) for budget in budgets),
+            [(f'{year - 1}-01-01', f'{year - 1}-12-31'), (f'{year}-01-01', f'{year}-12-31')]
+        )
+
+        duplicate = self.client.post('/api/v1/recurring-budgets/', {
+            'category': self.food.id, 'amount': '1.00', 'period': 'yearly', 'start_date': '2025-01-01',
+        }, format='json')
+        self.assertEqual(duplicate.status_code, 400)
+
+        backlog = self.client.post('/api/v1/recurring-budgets/', {
+            'category': self.food.id, 'amount': '1.00', 'period': 'monthly', 'start_date': f'{year - 1}-01-01',
+        }, format='json')
+        self.assertEqual(backlog.status_code, 400)
+        self.assertIn('start_date', backlog.data)
+
+        other = User.objects.create_user(email='x@example.com', username='x', password='pass12345')
+        foreign = self.client.post('/api/v1/recurring-budgets/', {
+            'category': Category.objects.get(user=other, name='Food & Dining').id,
+            'amount': '1.00', 'start_date': '2025-01-01',
+        }, format='json')
+        self.assertEqual(foreign.status_code, 400)
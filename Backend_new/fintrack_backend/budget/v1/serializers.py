@@ -1,9 +1,8 @@
+from django.utils import timezone
 from rest_framework import serializers
-from django.db.models import Sum
-from decimal import Decimal
-from ..models import Budget
-from transactions.v1.serializers import CategorySerializer
-from transactions.models import Transaction
+from ..models import Budget, BudgetAlert, RecurringBudget
+from ..rollover import PERIOD_LENGTHS
+from transactions.v1.serializers import CategorySerializer, UserCategoryField
 
 
 class BudgetSerializer(serializers.ModelSerializer):
@@ -18,21 +17,13 @@ class BudgetSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'category', 'category_detail', 'amount', 'period',
             'start_date', 'end_date', 'spent_amount', 'remaining_amount',
-            'percentage_used', 'created_at', 'updated_at'
+            'percentage_used', 'recurring', 'carried_over', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'recurring', 'carried_over', 'created_at', 'updated_at']
     
     def get_spent_amount(self, obj):
-        """Calculate total spent in this budget's category during the budget period"""
-        spent = Transaction.objects.filter(
-            user=obj.user,
-            category=obj.category,
-            type='expense',
-            date__gte=obj.start_date,
-            date__lte=obj.end_date
-        ).aggregate(total=Sum('amount'))['total']
-        
-        return float(spent or Decimal('0.00'))
+        """Total spent in this budget's category during the period, as stored on the budget"""
+        return float(obj.spent)
     
     def get_remaining_amount(self, obj):
         """Calculate remaining budget amount"""
@@ -61,20 +52,12 @@ class BudgetListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'category', 'category_detail', 'amount', 'period',
             'start_date', 'end_date', 'spent_amount', 'remaining_amount',
-            'percentage_used'
+            'percentage_used', 'recurring', 'carried_over'
         ]
     
     def get_spent_amount(self, obj):
-        """Calculate total spent in this budget's category during the budget period"""
-        spent = Transaction.objects.filter(
-            user=obj.user,
-            category=obj.category,
-            type='expense',
-            date__gte=obj.start_date,
-            date__lte=obj.end_date
-        ).aggregate(total=Sum('amount'))['total']
-        
-        return float(spent or Decimal('0.00'))
+        """Total spent in this budget's category during the period, as stored on the budget"""
+        return float(obj.spent)
     
     def get_remaining_amount(self, obj):
         """Calculate remaining budget amount"""
@@ -90,3 +73,58 @@ class BudgetListSerializer(serializers.ModelSerializer):
         percentage = (spent / float(obj.amount)) * 100
         return round(percentage, 2)
 
+
+class BudgetAlertSerializer(serializers.ModelSerializer):
+    """Serializer for budget threshold alerts"""
+    category_name = serializers.CharField(source='budget.category.name', read_only=True)
+
+    class Meta:
+        model = BudgetAlert
+        fields = ['id', 'budget', 'category_name', 'threshold', 'spent', 'amount', 'is_read', 'created_at']
+        read_only_fields = fields
+
+
+class RecurringBudgetSerializer(serializers.ModelSerializer):
+    """Serializer for recurring budget templates"""
+    category = UserCategoryField()
+    category_detail = CategorySerializer(source='category', read_only=True)
+    start_date = serializers.DateField(write_only=True, help_text='First day of the first period')
+
+    class Meta:
+        model = RecurringBudget
+        fields = [
+            'id', 'category', 'category_detail', 'amount', 'period', 'carry_over',
+            'start_date', 'next_start', 'is_active', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'next_start', 'created_at', 'updated_at']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Later periods follow on from the generated ones, so the start is set once
+        if self.instance is not None:
+            fields['start_date'].read_only = True
+        return fields
+
+    def validate(self, attrs):
+        category = attrs.get('category', getattr(self.instance, 'category', None))
+        period = attrs.get('period', getattr(self.instance, 'period', 'monthly'))
+        duplicates = RecurringBudget.objects.filter(
+            user=self.context['request'].user, category=category, period=period
+        )
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError('A recurring budget for this category and period already exists.')
+
+        # Creating a template generates its periods in the request, so the
+        # backlog it may start with is kept to the previous period
+        start_date = attrs.get('start_date')
+        if start_date is not None and start_date + PERIOD_LENGTHS[period] * 2 <= timezone.localdate():
+            raise serializers.ValidationError(
+                {'start_date': 'Start date can be at most one period before the current one.'}
+            )
+        return attrs
+
+    def create(self, validated_data):
+        validated_data['next_start'] = validated_data.pop('start_date')
+        return super().create(validated_data)
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BudgetViewSet
+from .views import BudgetAlertViewSet, BudgetViewSet, RecurringBudgetViewSet
 
 # Create router for viewsets
 router = DefaultRouter()
 router.register(r'budgets', BudgetViewSet, basename='budget')
+router.register(r'recurring-budgets', RecurringBudgetViewSet, basename='recurring-budget')
+router.register(r'budget-alerts', BudgetAlertViewSet, basename='budget-alert')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,12 +2,20 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Sum
-from ..models import Budget
-from .serializers import BudgetSerializer, BudgetListSerializer
+from django.db.models import Count, Sum
+from core.cache import cached_response
+from sync.tracking import AtomicWritesMixin
+from ..models import Budget, BudgetAlert, RecurringBudget
+from ..rollover import rollover
+from .serializers import (
+    BudgetAlertSerializer,
+    BudgetListSerializer,
+    BudgetSerializer,
+    RecurringBudgetSerializer,
+)
 
 
-class BudgetViewSet(viewsets.ModelViewSet):
+class BudgetViewSet(AtomicWritesMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing budgets.
     Supports CRUD operations for user budgets.
@@ -17,6 +25,7 @@ class BudgetViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return budgets for the authenticated user only"""
+        # Spending is stored on each budget, so listing never aggregates transactions
         return Budget.objects.filter(user=self.request.user).select_related('category')
     
     def get_serializer_class(self):
@@ -34,24 +43,74 @@ class BudgetViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
     
     @action(detail=False, methods=['get'])
+    @cached_response('budgets.summary')
     def summary(self, request):
         """Get budget summary for the authenticated user"""
-        budgets = self.get_queryset()
-        
-        total_budget = budgets.aggregate(total=Sum('amount'))['total'] or 0
-        
+        # One grouped query instead of a count and a sum per period
+        rows = Budget.objects.filter(user=request.user).order_by().values('period').annotate(
+            count=Count('id'),
+            total=Sum('amount')
+        )
+        by_period = {row['period']: row for row in rows}
+
         summary_data = {
-            'total_budget': total_budget,
-            'budget_count': budgets.count(),
+            'total_budget': sum((row['total'] for row in by_period.values()), 0),
+            'budget_count': sum(row['count'] for row in by_period.values()),
             'by_period': {}
         }
-        
-        # Group by period
+
         for period in ['weekly', 'monthly', 'yearly']:
-            period_budgets = budgets.filter(period=period)
+            row = by_period.get(period, {})
             summary_data['by_period'][period] = {
-                'count': period_budgets.count(),
-                'total': period_budgets.aggregate(total=Sum('amount'))['total'] or 0
+                'count': row.get('count', 0),
+                'total': row.get('total', 0)
             }
-        
+
         return Response(summary_data)
+
+
+class RecurringBudgetViewSet(AtomicWritesMixin, viewsets.ModelViewSet):
+    """
+    Recurring budget templates. Creating one generates its periods up to
+    the current one straight away (the start may be at most one period
+    back); the rollover_budgets job adds the rest.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = RecurringBudgetSerializer
+
+    def get_queryset(self):
+        return RecurringBudget.objects.filter(user=self.request.user).select_related('category')
+
+    def perform_create(self, serializer):
+        template = serializer.save(user=self.request.user)
+        rollover(templates=RecurringBudget.objects.filter(pk=template.pk))
+        template.refresh_from_db(fields=['next_start'])
+
+
+class BudgetAlertViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Threshold alerts raised as spending crosses 50, 80 and 100% of a budget.
+
+    Query params:
+        unread: true to list only unread alerts
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BudgetAlertSerializer
+
+    def get_queryset(self):
+        queryset = BudgetAlert.objects.filter(user=self.request.user).select_related('budget__category')
+        if self.request.query_params.get('unread') == 'true':
+            queryset = queryset.filter(is_read=False)
+        return queryset
+
+    @action(detail=False, methods=['post'], url_path='read')
+    def mark_read(self, request):
+        """Mark the alerts listed in `ids`, or all of them, as read"""
+        alerts = BudgetAlert.objects.filter(user=request.user, is_read=False)
+        ids = request.data.get('ids')
+        if ids is not None:
+            if not isinstance(ids, list):
+                return Response({'error': 'ids must be a list'}, status=400)
+            alerts = alerts.filter(id__in=ids)
+
+        return Response({'updated': alerts.update(is_read=True)})
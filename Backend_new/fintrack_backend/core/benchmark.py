@@ -0,0 +1,325 @@
+"""
+API latency benchmark.
+
+Drives every REST endpoint through the Django test client as real
+JWT-authenticated users and records latency percentiles and query counts.
+Writes are run inside a transaction that is rolled back, so repeated runs
+measure the same data set.
+"""
+import json
+import math
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.provisioning import provision_users
+from accounts.models import User
+from budget.models import Budget
+from report.models import Report, ReportSchedule
+from report.v1.services import ReportService
+from transactions.models import Category, Transaction
+from transactions.seeding import seed_transactions
+from .cache import bump_data_version
+
+
+# `path` and `data` are formatted with the per-user fixture ids (see user_fixtures)
+Endpoint = namedtuple('Endpoint', ['name', 'method', 'path', 'data', 'writes', 'admin'])
+
+
+def endpoint(name, method, path, data=None, writes=False, admin=False):
+    return Endpoint(name, method, path, data, writes, admin)
+
+
+ENDPOINTS = [
+    # transactions/v1
+    endpoint('transactions.list', 'get', '/api/v1/transactions/'),
+    endpoint('transactions.list_filtered', 'get', '/api/v1/transactions/?type=expense&ordering=-amount'),
+    endpoint('transactions.search', 'get', '/api/v1/transactions/?search=coffee'),
+    endpoint('transactions.retrieve', 'get', '/api/v1/transactions/{transaction_id}/'),
+    endpoint('transactions.create', 'post', '/api/v1/transactions/', {
+        'date': '{today}', 'merchant': 'Benchmark', 'category': '{category_id}',
+        'type': 'expense', 'amount': '12.34',
+    }, writes=True),
+    endpoint('transactions.update', 'patch', '/api/v1/transactions/{transaction_id}/', {'notes': 'benchmark'}, writes=True),
+    endpoint('transactions.replace', 'put', '/api/v1/transactions/{transaction_id}/', {
+        'date': '{today}', 'merchant': 'Benchmark', 'category': '{category_id}',
+        'type': 'expense', 'amount': '43.21', 'notes': 'benchmark',
+    }, writes=True),
+    endpoint('transactions.delete', 'delete', '/api/v1/transactions/{transaction_id}/', writes=True),
+    endpoint('transactions.stats', 'get', '/api/v1/transactions/stats/'),
+    endpoint('transactions.recent', 'get', '/api/v1/transactions/recent/'),
+    endpoint('transactions.trends', 'get', '/api/v1/transactions/trends/'),
+    endpoint('transactions.trends_monthly', 'get', '/api/v1/transactions/trends/?granularity=month&start_date={year_ago}'),
+    endpoint('transactions.categories', 'get', '/api/v1/transactions/categories/'),
+    endpoint('transactions.bulk_import', 'post', '/api/v1/transactions/bulk_import/', [
+        {'date': '{today}', 'merchant': f'Import {index}', 'category': 'Food & Dining', 'type': 'expense', 'amount': '5.00'}
+        for index in range(100)
+    ], writes=True),
+    endpoint('transactions.bulk_delete', 'delete', '/api/v1/transactions/bulk_delete/', {'ids': '{transaction_ids}'}, writes=True),
+    endpoint('categories.list', 'get', '/api/v1/categories/'),
+    endpoint('categories.retrieve', 'get', '/api/v1/categories/{category_id}/'),
+    endpoint('categories.create', 'post', '/api/v1/categories/', {
+        'name': 'Benchmark', 'icon': '📁', 'type': 'expense',
+    }, writes=True),
+    endpoint('categories.update', 'patch', '/api/v1/categories/{category_id}/', {'icon': '🧪'}, writes=True),
+    endpoint('categories.delete', 'delete', '/api/v1/categories/{spare_category_id}/', writes=True),
+
+    # budget/v1
+    endpoint('budgets.list', 'get', '/api/v1/budgets/'),
+    endpoint('budgets.retrieve', 'get', '/api/v1/budgets/{budget_id}/'),
+    endpoint('budgets.summary', 'get', '/api/v1/budgets/summary/'),
+    endpoint('budgets.create', 'post', '/api/v1/budgets/', {
+        'category': '{category_id}', 'amount': '250.00', 'start_date': '{today}', 'end_date': '{today}',
+    }, writes=True),
+    endpoint('budgets.update', 'patch', '/api/v1/budgets/{budget_id}/', {'amount': '750.00'}, writes=True),
+    endpoint('budgets.delete', 'delete', '/api/v1/budgets/{budget_id}/', writes=True),
+
+    # report/v1
+    endpoint('reports.generate', 'get', '/api/v1/reports/generate/?start_date={quarter_ago}&end_date={today}'),
+    endpoint('reports.export_csv', 'get', '/api/v1/reports/export-csv/?start_date={quarter_ago}&end_date={today}'),
+    endpoint('reports.category_breakdown', 'get', '/api/v1/reports/category-breakdown/?start_date={year_ago}&end_date={today}'),
+    endpoint('reports.stats', 'get', '/api/v1/reports/stats/'),
+    endpoint('reports.saved_list', 'get', '/api/v1/reports/saved/'),
+    endpoint('reports.saved_retrieve', 'get', '/api/v1/reports/saved/{report_id}/'),
+    endpoint('reports.saved_create', 'post', '/api/v1/reports/saved/', {
+        'title': 'Benchmark', 'report_type': 'all', 'start_date': '{year_ago}', 'end_date': '{today}',
+    }, writes=True),
+    endpoint('reports.saved_update', 'patch', '/api/v1/reports/saved/{report_id}/', {'start_date': '{quarter_ago}'}, writes=True),
+    endpoint('reports.saved_delete', 'delete', '/api/v1/reports/saved/{report_id}/', writes=True),
+    endpoint('reports.schedules_list', 'get', '/api/v1/reports/schedules/'),
+    endpoint('reports.schedules_create', 'post', '/api/v1/reports/schedules/', {
+        'name': 'Benchmark weekly', 'frequency': 'weekly', 'report_type': 'expense', 'next_generation': '{next_week}',
+    }, writes=True),
+    endpoint('reports.schedules_update', 'patch', '/api/v1/reports/schedules/{schedule_id}/', {'is_active': False}, writes=True),
+
+    # accounts/v1
+    endpoint('auth.register', 'post', '/api/v1/auth/register/', {
+        'email': 'benchmark-new@example.com', 'username': 'benchmark-new', 'password': 'benchmark-pass',
+    }, writes=True),
+    endpoint('auth.login', 'post', '/api/v1/auth/login/', {'email': '{email}', 'password': '{password}'}),
+    endpoint('auth.refresh', 'post', '/api/v1/auth/refresh/', {'refresh': '{refresh}'}),
+    endpoint('auth.profile', 'get', '/api/v1/auth/profile/'),
+    endpoint('auth.profile_update', 'patch', '/api/v1/auth/profile/', {'first_name': 'Bench'}, writes=True),
+    endpoint('auth.admin_users', 'get', '/api/v1/auth/admin/users/', admin=True),
+    endpoint('auth.admin_user_detail', 'get', '/api/v1/auth/admin/users/{user_id}/', admin=True),
+    endpoint('auth.admin_user_update', 'patch', '/api/v1/auth/admin/users/{user_id}/', {'last_name': 'Bench'},
+             writes=True, admin=True),
+    endpoint('auth.admin_user_delete', 'delete', '/api/v1/auth/admin/users/{user_id}/', writes=True, admin=True),
+    endpoint('auth.admin_change_password', 'put', '/api/v1/auth/admin/users/{user_id}/password/', {
+        'new_password': 'benchmark-pass-2',
+    }, writes=True, admin=True),
+
+    # Aggregates
+    endpoint('analytics.daily', 'get', '/api/v1/analytics/daily/'),
+    # Sections run on the dashboard thread pool, whose queries are not counted here
+    endpoint('dashboard', 'get', '/api/v1/dashboard/'),
+]
+
+
+class Rollback(Exception):
+    """Raised to discard a write endpoint's changes"""
+
+
+def seed(users, transactions_per_user, prefix='benchmark', password='fintrack-load-test', log=None):
+    """
+    Provision users and top each one up to `transactions_per_user` transactions.
+    Safe to re-run: existing users and rows are kept, so runs share one data set.
+
+    Returns:
+        list: The benchmark users
+    """
+    accounts = provision_users(count=users, prefix=prefix, password=password, log=log)
+
+    existing = dict(
+        Transaction.objects.filter(user__in=accounts).values('user').annotate(rows=Count('id')).values_list('user', 'rows')
+    )
+    for index, user in enumerate(accounts):
+        missing = transactions_per_user - existing.get(user.pk, 0)
+        if missing > 0:
+            seed_transactions(user, missing, seed=user.pk)
+        if log and (index + 1) % 100 == 0:
+            log(f'Seeded transactions for {index + 1}/{len(accounts)} users')
+
+    return accounts
+
+
+def benchmark_admin(prefix='benchmark', password='fintrack-load-test'):
+    """The staff user admin endpoints are called as"""
+    admin = User.objects.filter(username=f'{prefix}-admin').first()
+    if admin is None:
+        admin = User.objects.create_superuser(
+            email=f'{prefix}-admin@example.com', username=f'{prefix}-admin', password=password
+        )
+    return admin
+
+
+def user_fixtures(user, password):
+    """
+    Ids and values the endpoint templates refer to, creating a budget,
+    report, schedule and spare category if missing
+    """
+    today = date.today()
+    category = Category.objects.filter(user=user, type='expense').order_by('id').first()
+    # Transactions keep their category from being deleted, so deletes use one without any
+    spare = Category.objects.filter(user=user, transactions__isnull=True).order_by('id').first()
+    if spare is None:
+        spare = Category.objects.create(
+            user=user, name=f'Benchmark spare {timezone.now():%Y%m%d%H%M%S%f}', type='expense'
+        )
+
+    budget = Budget.objects.filter(user=user).first() or Budget.objects.create(
+        user=user, category=category, amount=Decimal('500.00'),
+        start_date=today.replace(day=1), end_date=today
+    )
+    report = Report.objects.filter(user=user).first() or ReportService.save_report(
+        user=user, title='Benchmark year', start_date=str(today - timedelta(days=365)), end_date=str(today)
+    )
+    schedule = ReportSchedule.objects.filter(user=user).first() or ReportSchedule.objects.create(
+        user=user, name='Benchmark monthly', frequency='monthly', report_type='all',
+        next_generation=timezone.now() + timedelta(days=30)
+    )
+
+    refresh = RefreshToken.for_user(user)
+    latest = list(Transaction.objects.filter(user=user).order_by('-id').values_list('id', flat=True)[:20])
+    return {
+        'user_id': user.pk,
+        'email': user.email,
+        'password': password,
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'transaction_id': latest[0] if latest else 0,
+        'transaction_ids': latest,
+        'category_id': category.pk if category else None,
+        'spare_category_id': spare.pk,
+        'budget_id': budget.pk,
+        'report_id': report.pk,
+        'schedule_id': schedule.pk,
+        'next_week': (timezone.now() + timedelta(days=7)).isoformat(),
+        'today': today.isoformat(),
+        'quarter_ago': (today - timedelta(days=90)).isoformat(),
+        'year_ago': (today - timedelta(days=365)).isoformat(),
+    }
+
+
+def _fill(template, fixtures):
+    """Substitute fixture values into a path or request body"""
+    if isinstance(template, str):
+        # A placeholder that is the whole value keeps its type (ids, lists)
+        if template.startswith('{') and template.endswith('}') and template[1:-1] in fixtures:
+            return fixtures[template[1:-1]]
+        return template.format(**fixtures)
+    if isinstance(template, list):
+        return [_fill(item, fixtures) for item in template]
+    if isinstance(template, dict):
+        return {key: _fill(value, fixtures) for key, value in template.items()}
+    return template
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def _call(client, item, fixtures):
+    path = _fill(item.path, fixtures)
+    data = _fill(item.data, fixtures)
+    response = getattr(client, item.method)(path, data, format='json') if data is not None \
+        else getattr(client, item.method)(path)
+
+    # Streamed responses do their work while being consumed
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response.status_code
+
+
+def run_benchmark(users, admin, requests=50, cold=False, endpoints=None, log=None):
+    """
+    Call each endpoint `requests` times, rotating through `users`.
+
+    Args:
+        users: list of (user, fixtures) pairs to send requests as
+        admin: fixtures of a staff user, for admin endpoints
+        cold: Invalidate the user's response cache before every request
+        endpoints: Optional list of endpoint names to run
+
+    Returns:
+        dict: Per-endpoint latency percentiles (ms), query counts and status codes
+    """
+    results = {}
+    for item in ENDPOINTS:
+        if endpoints and item.name not in endpoints:
+            continue
+
+        timings, queries, statuses = [], [], {}
+        for index in range(requests):
+            user, fixtures = users[index % len(users)]
+            # Admin endpoints act on the rotated user but authenticate as the admin
+            token = admin['access'] if item.admin else fixtures['access']
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            if cold:
+                bump_data_version(user.pk)
+
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                if item.writes:
+                    try:
+                        with transaction.atomic():
+                            status_code = _call(client, item, fixtures)
+                            raise Rollback()
+                    except Rollback:
+                        pass
+                else:
+                    status_code = _call(client, item, fixtures)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            queries.append(len(ctx.captured_queries))
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+
+        timings.sort()
+        results[item.name] = {
+            'method': item.method.upper(),
+            'path': item.path,
+            'requests': requests,
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries_min': min(queries),
+            'queries_max': max(queries),
+            'queries_mean': round(sum(queries) / len(queries), 2),
+        }
+        if log:
+            row = results[item.name]
+            log(f"{item.name:<36} p50={row['p50_ms']:>9.2f}ms p95={row['p95_ms']:>9.2f}ms "
+                f"p99={row['p99_ms']:>9.2f}ms queries={row['queries_max']}")
+
+    return results
+
+
+def compare(results, baseline):
+    """p95 change per endpoint against an earlier results file, in percent"""
+    changes = {}
+    for name, row in results['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if before and before['p95_ms']:
+            changes[name] = round((row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100, 1)
+    return changes
+
+
+def load_results(path):
+    with open(path) as handle:
+        return json.load(handle)
@@ -0,0 +1,145 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+
+_stats_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'fintrack:data-version:{user_id}'
+
+
+def get_version(cache, key):
+    """
+    Return the counter stored under `key`.
+
+    If the counter is missing (never set, or evicted) it restarts from the
+    current time in nanoseconds, which is always ahead of any number used
+    before, so entries cached under an older version can't be read again.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_version(cache, key):
+    """
+    Advance the counter under `key`.
+
+    Bumps immediately and again once the surrounding transaction commits,
+    so a value computed from pre-commit data is never stored under the
+    version that readers see after the commit.
+    """
+    _bump(cache, key)
+    transaction.on_commit(lambda: _bump(cache, key))
+
+
+def _bump(cache, key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_data_version(user_id):
+    """Return the user's current data version"""
+    return get_version(get_cache(), _version_key(user_id))
+
+
+def bump_data_version(user_id):
+    """Invalidate every cached response for a user"""
+    bump_version(get_cache(), _version_key(user_id))
+
+
+def bump_data_versions(user_ids):
+    """
+    bump_data_version for many users in one cache round trip (plus one at
+    commit). The versions jump to the current time in nanoseconds, which
+    is ahead of anything they held before, as in get_version.
+    """
+    cache = get_cache()
+    keys = [_version_key(user_id) for user_id in user_ids]
+
+    def reset():
+        version = time.time_ns()
+        cache.set_many({key: version for key in keys}, timeout=None)
+
+    reset()
+    transaction.on_commit(reset)
+
+
+def response_cache_key(user_id, endpoint, query_params):
+    """Key on (user, endpoint, normalized query params, data version)"""
+    params = sorted(
+        (name, value)
+        for name in query_params
+        for value in query_params.getlist(name)
+    )
+    digest = hashlib.md5(urlencode(params).encode('utf-8')).hexdigest()
+    version = get_data_version(user_id)
+    return f'fintrack:response:{user_id}:{version}:{endpoint}:{digest}'
+
+
+def cached_response(endpoint, timeout=None):
+    """
+    Cache a view's successful response data per user.
+
+    Usable on APIView handlers and viewset actions; `timeout` defaults to
+    the cache backend's TIMEOUT.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(self, request, *args, **kwargs):
+            cache = get_cache()
+            # Read the version before computing, so a write that lands
+            # mid-computation leaves this result under an already stale key
+            key = response_cache_key(request.user.pk, endpoint, request.query_params)
+
+            data = cache.get(key)
+            if data is not None:
+                _record(_hits, endpoint)
+                return Response(data)
+
+            _record(_misses, endpoint)
+            response = view_func(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, **({'timeout': timeout} if timeout else {}))
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _record(counter, endpoint):
+    with _stats_lock:
+        counter[endpoint] += 1
+
+
+def cache_stats():
+    """Hit/miss counters for this process, by endpoint"""
+    with _stats_lock:
+        endpoints = sorted(set(_hits) | set(_misses))
+        return {
+            endpoint: {'hits': _hits[endpoint], 'misses': _misses[endpoint]}
+            for endpoint in endpoints
+        }
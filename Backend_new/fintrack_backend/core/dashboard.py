@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpRequest, QueryDict
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.settings import api_settings
+
+from budget.v1.views import BudgetViewSet
+from report.v1.views import ReportStatsView
+from transactions.v1.views import TransactionViewSet
+from .middleware import current_recorder, recording
+
+
+class DashboardUserAuthentication(BaseAuthentication):
+    """
+    Hands a section the user the dashboard request already authenticated,
+    so the section skips decoding the token and loading the user again.
+    Without one, the API's own authentication classes run as usual.
+    """
+
+    def authenticate(self, request):
+        return getattr(request, 'dashboard_auth', None)
+
+
+SECTION_AUTHENTICATION = [DashboardUserAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+# Each dashboard section is an existing read endpoint, so it keeps its own
+# permissions, serializers and response caching
+DASHBOARD_SECTIONS = {
+    'stats': TransactionViewSet.as_view({'get': 'stats'}, authentication_classes=SECTION_AUTHENTICATION),
+    'trends': TransactionViewSet.as_view({'get': 'trends'}, authentication_classes=SECTION_AUTHENTICATION),
+    'recent': TransactionViewSet.as_view({'get': 'recent'}, authentication_classes=SECTION_AUTHENTICATION),
+    'budgets': BudgetViewSet.as_view({'get': 'list'}, authentication_classes=SECTION_AUTHENTICATION),
+    'budget_summary': BudgetViewSet.as_view({'get': 'summary'}, authentication_classes=SECTION_AUTHENTICATION),
+    'report_stats': ReportStatsView.as_view(authentication_classes=SECTION_AUTHENTICATION),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared pool that bounds how many section queries run at once per process"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DASHBOARD_MAX_WORKERS,
+                thread_name_prefix='dashboard'
+            )
+        return _executor
+
+
+def section_request(request, query_params, user=None, auth=None):
+    """
+    A fresh GET request for one section. It carries the dashboard
+    request's headers and path but shares none of its state, so sections
+    can run on several threads at once.
+    """
+    section = HttpRequest()
+    section.method = 'GET'
+    section.path = section.path_info = request.path
+    # Plain header values only; the body stream stays with the original
+    section.META = {key: value for key, value in request.META.items() if isinstance(value, str)}
+    section.GET = query_params
+    if user is not None:
+        section.dashboard_auth = (user, auth)
+    return section
+
+
+def _run_section(view, request, query_params, user=None, auth=None):
+    """Call one section view and return (status, data)"""
+    response = view(section_request(request, query_params, user, auth))
+    return response.status_code, response.data
+
+
+def _run_pooled(view, request, query_params, user, auth, recorder=None):
+    try:
+        # Pool threads have their own connections, so request metrics see
+        # their queries only through the request's recorder
+        with recording(recorder) if recorder is not None else nullcontext():
+            return _run_section(view, request, query_params, user, auth)
+    finally:
+        # Pool threads never see request_finished, so they retire broken
+        # or expired connections here and keep the rest for CONN_MAX_AGE
+        close_old_connections()
+
+
+async def load_sections(request, query_params=None, user=None, auth=None):
+    """
+    Run every dashboard section and collect their data by name.
+
+    Sections run concurrently on the shared pool, or one after another on
+    the request's own thread and connection when DASHBOARD_MAX_WORKERS is 0
+    (tests use this so every section sees the test transaction).
+
+    Args:
+        request: The dashboard request
+        query_params: Query params passed to every section
+        user: The already authenticated user, if any
+        auth: The token `user` was authenticated with
+
+    Returns:
+        dict: section name -> (status code, data)
+    """
+    query_params = query_params if query_params is not None else QueryDict()
+
+    if not settings.DASHBOARD_MAX_WORKERS:
+        run = sync_to_async(_run_section)
+        return {
+            name: await run(view, request, query_params, user, auth)
+            for name, view in DASHBOARD_SECTIONS.items()
+        }
+
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    recorder = current_recorder.get()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(executor, _run_pooled, view, request, query_params, user, auth, recorder)
+        for view in DASHBOARD_SECTIONS.values()
+    ))
+    return dict(zip(DASHBOARD_SECTIONS, results))
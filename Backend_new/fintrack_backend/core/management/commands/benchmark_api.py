@@ -0,0 +1,96 @@
+import json
+import platform
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmark import (
+    ENDPOINTS,
+    benchmark_admin,
+    compare,
+    load_results,
+    run_benchmark,
+    seed,
+    user_fixtures,
+)
+
+
+class Command(BaseCommand):
+    help = "Seed synthetic users and record per-endpoint API latency (p50/p95/p99) and query counts as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100,
+                            help='Benchmark users to provision (default 100)')
+        parser.add_argument('--transactions', type=int, default=1000,
+                            help='Transactions per user (default 1000)')
+        parser.add_argument('--sample-users', type=int, default=10,
+                            help='Users the requests rotate through (default 10)')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Requests per endpoint (default 50)')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Only run this endpoint (repeatable), e.g. transactions.stats')
+        parser.add_argument('--cold', action='store_true',
+                            help='Invalidate response caches before every request')
+        parser.add_argument('--prefix', default='benchmark',
+                            help='Username prefix of the benchmark users')
+        parser.add_argument('--output', default='benchmark-results.json',
+                            help='Where to write the JSON results ("-" for stdout)')
+        parser.add_argument('--baseline',
+                            help='Earlier results file to compare p95 latency against')
+
+    def handle(self, *args, **options):
+        names = {item.name for item in ENDPOINTS}
+        unknown = set(options['endpoints'] or []) - names
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+        password = 'fintrack-load-test'
+        log = self.stdout.write if options['output'] != '-' else self.stderr.write
+
+        started = time.perf_counter()
+        users = seed(options['users'], options['transactions'], prefix=options['prefix'],
+                     password=password, log=log)
+        log(f'Seeded {len(users)} users in {time.perf_counter() - started:.1f}s')
+
+        sample = [(user, user_fixtures(user, password)) for user in users[:options['sample_users']]]
+        admin = user_fixtures(benchmark_admin(options['prefix'], password), password)
+
+        endpoints = run_benchmark(
+            sample,
+            admin,
+            requests=options['requests'],
+            cold=options['cold'],
+            endpoints=options['endpoints'],
+            log=log
+        )
+
+        results = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'debug': settings.DEBUG,
+                'users': options['users'],
+                'transactions_per_user': options['transactions'],
+                'sample_users': len(sample),
+                'requests_per_endpoint': options['requests'],
+                'cold': options['cold'],
+            },
+            'endpoints': endpoints,
+        }
+
+        if options['baseline']:
+            results['p95_change_pct'] = compare(results, load_results(options['baseline']))
+            for name, change in results['p95_change_pct'].items():
+                log(f'{name:<36} p95 {change:+.1f}%')
+
+        payload = json.dumps(results, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(payload)
+        else:
+            with open(options['output'], 'w') as handle:
+                handle.write(payload)
+            log(self.style.SUCCESS(f"Wrote results to {options['output']}"))
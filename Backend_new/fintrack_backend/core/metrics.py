@@ -0,0 +1,136 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from .cache import cache_stats
+
+
+# Upper bounds for the request and database time histograms, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds for the queries-per-request histogram
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# Method labels are kept to these, so arbitrary verbs cannot grow the series
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'})
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    Normalize SQL so queries that differ only in parameters compare equal.
+    Placeholder lists of any length (IN clauses, bulk VALUES) collapse to one.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """In-process request metrics, labelled by view and method"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+            self.db_durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+            self.db_queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+            self.responses = Counter()
+            self.duplicate_queries = Counter()
+
+    def observe(self, view, method, status_code, duration, db_duration, db_queries, duplicates):
+        if method not in HTTP_METHODS:
+            method = 'other'
+        labels = (view, method)
+        with self._lock:
+            self.durations[labels].observe(duration)
+            self.db_durations[labels].observe(db_duration)
+            self.db_queries[labels].observe(db_queries)
+            self.responses[(view, method, str(status_code))] += 1
+            if duplicates:
+                self.duplicate_queries[labels] += duplicates
+
+    def render(self):
+        """Prometheus text exposition of everything recorded, plus response cache counters"""
+        lines = []
+
+        def header(name, kind, text):
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name, text, series):
+            header(name, 'histogram', text)
+            for (view, method), values in sorted(series.items()):
+                labels = f'view="{_escape(view)}",method="{_escape(method)}"'
+                for bound, count in values.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f'{name}_sum{{{labels}}} {values.sum}')
+                lines.append(f'{name}_count{{{labels}}} {values.count}')
+
+        with self._lock:
+            histogram('fintrack_request_duration_seconds', 'Time spent handling requests.', self.durations)
+            histogram('fintrack_request_db_duration_seconds', 'Time spent in database queries per request.',
+                      self.db_durations)
+            histogram('fintrack_request_db_queries', 'Database queries per request.', self.db_queries)
+
+            header('fintrack_responses_total', 'counter', 'Responses by view, method and status.')
+            for (view, method, status_code), count in sorted(self.responses.items()):
+                lines.append(
+                    f'fintrack_responses_total{{view="{_escape(view)}",method="{_escape(method)}",'
+                    f'status="{status_code}"}} {count}'
+                )
+
+            header('fintrack_duplicate_queries_total', 'counter',
+                   'Queries repeating an earlier fingerprint in the same request.')
+            for (view, method), count in sorted(self.duplicate_queries.items()):
+                lines.append(
+                    f'fintrack_duplicate_queries_total{{view="{_escape(view)}",method="{_escape(method)}"}} {count}'
+                )
+
+        stats = cache_stats()
+        header('fintrack_response_cache_hits_total', 'counter', 'Response cache hits by endpoint.')
+        for endpoint, counts in stats.items():
+            lines.append(f'fintrack_response_cache_hits_total{{endpoint="{endpoint}"}} {counts["hits"]}')
+        header('fintrack_response_cache_misses_total', 'counter', 'Response cache misses by endpoint.')
+        for endpoint, counts in stats.items():
+            lines.append(f'fintrack_response_cache_misses_total{{endpoint="{endpoint}"}} {counts["misses"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,167 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import fingerprint, registry
+
+
+logger = logging.getLogger('fintrack.requests')
+
+# Recorder of the request being handled, for work it hands to other threads
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+class QueryRecorder:
+    """
+    execute_wrapper that counts, times and fingerprints every query.
+    Safe to share between the threads serving one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.duration += elapsed
+                self.count += 1
+                self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        """Fingerprints seen more than once, most repeated first"""
+        return [
+            {'fingerprint': sql, 'count': count}
+            for sql, count in self.fingerprints.most_common()
+            if count > 1
+        ]
+
+
+@contextmanager
+def recording(recorder):
+    """Send the current thread's queries, on every database, to `recorder`"""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+def view_name(request):
+    """`ViewClass.action` for DRF views, the URL name or function name otherwise"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view_class is None:
+        return match.view_name or match.func.__name__
+
+    actions = getattr(match.func, 'actions', None)
+    action = actions.get(request.method.lower()) if actions else request.method.lower()
+    return f'{view_class.__name__}.{action}'
+
+
+class RequestMetricsMiddleware:
+    """
+    Per-request view name, latency, query count and time, and repeated
+    query fingerprints (the usual sign of an N+1).
+
+    Results go to a Server-Timing header, one JSON log line on the
+    `fintrack.requests` logger, and the histograms behind the metrics
+    endpoint. Opt-in with REQUEST_METRICS_ENABLED; when off, Django drops
+    the middleware at startup so it costs nothing.
+
+    Works in both sync and async chains. Queries on threads the request
+    starts itself (the dashboard pool) count only when that code installs
+    `current_recorder` with `recording`, as core.dashboard does.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            with recording(recorder):
+                response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        # Connections belong to threads, and every sync_to_async call in one
+        # request runs on the same thread, so the wrappers go on there
+        stack = ExitStack()
+        await sync_to_async(stack.enter_context)(recording(recorder))
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            current_recorder.reset(token)
+
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        """Report one request's measurements and return its response"""
+        duration = time.perf_counter() - started
+        duplicates = recorder.duplicates()
+        view = view_name(request)
+
+        response['Server-Timing'] = (
+            f'app;dur={duration * 1000:.1f}, '
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"'
+        )
+
+        registry.observe(
+            view=view,
+            method=request.method,
+            status_code=response.status_code,
+            duration=duration,
+            db_duration=recorder.duration,
+            db_queries=recorder.count,
+            duplicates=sum(item['count'] - 1 for item in duplicates)
+        )
+
+        logger.info(json.dumps({
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'db_queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 2),
+            'duplicate_queries': duplicates,
+        }))
+
+        return response
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from budget.models import Budget
+from report.models import Report, ReportSchedule
+from transactions.models import Category
+from transactions.signals import transactions_changed
+from .cache import bump_data_version
+
+
+@receiver(transactions_changed)
+def invalidate_on_transactions_changed(sender, deltas, **kwargs):
+    """Signal to invalidate cached responses after any transaction write, including bulk ones"""
+    for user_id in {delta.user_id for delta in deltas}:
+        bump_data_version(user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+@receiver(post_save, sender=ReportSchedule)
+@receiver(post_delete, sender=ReportSchedule)
+def invalidate_on_user_data_change(sender, instance, **kwargs):
+    """Signal to invalidate cached responses when a user's categories, budgets or reports change"""
+    bump_data_version(instance.user_id)
@@ -0,0 +1,44 @@
+"""
+Streaming responses that stay streaming under both WSGI and ASGI.
+
+Under ASGI, StreamingHttpResponse reads a plain (sync) iterator into a
+list before sending anything, so an export would sit in memory whole.
+`streaming_content` hands ASGI an async iterator instead. It pulls the
+sync iterator a few items at a time on the request's sync thread, which
+keeps the database cursor on one connection. WSGI keeps the sync
+iterator as it is.
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+
+def _take(iterator, count):
+    return list(islice(iterator, count))
+
+
+async def _aiterate(iterator, per_call):
+    take = sync_to_async(_take)
+    while True:
+        items = await take(iterator, per_call)
+        if not items:
+            return
+        for item in items:
+            yield item
+
+
+def streaming_content(request, iterator, per_call=1):
+    """
+    Content for a StreamingHttpResponse answering `request`.
+
+    Args:
+        request: Django or DRF request being answered
+        iterator: Sync iterator of response chunks
+        per_call: Chunks pulled per thread hop under ASGI; raise it for
+            iterators that yield many small pieces
+    """
+    request = getattr(request, '_request', request)
+    if isinstance(request, ASGIRequest):
+        return _aiterate(iter(iterator), per_call)
+    return iterator
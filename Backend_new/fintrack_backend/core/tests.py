@@ -0,0 +1,313 @@
+import json
+import logging
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import QueryDict
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.authentication import CachedJWTAuthentication
+from accounts.models import User
+from budget.models import Budget
+from transactions.models import Category, Transaction
+from .benchmark import ENDPOINTS, seed
+from .dashboard import section_request
+from .metrics import fingerprint, registry
+from .middleware import QueryRecorder
+
+
+class ResponseCacheTests(APITestCase):
+    """Analytics responses are cached per user and invalidated by writes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='cache@example.com', username='cache', password='pass12345'
+        )
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.get(user=self.user, name='Food & Dining')
+
+    def create_transaction(self, **kwargs):
+        values = {
+            'user': self.user,
+            'category': self.food,
+            'amount': Decimal('10.00'),
+            'date': date(2025, 1, 10),
+            'merchant': 'Cafe',
+            'type': 'expense',
+        }
+        values.update(kwargs)
+        return Transaction.objects.create(**values)
+
+    def test_second_request_is_served_from_cache(self):
+        self.create_transaction()
+        first = self.client.get('/api/v1/transactions/stats/')
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/v1/transactions/stats/')
+
+        self.assertEqual(first.data, second.data)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.create_transaction()
+        self.create_transaction(date=date(2025, 2, 10))
+
+        everything = self.client.get('/api/v1/transactions/stats/')
+        january = self.client.get('/api/v1/transactions/stats/', {'end_date': '2025-01-31'})
+
+        self.assertEqual(everything.data['transaction_count'], 2)
+        self.assertEqual(january.data['transaction_count'], 1)
+
+    def test_writes_invalidate(self):
+        self.create_transaction()
+        self.assertEqual(self.client.get('/api/v1/transactions/stats/').data['transaction_count'], 1)
+
+        self.client.post('/api/v1/transactions/bulk_import/', [
+            {'date': '2025-01-11', 'merchant': 'Shop', 'type': 'expense', 'amount': '5.00'}
+        ], format='json')
+        self.assertEqual(self.client.get('/api/v1/transactions/stats/').data['transaction_count'], 2)
+
+        self.assertEqual(self.client.get('/api/v1/budgets/summary/').data['budget_count'], 0)
+        Budget.objects.create(
+            user=self.user, category=self.food, amount=Decimal('50.00'),
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31)
+        )
+        self.assertEqual(self.client.get('/api/v1/budgets/summary/').data['budget_count'], 1)
+
+        def cafe_category():
+            recent = self.client.get('/api/v1/transactions/recent/')
+            cafe = next(row for row in recent.data if row['merchant'] == 'Cafe')
+            return cafe['category_detail']['name']
+
+        self.assertEqual(cafe_category(), 'Food & Dining')
+        self.food.name = 'Groceries'
+        self.food.save()
+        self.assertEqual(cafe_category(), 'Groceries')
+
+    def test_users_do_not_share_entries(self):
+        self.create_transaction()
+        self.client.get('/api/v1/transactions/stats/')
+
+        other = User.objects.create_user(email='other@example.com', username='other', password='pass12345')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get('/api/v1/transactions/stats/').data['transaction_count'], 0)
+
+    def test_stats_endpoint_is_admin_only(self):
+        self.client.get('/api/v1/transactions/stats/')
+        self.client.get('/api/v1/transactions/stats/')
+        self.assertEqual(self.client.get('/api/v1/cache/stats/').status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/v1/cache/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.data['transactions.stats']['hits'], 1)
+
+
+class DashboardTests(APITestCase):
+    """The dashboard endpoint combines the dashboard's reads into one response"""
+
+    sections = {'stats', 'trends', 'recent', 'budgets', 'budget_summary', 'report_stats'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='dash@example.com', username='dash', password='pass12345'
+        )
+        self.food = Category.objects.get(user=self.user, name='Food & Dining')
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('12.50'),
+            date=date(2025, 1, 10), merchant='Cafe', type='expense'
+        )
+
+    @override_settings(DASHBOARD_MAX_WORKERS=0)
+    def test_combines_sections(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/v1/dashboard/', {'start_date': '2025-01-01', 'end_date': '2025-01-31'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), self.sections)
+        self.assertEqual(data['stats']['total_expenses'], '12.50')
+        self.assertEqual(len(data['trends']), 31)
+        self.assertEqual(data['recent'][0]['merchant'], 'Cafe')
+        self.assertEqual(data['report_stats']['total_reports'], 0)
+
+    @override_settings(DASHBOARD_MAX_WORKERS=0)
+    def test_authenticates_once(self):
+        token = RefreshToken.for_user(self.user).access_token
+
+        with mock.patch.object(
+            CachedJWTAuthentication, 'get_user', autospec=True, side_effect=CachedJWTAuthentication.get_user
+        ) as get_user:
+            response = self.client.get('/api/v1/dashboard/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['recent'][0]['merchant'], 'Cafe')
+        self.assertEqual(get_user.call_count, 1)
+
+    def test_sections_get_their_own_request(self):
+        request = RequestFactory().post('/api/v1/dashboard/?x=1', {'a': 1}, HTTP_AUTHORIZATION='Bearer abc')
+        params = QueryDict('start_date=2025-01-01')
+
+        section = section_request(request, params, user=self.user, auth='abc')
+
+        self.assertIsNot(section, request)
+        self.assertEqual((section.method, section.path, section.GET), ('GET', '/api/v1/dashboard/', params))
+        self.assertEqual(section.META['HTTP_AUTHORIZATION'], 'Bearer abc')
+        self.assertNotIn('wsgi.input', section.META)
+        self.assertEqual(section.dashboard_auth, (self.user, 'abc'))
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get('/api/v1/dashboard/').status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.client.get('/api/v1/dashboard/').status_code, 401)
+
+
+class PooledDashboardTests(TransactionTestCase):
+    """Sections run on the thread pool, each with its own connection"""
+
+    def test_runs_sections_concurrently(self):
+        cache.clear()
+        user = User.objects.create_user(email='pool@example.com', username='pool', password='pass12345')
+        token = RefreshToken.for_user(user).access_token
+
+        response = self.client.get('/api/v1/dashboard/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), DashboardTests.sections)
+        self.assertEqual(data['budget_summary']['budget_count'], 0)
+        self.assertEqual(data['stats']['transaction_count'], 0)
+
+    @override_settings(REQUEST_METRICS_ENABLED=True)
+    def test_metrics_count_pool_queries(self):
+        cache.clear()
+        user = User.objects.create_user(email='poolmetrics@example.com', username='poolmetrics', password='pass12345')
+        token = RefreshToken.for_user(user).access_token
+
+        with self.assertLogs('fintrack.requests', level='INFO') as logs:
+            self.client.get('/api/v1/dashboard/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        # Every section misses the cache and queries on a pool thread
+        record = json.loads(logs.records[0].getMessage())
+        self.assertGreaterEqual(record['db_queries'], len(DashboardTests.sections))
+
+
+class BenchmarkCommandTests(TestCase):
+
+    @override_settings(DASHBOARD_MAX_WORKERS=0)
+    def test_writes_results_for_every_endpoint(self):
+        cache.clear()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command(
+                'benchmark_api', users=2, transactions=30, sample_users=2, requests=2,
+                output=output, stdout=StringIO()
+            )
+            with open(output) as handle:
+                results = json.load(handle)
+
+        self.assertEqual(set(results['endpoints']), {item.name for item in ENDPOINTS})
+        for name, row in results['endpoints'].items():
+            self.assertTrue(all(int(code) < 400 for code in row['status_codes']), (name, row['status_codes']))
+            self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+        # Seeding tops users up rather than duplicating them
+        seed(2, 30)
+        self.assertEqual(Transaction.objects.filter(user__username='benchmark0').count(), 30)
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        # Requests outside assertLogs would print their log lines to the console
+        patcher = mock.patch.object(logging.getLogger('fintrack.requests'), 'handlers', [logging.NullHandler()])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            email='metrics@example.com', username='metrics', password='pass12345', is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "n" = 5 AND "s" = \'x\''),
+            'SELECT * FROM "t" WHERE "id" IN (...) AND "n" = ? AND "s" = ?'
+        )
+
+    def test_recorder_groups_duplicates(self):
+        recorder = QueryRecorder()
+        for pk in (1, 2, 3):
+            recorder(lambda *args: None, f'SELECT * FROM "budget" WHERE "id" = {pk}', None, False, {})
+        recorder(lambda *args: None, 'SELECT COUNT(*) FROM "budget"', None, False, {})
+
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(recorder.duplicates(), [
+            {'fingerprint': 'SELECT * FROM "budget" WHERE "id" = ?', 'count': 3},
+        ])
+
+    def test_records_timing_queries_and_duplicates(self):
+        with self.assertLogs('fintrack.requests', level='INFO') as logs:
+            response = self.client.get('/api/v1/budgets/summary/')
+
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'BudgetViewSet.summary')
+        self.assertEqual(record['status'], 200)
+        # The summary is one grouped query, so nothing repeats
+        self.assertEqual(record['db_queries'], 1)
+        self.assertEqual(record['duplicate_queries'], [])
+
+        metrics = self.client.get('/api/v1/metrics/')
+        self.assertEqual(metrics.status_code, 200)
+        body = metrics.content.decode()
+        self.assertIn('fintrack_request_duration_seconds_count{view="BudgetViewSet.summary",method="GET"} 1', body)
+        self.assertRegex(body, r'fintrack_response_cache_misses_total\{endpoint="budgets.summary"\} [1-9]')
+
+    async def test_records_async_requests(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+
+        with self.assertLogs('fintrack.requests', level='INFO') as logs:
+            response = await self.async_client.get(
+                '/api/v1/budgets/summary/', headers={'Authorization': f'Bearer {token}'}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Server-Timing', response)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'BudgetViewSet.summary')
+        self.assertGreaterEqual(record['db_queries'], 1)
+
+    def test_method_labels_are_bounded_and_escaped(self):
+        registry.observe('View"get', 'BREW', 200, 0.01, 0.0, 0, 0)
+        registry.observe('View"get', 'PROPFIND', 200, 0.01, 0.0, 0, 0)
+
+        body = registry.render()
+        self.assertIn('fintrack_responses_total{view="View\\"get",method="other",status="200"} 2', body)
+        self.assertNotIn('BREW', body)
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/metrics/').status_code, 403)
+
+
+class RequestMetricsDisabledTests(APITestCase):
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_middleware_is_dropped(self):
+        user = User.objects.create_user(email='off@example.com', username='off', password='pass12345')
+        self.client.force_authenticate(user)
+        self.assertNotIn('Server-Timing', self.client.get('/api/v1/budgets/summary/'))
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CacheStatsView, DashboardView, MetricsView
+
+urlpatterns = [
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+]
@@ -0,0 +1,82 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from ..cache import cache_stats
+from ..dashboard import load_sections
+from ..metrics import registry
+
+
+class CacheStatsView(APIView):
+    """Response cache hit/miss counters for this process (Admin only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+
+class MetricsView(APIView):
+    """Request histograms and cache counters in Prometheus text format (Admin only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _authenticate(request):
+    """Resolve the user and token with the API's authentication classes"""
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    return drf_request.user, drf_request.auth
+
+
+class DashboardView(View):
+    """
+    Everything the dashboard shows in one response: stats, trends, recent
+    transactions, budgets, budget summary and report stats.
+
+    An async view, so under ASGI the section queries run concurrently and
+    the response takes about as long as the slowest one. Query params
+    (e.g. start_date, end_date) are passed to every section.
+    """
+    renderer = JSONRenderer()
+
+    async def get(self, request):
+        try:
+            user, auth = await sync_to_async(_authenticate)(request)
+        except APIException as exc:
+            return self.render({'detail': exc.detail}, exc.status_code)
+
+        if not user.is_authenticated:
+            return self.render(
+                {'detail': 'Authentication credentials were not provided.'},
+                status.HTTP_401_UNAUTHORIZED
+            )
+
+        sections = await load_sections(request, request.GET, user=user, auth=auth)
+
+        data = {}
+        for name, (status_code, section_data) in sections.items():
+            if status_code >= 400:
+                data[name] = {'error': section_data, 'status': status_code}
+            else:
+                data[name] = section_data
+
+        return self.render(data)
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(
+            self.renderer.render(data),
+            content_type='application/json',
+            status=status_code
+        )
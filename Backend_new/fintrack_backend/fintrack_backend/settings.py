@@ -1,7 +1,10 @@
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+import dj_database_url
+
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,7 +34,8 @@ WEBPAGE_APPS = [
     'budget',
     'analytics',
     'report',
-    # 'core',
+    'core',
+    'sync',
 ]
 
 INSTALLED_APPS = [
@@ -44,6 +48,7 @@ INSTALLED_APPS = [
 ] + PACKAGE_APPS + WEBPAGE_APPS
 
 MIDDLEWARE = [
+    "core.middleware.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -95,6 +100,67 @@ DATABASES = {
     }
 }
 
+# Allow pointing at another database (e.g. sqlite:///db.sqlite3 for local test runs)
+if os.environ.get("DATABASE_URL"):
+    DATABASES["default"] = dj_database_url.parse(os.environ["DATABASE_URL"])
+
+
+# Cache
+# Local memory by default (per process, size-bounded by MAX_ENTRIES); set
+# REDIS_URL to share one cache between workers. Redis evicts according to
+# its maxmemory-policy.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    "auth": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "auth",
+        "TIMEOUT": 60,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+        "TIMEOUT": 300,
+    }
+    # Shared, so a user change invalidates every worker at once
+    CACHES["auth"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+        "TIMEOUT": 60,
+    }
+
+# Cache used for per-user analytics responses (see core.cache)
+RESPONSE_CACHE_ALIAS = "default"
+
+# Cache of users resolved from JWTs (see accounts.authentication)
+AUTH_USER_CACHE_ALIAS = "auth"
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Threads per process for concurrent dashboard sections (0 runs them inline)
+DASHBOARD_MAX_WORKERS = 6
+
+# Per-request timing and query metrics (see core.middleware), off unless REQUEST_METRICS=1
+REQUEST_METRICS_ENABLED = os.environ.get("REQUEST_METRICS") == "1"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "fintrack.requests": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -116,10 +182,13 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     )
 }
 
+# Bulk transaction imports post tens of thousands of rows as JSON
+DATA_UPLOAD_MAX_MEMORY_SIZE = 25 * 1024 * 1024
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
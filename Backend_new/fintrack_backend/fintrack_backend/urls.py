@@ -24,6 +24,9 @@ urlpatterns = [
     path('api/v1/', include('transactions.v1.urls')),
     path('api/v1/', include('budget.v1.urls')),
     path('api/v1/reports/', include('report.v1.urls')),
+    path('api/v1/analytics/', include('analytics.v1.urls')),
+    path('api/v1/', include('core.v1.urls')),
+    path('api/v1/sync/', include('sync.v1.urls')),
     
     # Swagger API Documentation URLs
     path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
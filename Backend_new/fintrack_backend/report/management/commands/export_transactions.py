@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from report import columnar
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = "Write every user's transactions as a columnar dataset partitioned by user (user_id=<id>/)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Directory to write the dataset into')
+        parser.add_argument(
+            '--format',
+            choices=sorted(columnar.CONTENT_TYPES),
+            default='parquet',
+            help='File format (default parquet)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=columnar.DEFAULT_BATCH_SIZE,
+            help=f'Rows per record batch (default {columnar.DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument('--user', type=int, help='Only export this user id')
+
+    def handle(self, *args, **options):
+        queryset = Transaction.objects.order_by('user_id', 'date', 'id')
+        if options['user'] is not None:
+            queryset = queryset.filter(user_id=options['user'])
+
+        output = Path(options['output'])
+        # The directory name carries user_id, as partitioned dataset readers expect
+        schema = columnar.SCHEMA.remove(columnar.SCHEMA.get_field_index('user_id'))
+        extension = columnar.EXTENSIONS[options['format']]
+        writer = None
+        user_id = None
+        users = rows = 0
+
+        try:
+            for batch in columnar.record_batches(queryset, options['batch_size'], partition_by_user=True):
+                batch_user = batch.column('user_id')[0].as_py()
+                if batch_user != user_id:
+                    if writer is not None:
+                        writer.close()
+                    user_id = batch_user
+                    directory = output / f'user_id={user_id}'
+                    directory.mkdir(parents=True, exist_ok=True)
+                    writer = columnar.open_writer(options['format'], str(directory / f'part-0.{extension}'), schema)
+                    users += 1
+
+                writer.write_batch(batch.drop_columns(['user_id']))
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Exported {rows} transactions for {users} users to {output}'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from report.scheduler import ScheduleWorker
+
+
+class Command(BaseCommand):
+    help = "Run due report schedules, polling for new ones until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Schedules claimed per transaction (default 100)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=30,
+            help='Seconds to wait when nothing is due (default 30)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no schedules are due instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        worker = ScheduleWorker(
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval']
+        )
+
+        try:
+            count = worker.run(once=options['once'])
+        except KeyboardInterrupt:
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {count} report schedules'))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("report", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="report",
+            name="snapshot",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name="ReportDirtyDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "report",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dirty_days",
+                        to="report.report",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("report", "date")},
+            },
+        ),
+    ]
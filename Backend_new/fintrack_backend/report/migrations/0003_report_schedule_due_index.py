@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("report", "0002_report_snapshot"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reportschedule",
+            index=models.Index(
+                fields=["is_active", "next_generation"], name="report_schedule_due"
+            ),
+        ),
+    ]
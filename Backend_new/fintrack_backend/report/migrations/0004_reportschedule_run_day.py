@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:47
+
+import datetime
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay
+
+
+def populate_run_day(apps, schema_editor):
+    ReportSchedule = apps.get_model("report", "ReportSchedule")
+    # Schedules already clamped by a short month keep the day they are on
+    ReportSchedule.objects.update(
+        run_day=ExtractDay("next_generation", tzinfo=datetime.timezone.utc)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("report", "0003_report_schedule_due_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportschedule",
+            name="run_day",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_run_day, migrations.RunPython.noop),
+    ]
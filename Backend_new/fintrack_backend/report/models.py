@@ -1,4 +1,6 @@
 # reports/models.py
+from datetime import timezone as dt_timezone
+
 from django.db import models
 from django.conf import settings
 
@@ -32,6 +34,9 @@ class Report(models.Model):
     spending_ratio = models.FloatField(default=0)
     avg_transactions_per_day = models.FloatField(default=0)
 
+    # Materialized per-day totals by category, see report/snapshots.py
+    snapshot = models.JSONField(default=dict, blank=True)
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -47,6 +52,22 @@ class Report(models.Model):
         return f"{self.title} - {self.user.username}"
 
 
+class ReportDirtyDay(models.Model):
+    """A day whose transactions changed after the report's snapshot was built"""
+    report = models.ForeignKey(
+        Report,
+        on_delete=models.CASCADE,
+        related_name='dirty_days'
+    )
+    date = models.DateField()
+
+    class Meta:
+        unique_together = [('report', 'date')]
+
+    def __str__(self):
+        return f"{self.report_id} {self.date}"
+
+
 class ReportSchedule(models.Model):
     """Model for scheduling automated reports"""
     FREQUENCY_CHOICES = [
@@ -69,12 +90,24 @@ class ReportSchedule(models.Model):
 
     last_generated = models.DateTimeField(null=True, blank=True)
     next_generation = models.DateTimeField()
+    # Day of the month monthly and quarterly runs fall on, so a run clamped
+    # to the end of a short month returns to it afterwards
+    run_day = models.PositiveSmallIntegerField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Lets workers find due schedules without scanning inactive ones
+            models.Index(fields=['is_active', 'next_generation'], name='report_schedule_due'),
+        ]
 
     def __str__(self):
-        return f"{self.name} - {self.get_frequency_display()}"
\ No newline at end of file
+        return f"{self.name} - {self.get_frequency_display()}"
+
+    def save(self, *args, **kwargs):
+        if self.run_day is None:
+            self.run_day = self.next_generation.astimezone(dt_timezone.utc).day
+        super().save(*args, **kwargs)
\ No newline at end of file
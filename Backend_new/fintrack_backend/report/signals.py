@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+
+from transactions.signals import transactions_changed
+from .snapshots import mark_dirty
+
+
+@receiver(transactions_changed)
+def mark_report_days_dirty(sender, deltas, **kwargs):
+    """Queue changed days for refresh on the saved reports that cover them"""
+    mark_dirty(deltas)
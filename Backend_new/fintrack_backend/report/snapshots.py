@@ -0,0 +1,228 @@
+"""
+A saved report keeps a snapshot of its range as
+
+    {'days': {'2025-01-10': [[category_id, type, '12.50', 3], ...], ...}}
+
+i.e. one entry per rollup bucket, grouped by day. Totals, the category
+breakdown and the daily series are all derived from it, so serving a
+report never touches transactions. When transactions inside the range
+change, `transactions_changed` records the affected days in
+ReportDirtyDay and only those days are re-read from the rollups.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+
+from transactions.models import DailyTransactionRollup
+from transactions.rollups import merge_deltas
+from .models import Report, ReportDirtyDay
+from .v1.services import ReportService
+
+
+def read_days(user_id, start_date, end_date, report_type='all', dates=None):
+    """
+    Read a user's rollup buckets for a date range, grouped by ISO day.
+    `dates` narrows the read to just those days of the range.
+    """
+    rollups = DailyTransactionRollup.objects.filter(
+        user_id=user_id,
+        date__gte=start_date,
+        date__lte=end_date
+    )
+    if dates is not None:
+        rollups = rollups.filter(date__in=dates)
+
+    if report_type != 'all':
+        rollups = rollups.filter(type=report_type)
+
+    days = {}
+    for day, category_id, trans_type, total, count in rollups.order_by('date').values_list(
+        'date', 'category_id', 'type', 'total', 'count'
+    ):
+        days.setdefault(day.isoformat(), []).append([category_id, trans_type, str(total), count])
+
+    return days
+
+
+def filter_days(days, report_type):
+    """Narrow days read for 'all' down to one report type"""
+    if report_type == 'all':
+        return days
+
+    filtered = {}
+    for day, buckets in days.items():
+        kept = [bucket for bucket in buckets if bucket[1] == report_type]
+        if kept:
+            filtered[day] = kept
+    return filtered
+
+
+def _apply_summary(report):
+    """Copy snapshot totals into the report's scalar columns"""
+    totals = {'income': Decimal('0.00'), 'expense': Decimal('0.00')}
+    transaction_count = 0
+    for buckets in report.snapshot['days'].values():
+        for _, trans_type, total, count in buckets:
+            totals[trans_type] += Decimal(total)
+            transaction_count += count
+
+    insights = ReportService._calculate_insights(
+        total_income=totals['income'],
+        total_expenses=totals['expense'],
+        transaction_count=transaction_count,
+        start_date=str(report.start_date),
+        end_date=str(report.end_date)
+    )
+
+    report.total_transactions = transaction_count
+    report.total_income = totals['income']
+    report.total_expenses = totals['expense']
+    report.net_amount = totals['income'] - totals['expense']
+    report.spending_ratio = insights['spending_ratio']
+    report.avg_transactions_per_day = insights['avg_transactions_per_day']
+
+
+SNAPSHOT_FIELDS = [
+    'snapshot',
+    'total_transactions',
+    'total_income',
+    'total_expenses',
+    'net_amount',
+    'spending_ratio',
+    'avg_transactions_per_day',
+]
+
+
+def build_snapshot(report, days=None):
+    """
+    Build the report's snapshot from scratch and fill in its totals.
+    `days` may be passed in when already read with read_days.
+    The caller saves the report; pending dirty days of a saved report are discarded.
+    """
+    if days is None:
+        days = read_days(report.user_id, report.start_date, report.end_date, report.report_type)
+
+    report.snapshot = {'days': days}
+    _apply_summary(report)
+
+    if report.pk:
+        ReportDirtyDay.objects.filter(report=report).delete()
+
+    return report
+
+
+def refresh_snapshot(report):
+    """
+    Bring a saved report's snapshot up to date, recomputing only dirty days.
+
+    Returns:
+        bool: Whether the report was changed
+    """
+    if not report.snapshot:
+        with transaction.atomic():
+            build_snapshot(report)
+            report.save(update_fields=SNAPSHOT_FIELDS)
+        return True
+
+    if not report.dirty_days.exists():
+        return False
+
+    with transaction.atomic():
+        # Lock the row so concurrent refreshes don't overwrite each other's days
+        locked = Report.objects.select_for_update().only('snapshot').get(pk=report.pk)
+        report.snapshot = locked.snapshot
+
+        dirty = list(report.dirty_days.values_list('id', 'date'))
+        if not dirty:
+            return False
+
+        dates = [day for _, day in dirty]
+        # Only the dirty days, not every day between the first and last
+        fresh = read_days(report.user_id, min(dates), max(dates), report.report_type, dates=dates)
+        days = report.snapshot['days']
+        for day in dates:
+            key = day.isoformat()
+            if key in fresh:
+                days[key] = fresh[key]
+            else:
+                days.pop(key, None)
+
+        _apply_summary(report)
+        report.save(update_fields=SNAPSHOT_FIELDS)
+        # Delete by id so days dirtied during the refresh stay queued
+        ReportDirtyDay.objects.filter(id__in=[pk for pk, _ in dirty]).delete()
+
+    return True
+
+
+def mark_dirty(deltas):
+    """Queue the days touched by transaction deltas on every saved report covering them"""
+    deltas = merge_deltas(deltas)
+    if not deltas:
+        return
+
+    changed = {}
+    for delta in deltas:
+        changed.setdefault(delta.user_id, set()).add((delta.date, delta.type))
+
+    reports = Report.objects.filter(
+        user_id__in=changed,
+        start_date__lte=max(delta.date for delta in deltas),
+        end_date__gte=min(delta.date for delta in deltas)
+    ).values_list('id', 'user_id', 'report_type', 'start_date', 'end_date')
+
+    dirty = {
+        (report_id, day)
+        for report_id, user_id, report_type, start_date, end_date in reports
+        for day, trans_type in changed[user_id]
+        if start_date <= day <= end_date and report_type in ('all', trans_type)
+    }
+
+    if dirty:
+        ReportDirtyDay.objects.bulk_create(
+            [ReportDirtyDay(report_id=report_id, date=day) for report_id, day in dirty],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+
+
+def snapshot_series(report):
+    """
+    Derive the category breakdown and the daily series from a report's snapshot.
+
+    Returns:
+        dict: `category_breakdown` shaped like ReportService.get_category_breakdown,
+        and `daily`, one entry per day with activity
+    """
+    categories = {}
+    daily = []
+    for day in sorted(report.snapshot.get('days', {})):
+        totals = {'income': Decimal('0.00'), 'expense': Decimal('0.00')}
+        day_count = 0
+        for category_id, trans_type, total, count in report.snapshot['days'][day]:
+            total = Decimal(total)
+            totals[trans_type] += total
+            day_count += count
+
+            bucket = categories.setdefault((trans_type, category_id), [Decimal('0.00'), 0])
+            bucket[0] += total
+            bucket[1] += count
+
+        daily.append({
+            'date': day,
+            'income': float(totals['income']),
+            'expense': float(totals['expense']),
+            'count': day_count,
+        })
+
+    breakdown = {'income': [], 'expense': []}
+    for (trans_type, category_id), (total, count) in sorted(
+        categories.items(), key=lambda item: item[1][0], reverse=True
+    ):
+        breakdown[trans_type].append({
+            'category': category_id,
+            'total': float(total),
+            'count': count
+        })
+
+    return {'category_breakdown': breakdown, 'daily': daily}
@@ -1,3 +1,390 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from report.models import Report, ReportDirtyDay, ReportSchedule
+from report.scheduler import ScheduleWorker, next_generation_after, report_range
+from transactions.models import Category, DailyTransactionRollup, Transaction
+
+
+class ReportTestCase(APITestCase):
+    """Shared fixtures for report API tests"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='report@example.com', username='report', password='pass12345'
+        )
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.get(user=self.user, name='Food & Dining')
+
+    def create_transaction(self, **kwargs):
+        values = {
+            'user': self.user,
+            'category': self.food,
+            'amount': Decimal('10.00'),
+            'date': date(2025, 1, 10),
+            'merchant': 'Cafe',
+            'type': 'expense',
+        }
+        values.update(kwargs)
+        return Transaction.objects.create(**values)
+
+
+class ReportExportCSVTests(ReportTestCase):
+
+    def test_streams_rows_in_one_query(self):
+        self.create_transaction(notes='Lunch, with team')
+        self.create_transaction(category=None, merchant='Unknown', date=date(2025, 1, 5))
+        self.create_transaction(date=date(2025, 3, 1))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                '/api/v1/reports/export-csv/',
+                {'start_date': '2025-01-01', 'end_date': '2025-01-31'}
+            )
+            content = b''.join(response.streaming_content).decode('utf-8')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(content.splitlines(), [
+            '\ufeffDate,Merchant,Category,Type,Amount,Notes',
+            '2025-01-10,Cafe,Food & Dining,expense,10.00,"Lunch, with team"',
+            '2025-01-05,Unknown,,expense,10.00,',
+        ])
+
+    def test_requires_dates(self):
+        response = self.client.get('/api/v1/reports/export-csv/')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_streams_asynchronously_under_asgi(self):
+        await self.create_transactions_async()
+        token = str(RefreshToken.for_user(self.user).access_token)
+
+        response = await self.async_client.get(
+            '/api/v1/reports/export-csv/',
+            {'start_date': '2025-01-01', 'end_date': '2025-01-31'},
+            headers={'Authorization': f'Bearer {token}'}
+        )
+        # A sync iterator here would be read into a list before sending
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8')
+        self.assertEqual(len(content.splitlines()), 4)
+
+    async def create_transactions_async(self):
+        for day in (3, 2, 1):
+            await Transaction.objects.acreate(
+                user=self.user, category=self.food, amount=Decimal('10.00'),
+                date=date(2025, 1, day), merchant='Cafe', type='expense'
+            )
+
+
+class ReportExportColumnarTests(ReportTestCase):
+
+    def download(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return pa.BufferReader(b''.join(response.streaming_content))
+
+    def test_parquet_keeps_types_and_joins_category(self):
+        self.create_transaction(amount=Decimal('12.34'), notes='Lunch')
+        self.create_transaction(category=None, merchant='Unknown', date=date(2025, 1, 5))
+        self.create_transaction(date=date(2025, 3, 1))
+
+        table = pq.read_table(self.download(
+            '/api/v1/reports/export-parquet/',
+            {'start_date': '2025-01-01', 'end_date': '2025-01-31', 'batch_size': 1}
+        ))
+
+        self.assertEqual(table.schema.field('amount').type, pa.decimal128(10, 2))
+        self.assertEqual(table.schema.field('date').type, pa.date32())
+        rows = table.select(['date', 'merchant', 'amount', 'category_name', 'category_type', 'notes']).to_pylist()
+        self.assertEqual(rows, [
+            {'date': date(2025, 1, 5), 'merchant': 'Unknown', 'amount': Decimal('10.00'),
+             'category_name': None, 'category_type': None, 'notes': None},
+            {'date': date(2025, 1, 10), 'merchant': 'Cafe', 'amount': Decimal('12.34'),
+             'category_name': 'Food & Dining', 'category_type': 'expense', 'notes': 'Lunch'},
+        ])
+        self.assertEqual(pq.ParquetFile(self.download(
+            '/api/v1/reports/export-parquet/', {'batch_size': 2}
+        )).metadata.num_row_groups, 2)
+
+    def test_arrow_stream_only_includes_own_rows(self):
+        other = User.objects.create_user(email='other@example.com', username='other', password='pass12345')
+        Transaction.objects.create(
+            user=other, amount=Decimal('5.00'), date=date(2025, 1, 10), merchant='Other', type='expense'
+        )
+        self.create_transaction()
+
+        table = pa.ipc.open_stream(self.download('/api/v1/reports/export-arrow/')).read_all()
+
+        self.assertEqual(table.column('user_id').to_pylist(), [self.user.id])
+
+    def test_empty_export_is_a_valid_file(self):
+        table = pq.read_table(self.download('/api/v1/reports/export-parquet/'))
+        self.assertEqual(table.num_rows, 0)
+
+    def test_rejects_bad_params(self):
+        for params in ({'start_date': 'soon'}, {'batch_size': '0'}):
+            response = self.client.get('/api/v1/reports/export-parquet/', params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_all_users_export_is_admin_only_and_partitioned(self):
+        response = self.client.get('/api/v1/reports/export-parquet/all/')
+        self.assertEqual(response.status_code, 403)
+
+        admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='pass12345')
+        Transaction.objects.create(
+            user=admin, amount=Decimal('5.00'), date=date(2025, 1, 1), merchant='Shop', type='expense'
+        )
+        self.create_transaction()
+        self.create_transaction(date=date(2025, 1, 11))
+        self.client.force_authenticate(admin)
+
+        parquet = pq.ParquetFile(self.download('/api/v1/reports/export-parquet/all/', {'batch_size': 10}))
+
+        # One row group per user
+        self.assertEqual(parquet.metadata.num_row_groups, 2)
+        for index in range(2):
+            users = parquet.read_row_group(index, columns=['user_id']).column('user_id').to_pylist()
+            self.assertEqual(len(set(users)), 1)
+
+        with tempfile.TemporaryDirectory() as output:
+            call_command('export_transactions', output, stdout=StringIO())
+            self.assertEqual(
+                sorted(path.name for path in Path(output).iterdir()),
+                sorted(f'user_id={user.id}' for user in (self.user, admin))
+            )
+            table = pq.read_table(output, filters=[('user_id', '=', self.user.id)])
+            self.assertEqual(table.num_rows, 2)
+
+
+class ReportGenerateTests(ReportTestCase):
+
+    def generate(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                '/api/v1/reports/generate/',
+                {'start_date': '2025-01-01', 'end_date': '2025-01-31'}
+            )
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_is_bounded(self):
+        categories = list(Category.objects.filter(user=self.user))
+        self.create_transaction()
+        _, baseline = self.generate()
+
+        for category in categories[:8]:
+            self.create_transaction(category=category)
+        response, count = self.generate()
+
+        self.assertEqual(count, baseline)
+        self.assertEqual(response.data['summary']['total_transactions'], 9)
+        self.assertEqual(len(response.data['transactions']), 9)
+
+
+class SavedReportSnapshotTests(ReportTestCase):
+    """Saved reports serve a stored snapshot and refresh only changed days"""
+
+    def create_report(self, **kwargs):
+        values = {'title': 'January', 'report_type': 'all', 'start_date': '2025-01-01', 'end_date': '2025-01-31'}
+        values.update(kwargs)
+        response = self.client.post('/api/v1/reports/saved/', values, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def retrieve(self, report_id):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/v1/reports/saved/{report_id}/')
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(ctx.captured_queries)
+
+    def test_create_builds_snapshot(self):
+        self.create_transaction()
+        self.create_transaction(date=date(2025, 1, 12), amount=Decimal('5.00'))
+        self.create_transaction(type='income', category=None, amount=Decimal('100.00'))
+        self.create_transaction(date=date(2025, 2, 1))
+
+        created = self.create_report()
+        self.assertEqual(created['total_transactions'], 3)
+        self.assertEqual(created['total_expenses'], '15.00')
+
+        data, _ = self.retrieve(created['id'])
+        self.assertEqual(data['category_breakdown']['expense'], [
+            {'category': self.food.id, 'total': 15.0, 'count': 2}
+        ])
+        self.assertEqual(data['daily'], [
+            {'date': '2025-01-10', 'income': 100.0, 'expense': 10.0, 'count': 2},
+            {'date': '2025-01-12', 'income': 0.0, 'expense': 5.0, 'count': 1},
+        ])
+
+    def test_refreshes_only_dirty_days(self):
+        kept = self.create_transaction()
+        changed = self.create_transaction(date=date(2025, 1, 20))
+        report = self.create_report(report_type='expense')
+
+        _, clean_queries = self.retrieve(report['id'])
+
+        changed.amount = Decimal('30.00')
+        changed.save()
+        self.create_transaction(date=date(2025, 1, 21), type='income', amount=Decimal('1.00'))
+        self.create_transaction(date=date(2025, 3, 1))
+        self.assertEqual(
+            list(Report.objects.get(pk=report['id']).dirty_days.values_list('date', flat=True)),
+            [date(2025, 1, 20)]
+        )
+
+        data, _ = self.retrieve(report['id'])
+        self.assertEqual(data['total_expenses'], '40.00')
+        self.assertEqual([day['expense'] for day in data['daily']], [10.0, 30.0])
+
+        kept.delete()
+        data, _ = self.retrieve(report['id'])
+        self.assertEqual(data['total_transactions'], 1)
+        self.assertEqual(data['daily'], [{'date': '2025-01-20', 'income': 0.0, 'expense': 30.0, 'count': 1}])
+
+        _, queries = self.retrieve(report['id'])
+        self.assertEqual(queries, clean_queries)
+        self.assertFalse(ReportDirtyDay.objects.exists())
+
+    def test_refresh_reads_only_dirty_dates(self):
+        self.create_transaction(date=date(2025, 1, 15))
+        report = self.create_report()
+        self.create_transaction(date=date(2025, 1, 2))
+        self.create_transaction(date=date(2025, 1, 30))
+
+        with CaptureQueriesContext(connection) as ctx:
+            data, _ = self.retrieve(report['id'])
+
+        self.assertEqual(data['total_transactions'], 3)
+        rollup_reads = [q['sql'] for q in ctx.captured_queries if DailyTransactionRollup._meta.db_table in q['sql']]
+        self.assertEqual(len(rollup_reads), 1)
+        self.assertIn('"date" IN (', rollup_reads[0])
+
+    def test_changing_range_rebuilds(self):
+        self.create_transaction(date=date(2025, 2, 5))
+        report = self.create_report()
+        self.assertEqual(report['total_transactions'], 0)
+
+        response = self.client.patch(
+            f"/api/v1/reports/saved/{report['id']}/", {'end_date': '2025-02-28'}, format='json'
+        )
+        self.assertEqual(response.data['total_transactions'], 1)
+
+
+class ScheduleWorkerTests(ReportTestCase):
+    """The schedule worker runs due schedules in batches against a fake clock"""
+
+    def setUp(self):
+        super().setUp()
+        self.now = datetime(2025, 2, 1, 0, 0, 30, tzinfo=dt_timezone.utc)
+        self.worker = ScheduleWorker(batch_size=10, clock=lambda: self.now, sleep=self.fail)
+        # Closing connections would end the test transaction
+        patcher = mock.patch('report.scheduler.close_old_connections')
+        self.close_old_connections = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_schedule(self, **kwargs):
+        values = {
+            'user': self.user,
+            'name': 'Monthly',
+            'frequency': 'monthly',
+            'report_type': 'all',
+            'next_generation': datetime(2025, 2, 1, tzinfo=dt_timezone.utc),
+        }
+        values.update(kwargs)
+        return ReportSchedule.objects.create(**values)
+
+    def test_report_range(self):
+        due = datetime(2025, 5, 14, tzinfo=dt_timezone.utc)
+        ranges = {
+            frequency: report_range(ReportSchedule(frequency=frequency, next_generation=due))
+            for frequency in ('daily', 'weekly', 'monthly', 'quarterly')
+        }
+        self.assertEqual(ranges, {
+            'daily': (date(2025, 5, 13), date(2025, 5, 13)),
+            'weekly': (date(2025, 5, 7), date(2025, 5, 13)),
+            'monthly': (date(2025, 4, 1), date(2025, 4, 30)),
+            'quarterly': (date(2025, 1, 1), date(2025, 3, 31)),
+        })
+
+    def test_runs_due_schedules_and_advances(self):
+        self.create_transaction()
+        self.create_transaction(type='income', category=None, amount=Decimal('50.00'))
+        monthly = self.create_schedule()
+        self.create_schedule(name='Monthly spend', report_type='expense')
+        daily = self.create_schedule(
+            name='Daily', frequency='daily', next_generation=datetime(2025, 1, 11, tzinfo=dt_timezone.utc)
+        )
+        later = self.create_schedule(next_generation=datetime(2025, 3, 1, tzinfo=dt_timezone.utc))
+        self.create_schedule(is_active=False)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.worker.run(once=True), 3)
+
+        # Claim, one rollup read per (user, range), one INSERT, one UPDATE
+        rollup_reads = [q for q in ctx.captured_queries if DailyTransactionRollup._meta.db_table in q['sql']]
+        self.assertEqual(len(rollup_reads), 2)
+
+        reports = {report.title: report for report in Report.objects.filter(user=self.user)}
+        self.assertEqual(reports['Monthly (2025-01-01 to 2025-01-31)'].net_amount, Decimal('40.00'))
+        self.assertEqual(reports['Monthly spend (2025-01-01 to 2025-01-31)'].total_transactions, 1)
+        self.assertEqual(reports['Daily (2025-01-10 to 2025-01-10)'].total_income, Decimal('50.00'))
+
+        monthly.refresh_from_db()
+        daily.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual(monthly.next_generation, datetime(2025, 3, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(monthly.last_generated, self.now)
+        # A missed daily schedule skips ahead instead of replaying each day
+        self.assertEqual(daily.next_generation, datetime(2025, 2, 2, tzinfo=dt_timezone.utc))
+        self.assertIsNone(later.last_generated)
+
+        self.assertEqual(self.worker.run(once=True), 0)
+
+    def test_month_end_schedules_keep_their_day(self):
+        monthly = self.create_schedule(next_generation=datetime(2025, 1, 31, 6, tzinfo=dt_timezone.utc))
+        quarterly = self.create_schedule(
+            frequency='quarterly', next_generation=datetime(2024, 11, 30, 6, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual((monthly.run_day, quarterly.run_day), (31, 30))
+
+        runs = {monthly.pk: [], quarterly.pk: []}
+        for schedule in (monthly, quarterly):
+            for _ in range(3):
+                schedule.next_generation = next_generation_after(schedule, schedule.next_generation)
+                runs[schedule.pk].append(schedule.next_generation.date())
+
+        self.assertEqual(runs[monthly.pk], [date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)])
+        self.assertEqual(runs[quarterly.pk], [date(2025, 2, 28), date(2025, 5, 30), date(2025, 8, 30)])
+
+        # Moving the next run through the API moves the day with it
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(
+            f'/api/v1/reports/schedules/{monthly.pk}/', {'next_generation': '2025-06-15T06:00:00Z'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        monthly.refresh_from_db()
+        self.assertEqual(monthly.run_day, 15)
+
+    def test_batches(self):
+        for index in range(25):
+            self.create_schedule(name=f'Schedule {index}')
+
+        self.assertEqual(self.worker.run(max_batches=2), 20)
+        self.assertEqual(self.close_old_connections.call_count, 2)
+        self.assertEqual(self.worker.run(once=True), 5)
+        self.assertEqual(Report.objects.filter(user=self.user).count(), 25)
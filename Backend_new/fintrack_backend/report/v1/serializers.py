@@ -1,6 +1,9 @@
 # reports/v1/serializers.py
+from datetime import timezone as dt_timezone
+
 from rest_framework import serializers
 from report.models import Report, ReportSchedule
+from report.snapshots import snapshot_series
 from transactions.v1.serializers import TransactionSerializer
 
 
@@ -49,7 +52,27 @@ class ReportSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        # Totals are computed from the report's snapshot
+        read_only_fields = [
+            'id',
+            'total_transactions',
+            'total_income',
+            'total_expenses',
+            'net_amount',
+            'spending_ratio',
+            'avg_transactions_per_day',
+            'created_at',
+            'updated_at',
+        ]
+
+
+class SavedReportDetailSerializer(ReportSerializer):
+    """Saved report with the category breakdown and daily series from its snapshot"""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data.update(snapshot_series(instance))
+        return data
 
 
 class CategoryBreakdownSerializer(serializers.Serializer):
@@ -75,4 +98,10 @@ class ReportScheduleSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
-        read_only_fields = ['id', 'last_generated', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'last_generated', 'created_at', 'updated_at']
+
+    def validate(self, attrs):
+        # A new next run moves the day later monthly and quarterly runs fall on
+        if 'next_generation' in attrs:
+            attrs['run_day'] = attrs['next_generation'].astimezone(dt_timezone.utc).day
+        return attrs
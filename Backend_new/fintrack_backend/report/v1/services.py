@@ -1,9 +1,9 @@
 # reports/v1/services.py
-from django.db.models import Sum, Count
+from django.db.models import Sum, Q
 from decimal import Decimal
 from datetime import datetime
 
-from transactions.models import Transaction
+from transactions.models import Transaction, DailyTransactionRollup
 
 
 class ReportService:
@@ -24,7 +24,12 @@ class ReportService:
             dict: Report data with summary, insights, and transactions
         """
         # Query transactions
-        queryset = Transaction.objects.filter(
+        queryset = Transaction.objects.for_user(user).in_range(
+            start_date, end_date
+        ).with_related()
+
+        # Daily rollups for the same range carry the totals
+        rollups = DailyTransactionRollup.objects.filter(
             user=user,
             date__gte=start_date,
             date__lte=end_date
@@ -32,15 +37,17 @@ class ReportService:
 
         if report_type != 'all':
             queryset = queryset.filter(type=report_type)
+            rollups = rollups.filter(type=report_type)
 
         # Calculate summary
-        total_income = queryset.filter(type='income').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
-
-        total_expenses = queryset.filter(type='expense').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
+        totals = rollups.aggregate(
+            total_income=Sum('total', filter=Q(type='income')),
+            total_expenses=Sum('total', filter=Q(type='expense')),
+            transaction_count=Sum('count')
+        )
+        total_income = totals['total_income'] or Decimal('0.00')
+        total_expenses = totals['total_expenses'] or Decimal('0.00')
+        transaction_count = totals['transaction_count'] or 0
 
         net_amount = total_income - total_expenses
 
@@ -51,7 +58,7 @@ class ReportService:
         insights = ReportService._calculate_insights(
             total_income=total_income,
             total_expenses=total_expenses,
-            transaction_count=len(transactions),
+            transaction_count=transaction_count,
             start_date=start_date,
             end_date=end_date
         )
@@ -59,7 +66,7 @@ class ReportService:
         # Build report data
         return {
             'summary': {
-                'total_transactions': len(transactions),
+                'total_transactions': transaction_count,
                 'total_income': float(total_income),
                 'total_expenses': float(total_expenses),
                 'net_amount': float(net_amount),
@@ -101,7 +108,7 @@ class ReportService:
         Returns:
             dict: Breakdown by income and expense categories
         """
-        queryset = Transaction.objects.filter(
+        queryset = DailyTransactionRollup.objects.filter(
             user=user,
             date__gte=start_date,
             date__lte=end_date
@@ -114,8 +121,8 @@ class ReportService:
 
         for trans_type in ['income', 'expense']:
             categories = queryset.filter(type=trans_type).values('category').annotate(
-                total=Sum('amount'),
-                count=Count('id')
+                total=Sum('total'),
+                count=Sum('count')
             ).order_by('-total')
 
             breakdown[trans_type] = [
@@ -138,28 +145,17 @@ class ReportService:
             Report: Saved report instance
         """
         from report.models import Report
+        from report.snapshots import build_snapshot
 
-        # Generate report data
-        report_data = ReportService.generate_report(
-            user=user,
-            start_date=start_date,
-            end_date=end_date,
-            report_type=report_type
-        )
-
-        # Create and save report
-        report = Report.objects.create(
+        report = Report(
             user=user,
             title=title,
             report_type=report_type,
-            start_date=start_date,
-            end_date=end_date,
-            total_transactions=report_data['summary']['total_transactions'],
-            total_income=report_data['summary']['total_income'],
-            total_expenses=report_data['summary']['total_expenses'],
-            net_amount=report_data['summary']['net_amount'],
-            spending_ratio=report_data['insights']['spending_ratio'],
-            avg_transactions_per_day=report_data['insights']['avg_transactions_per_day'],
+            start_date=datetime.strptime(start_date, '%Y-%m-%d').date(),
+            end_date=datetime.strptime(end_date, '%Y-%m-%d').date(),
         )
 
-        return report
\ No newline at end of file
+        # Totals come from the snapshot, which later reads refresh incrementally
+        build_snapshot(report).save()
+
+        return report
@@ -4,6 +4,8 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     ReportGenerateView,
     ReportExportCSVView,
+    ReportExportColumnarView,
+    AdminExportColumnarView,
     ReportCategoryBreakdownView,
     ReportViewSet,
     ReportScheduleViewSet,
@@ -19,6 +21,11 @@ urlpatterns = [
     # Report generation and export
     path('generate/', ReportGenerateView.as_view(), name='report-generate'),
     path('export-csv/', ReportExportCSVView.as_view(), name='report-export-csv'),
+    path('export-parquet/', ReportExportColumnarView.as_view(file_format='parquet'), name='report-export-parquet'),
+    path('export-arrow/', ReportExportColumnarView.as_view(file_format='arrow'), name='report-export-arrow'),
+    path('export-parquet/all/', AdminExportColumnarView.as_view(file_format='parquet'),
+         name='report-export-parquet-all'),
+    path('export-arrow/all/', AdminExportColumnarView.as_view(file_format='arrow'), name='report-export-arrow-all'),
     path('category-breakdown/', ReportCategoryBreakdownView.as_view(), name='report-category-breakdown'),
     path('stats/', ReportStatsView.as_view(), name='report-stats'),
 
@@ -1,21 +1,34 @@
 # reports/v1/views.py
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework import status, viewsets
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
 import csv
 
+from core.cache import cached_response
+from core.streaming import streaming_content
 from transactions.models import Transaction
+from report import columnar
 from report.models import  Report, ReportSchedule
+from report.snapshots import build_snapshot, refresh_snapshot
 from .serializers import (
     ReportDetailSerializer,
     ReportSerializer,
     ReportScheduleSerializer,
+    SavedReportDetailSerializer,
 )
 from .services import ReportService
 
 
+class Echo:
+    """Pseudo-buffer whose write() hands the row back, so csv.writer can feed a stream"""
+
+    def write(self, value):
+        return value
+
+
 class ReportGenerateView(APIView):
     """Generate financial report with summary and transactions"""
     permission_classes = [IsAuthenticated]
@@ -53,8 +66,9 @@ class ReportGenerateView(APIView):
 
 
 class ReportExportCSVView(APIView):
-    """Export transactions as CSV file"""
+    """Export transactions as a streamed CSV file"""
     permission_classes = [IsAuthenticated]
+    chunk_size = 2000
 
     def get(self, request):
         start_date = request.query_params.get('start_date')
@@ -68,42 +82,125 @@ class ReportExportCSVView(APIView):
             )
 
         # Query transactions
-        queryset = Transaction.objects.filter(
-            user=request.user,
-            date__gte=start_date,
-            date__lte=end_date
+        queryset = Transaction.objects.for_user(request.user).in_range(
+            start_date, end_date
         ).order_by('-date')
 
         if report_type != 'all':
             queryset = queryset.filter(type=report_type)
 
-        # Create CSV response
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        # Plain tuples with the category name joined in, read through a cursor
+        rows = queryset.values_list(
+            'date', 'merchant', 'category__name', 'type', 'amount', 'notes'
+        ).iterator(chunk_size=self.chunk_size)
+
+        response = StreamingHttpResponse(
+            streaming_content(request, self.stream_rows(rows), per_call=self.chunk_size),
+            content_type='text/csv; charset=utf-8'
+        )
         response['Content-Disposition'] = f'attachment; filename="fintrack-report-{start_date}-to-{end_date}.csv"'
 
+        return response
+
+    @staticmethod
+    def stream_rows(rows):
+        """Yield the CSV one line at a time"""
+        writer = csv.writer(Echo())
+
         # Add BOM for Excel compatibility
-        response.write('\ufeff')
-
-        writer = csv.writer(response)
-        writer.writerow(['Date', 'Merchant', 'Category', 'Type', 'Amount', 'Notes'])
-
-        for transaction in queryset:
-            writer.writerow([
-                transaction.date,
-                transaction.merchant,
-                transaction.category,
-                transaction.type,
-                str(transaction.amount),
-                transaction.notes or ''
+        yield '\ufeff'
+        yield writer.writerow(['Date', 'Merchant', 'Category', 'Type', 'Amount', 'Notes'])
+
+        for date, merchant, category, transaction_type, amount, notes in rows:
+            yield writer.writerow([
+                date,
+                merchant,
+                category or '',
+                transaction_type,
+                str(amount),
+                notes or ''
             ])
 
+
+class ReportExportColumnarView(APIView):
+    """
+    Export transactions, with category name and type joined in, as an
+    Arrow IPC stream or a Parquet file streamed in fixed-size batches.
+
+    Query params:
+        start_date, end_date: Optional date range (whole history by default)
+        type: income, expense or all (default)
+        batch_size: Rows per record batch (default 10000, max 100000)
+    """
+    permission_classes = [IsAuthenticated]
+    file_format = 'parquet'
+    partition_by_user = False
+    max_batch_size = 100000
+
+    def get_queryset(self, request):
+        return Transaction.objects.for_user(request.user).order_by('date', 'id')
+
+    def get_filename(self, request):
+        return f'fintrack-transactions-{request.user.id}'
+
+    def get(self, request):
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        report_type = request.query_params.get('type', 'all')
+
+        try:
+            batch_size = int(request.query_params.get('batch_size', columnar.DEFAULT_BATCH_SIZE))
+            if batch_size < 1:
+                raise ValueError
+            for value in (start_date, end_date):
+                if value and not parse_date(value):
+                    raise ValueError
+        except ValueError:
+            return Response(
+                {'error': 'start_date and end_date must be YYYY-MM-DD and batch_size a positive integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.get_queryset(request).in_range(start_date, end_date)
+        if report_type != 'all':
+            queryset = queryset.filter(type=report_type)
+
+        batches = columnar.record_batches(
+            queryset,
+            batch_size=min(batch_size, self.max_batch_size),
+            partition_by_user=self.partition_by_user
+        )
+
+        response = StreamingHttpResponse(
+            streaming_content(request, columnar.stream_batches(batches, self.file_format)),
+            content_type=columnar.CONTENT_TYPES[self.file_format]
+        )
+        filename = f'{self.get_filename(request)}.{columnar.EXTENSIONS[self.file_format]}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
         return response
 
 
+class AdminExportColumnarView(ReportExportColumnarView):
+    """
+    Every user's transactions in one columnar file, ordered by user. No
+    record batch (Parquet row group) spans two users.
+    """
+    permission_classes = [IsAdminUser]
+    partition_by_user = True
+
+    def get_queryset(self, request):
+        return Transaction.objects.order_by('user_id', 'date', 'id')
+
+    def get_filename(self, request):
+        return 'fintrack-transactions-all'
+
+
 class ReportCategoryBreakdownView(APIView):
     """Get category-wise breakdown for reports"""
     permission_classes = [IsAuthenticated]
 
+    @cached_response('reports.category_breakdown')
     def get(self, request):
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
@@ -131,8 +228,27 @@ class ReportViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Report.objects.filter(user=self.request.user)
 
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return SavedReportDetailSerializer
+        return ReportSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        # Serve the stored snapshot, recomputing only days changed since it was built
+        report = self.get_object()
+        refresh_snapshot(report)
+        return Response(self.get_serializer(report).data)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        report = Report(user=self.request.user, **serializer.validated_data)
+        build_snapshot(report).save()
+        serializer.instance = report
+
+    def perform_update(self, serializer):
+        report = serializer.save()
+        # A new range or type invalidates every stored day
+        if {'start_date', 'end_date', 'report_type'} & set(serializer.validated_data):
+            build_snapshot(report).save()
 
 
 class ReportScheduleViewSet(viewsets.ModelViewSet):
@@ -151,6 +267,7 @@ class ReportStatsView(APIView):
     """Get overall report statistics"""
     permission_classes = [IsAuthenticated]
 
+    @cached_response('reports.stats')
     def get(self, request):
         reports = Report.objects.filter(user=request.user)
 
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "sync"
+
+    def ready(self):
+        import sync.signals  # Import signals to register them
@@ -0,0 +1,44 @@
+from django.db import models
+from django.conf import settings
+
+
+class SyncCounter(models.Model):
+    """The last change sequence number handed out for a user"""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='sync_counter'
+    )
+    seq = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.seq}"
+
+
+class Tombstone(models.Model):
+    """Records a deleted synced row so clients can drop their copy"""
+    MODEL_CHOICES = [
+        ('transaction', 'Transaction'),
+        ('category', 'Category'),
+        ('budget', 'Budget'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tombstones'
+    )
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['seq']
+        indexes = [
+            models.Index(fields=['user', 'seq'], name='sync_tombstone_user_seq'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.seq}"
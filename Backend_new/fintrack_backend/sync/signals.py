@@ -0,0 +1,34 @@
+from django.db.models.signals import pre_save, post_delete
+from django.dispatch import receiver
+
+from budget.models import Budget
+from transactions.models import Category, Transaction
+from transactions.signals import row_signals_deferred
+from .tracking import record_deletes, stamp
+
+
+TOMBSTONE_MODELS = {
+    Transaction: 'transaction',
+    Category: 'category',
+    Budget: 'budget',
+}
+
+
+@receiver(pre_save, sender=Transaction)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Budget)
+def stamp_change_seq(sender, instance, **kwargs):
+    """Signal to give every saved synced row its owner's next change sequence number"""
+    stamp([instance])
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Budget)
+def record_tombstone(sender, instance, **kwargs):
+    """Signal to leave a tombstone for deleted rows, including cascades"""
+    # bulk_delete records its tombstones in one batch
+    if sender is Transaction and row_signals_deferred():
+        return
+    record_deletes(TOMBSTONE_MODELS[sender], [(instance.pk, instance.user_id)])
+
@@ -0,0 +1,155 @@
+from datetime import date
+
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from rest_framework.views import APIView
+
+from accounts.deletion import user_being_deleted
+from accounts.models import User
+from budget.models import Budget
+from transactions.models import Category, Transaction
+from .models import SyncCounter, Tombstone
+from .tracking import AtomicWritesMixin
+
+
+class SyncTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='sync@example.com', username='sync', password='pass12345'
+        )
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.get(user=self.user, name='Food & Dining')
+
+    def sync(self, **params):
+        response = self.client.get('/api/v1/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def create(self, merchant='Cafe', **kwargs):
+        values = {
+            'amount': '10.00', 'date': '2025-01-10', 'merchant': merchant,
+            'type': 'expense', 'category': self.food.id
+        }
+        values.update(kwargs)
+        response = self.client.post('/api/v1/transactions/', values, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def test_full_download_then_deltas(self):
+        kept = self.create('Kept')
+        changed = self.create('Changed')
+        removed = self.create('Removed')
+
+        full = self.sync()
+        self.assertTrue(full['full'])
+        self.assertEqual(len(full['transactions']['created']), 3)
+        self.assertEqual(len(full['categories']['created']), 16)
+
+        token = full['token']
+        self.assertEqual(self.sync(since=token)['transactions'], {'created': [], 'updated': [], 'deleted': []})
+
+        added = self.create('Added')
+        self.client.patch(f'/api/v1/transactions/{changed}/', {'notes': 'edited'}, format='json')
+        self.client.delete(f'/api/v1/transactions/{removed}/')
+
+        delta = self.sync(since=token)
+        self.assertFalse(delta['full'])
+        self.assertEqual([item['id'] for item in delta['transactions']['created']], [added])
+        self.assertEqual([item['notes'] for item in delta['transactions']['updated']], ['edited'])
+        self.assertEqual(delta['transactions']['deleted'], [removed])
+        self.assertEqual(delta['categories'], {'created': [], 'updated': [], 'deleted': []})
+        self.assertNotIn(kept, [item['id'] for item in delta['transactions']['updated']])
+        self.assertGreater(delta['token'], token)
+
+    def test_bulk_writes_and_cascades_leave_changes(self):
+        ids = [self.create(f'Shop {index}') for index in range(3)]
+        other = Category.objects.create(user=self.user, name='Gifts')
+        budget = Budget.objects.create(
+            user=self.user, category=other, amount='50.00', period='monthly',
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31)
+        )
+        token = self.sync()['token']
+
+        self.client.patch('/api/v1/transactions/bulk_update/', {'ids': ids[:2], 'notes': 'bulk'}, format='json')
+        self.client.delete('/api/v1/transactions/bulk_delete/', {'ids': [ids[2]]}, format='json')
+        other_id = other.id
+        other.delete()
+
+        delta = self.sync(since=token)
+        self.assertEqual(sorted(item['id'] for item in delta['transactions']['updated']), sorted(ids[:2]))
+        self.assertEqual(delta['transactions']['deleted'], [ids[2]])
+        self.assertEqual(delta['categories']['deleted'], [other_id])
+        self.assertEqual(delta['budgets']['deleted'], [budget.id])
+
+    def test_pages_never_split_a_bulk_write(self):
+        # Each batch create takes one sequence number for all of its rows
+        response = self.client.post('/api/v1/transactions/', [
+            {'amount': '1.00', 'date': '2025-01-10', 'merchant': f'Batch {index}', 'type': 'expense'}
+            for index in range(5)
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        token = self.sync()['token']
+        single = self.create('Single')
+        self.client.post('/api/v1/transactions/', [
+            {'amount': '1.00', 'date': '2025-01-11', 'merchant': f'Later {index}', 'type': 'expense'}
+            for index in range(4)
+        ], format='json')
+
+        first = self.sync(since=token, limit=1)
+        self.assertTrue(first['has_more'])
+        self.assertEqual([item['id'] for item in first['transactions']['created']], [single])
+
+        second = self.sync(since=first['token'], limit=1)
+        self.assertEqual(len(second['transactions']['created']), 4)
+        self.assertFalse(second['has_more'])
+        self.assertEqual(self.sync(since=second['token'])['token'], second['token'])
+
+    def test_deleting_the_user_skips_tombstones(self):
+        self.create()
+        self.user.delete()
+
+        self.assertFalse(Tombstone.objects.exists())
+        self.assertFalse(SyncCounter.objects.exists())
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_failed_user_delete_clears_the_mark(self):
+        def fail(sender, **kwargs):
+            raise RuntimeError('cascade failed')
+
+        self.create()
+        pre_delete.connect(fail, sender=Transaction)
+        try:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.user.delete()
+        finally:
+            pre_delete.disconnect(fail, sender=Transaction)
+        self.assertFalse(user_being_deleted(self.user.pk))
+
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertFalse(Tombstone.objects.exists())
+        self.assertFalse(user_being_deleted(self.user.pk))
+
+    def test_rejects_bad_params(self):
+        for params in ({'since': 'abc'}, {'since': '-1'}, {'limit': '0'}):
+            self.assertEqual(self.client.get('/api/v1/sync/', params).status_code, 400)
+
+
+class AtomicWritesTests(APITestCase):
+
+    class PartialWriteView(AtomicWritesMixin, APIView):
+        def post(self, request):
+            Category.objects.create(user=request.user, name='Half written', type='expense')
+            raise ValidationError({'name': ['Rejected after the write']})
+
+    def test_error_responses_roll_back(self):
+        user = User.objects.create_user(email='atomic@example.com', username='atomic', password='pass12345')
+        request = APIRequestFactory().post('/', {}, format='json')
+        force_authenticate(request, user)
+
+        response = self.PartialWriteView.as_view()(request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Category.objects.filter(name='Half written').exists())
@@ -0,0 +1,141 @@
+"""
+Per-user change sequence numbers for offline sync.
+
+Every write to a synced row (Transaction, Category, Budget) stamps it with
+`change_seq`, the next number from its owner's SyncCounter, and new rows
+also record it as `created_seq`. Deletes leave a Tombstone carrying its
+own number. Clients keep the highest number they have seen and ask for
+everything after it (see sync.v1.views).
+
+Incrementing the counter locks the user's counter row until the writing
+transaction ends, so one user's writes commit in sequence order and a
+reader never sees a number before every smaller one is visible. Writes
+must therefore run inside a transaction: API views use AtomicWritesMixin
+and the bulk helpers open their own.
+"""
+from django.db import IntegrityError, connection, transaction
+from django.db.models import BigIntegerField, Case, F, Value, When
+from rest_framework.permissions import SAFE_METHODS
+
+from accounts.deletion import user_being_deleted
+from .models import SyncCounter, Tombstone
+
+
+def _increment(user_id):
+    """Bump the counter and return the new value, or None if the user has no counter yet"""
+    if connection.vendor != 'mysql' and connection.features.can_return_columns_from_insert:
+        table = connection.ops.quote_name(SyncCounter._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f'UPDATE {table} SET seq = seq + 1 WHERE user_id = %s RETURNING seq', [user_id])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    if not SyncCounter.objects.filter(user_id=user_id).update(seq=F('seq') + 1):
+        return None
+    return SyncCounter.objects.values_list('seq', flat=True).get(user_id=user_id)
+
+
+def next_seq(user_id):
+    """Hand out the user's next change sequence number"""
+    with transaction.atomic():
+        seq = _increment(user_id)
+        if seq is not None:
+            return seq
+
+        try:
+            with transaction.atomic():
+                SyncCounter.objects.create(user_id=user_id, seq=1)
+            return 1
+        except IntegrityError:
+            # Created concurrently, fall back to incrementing it
+            return _increment(user_id)
+
+
+def current_seq(user_id):
+    """The last number handed out to the user (0 before their first write)"""
+    return SyncCounter.objects.filter(user_id=user_id).values_list('seq', flat=True).first() or 0
+
+
+def _next_seqs(user_ids):
+    """One new number per user; batches of users take a fixed number of statements"""
+    user_ids = sorted(set(user_ids))
+    if len(user_ids) <= 1:
+        return {user_id: next_seq(user_id) for user_id in user_ids}
+
+    counters = SyncCounter.objects.filter(user_id__in=user_ids)
+    with transaction.atomic():
+        # Locked in user order so concurrent multi-user writes cannot deadlock
+        existing = set(counters.select_for_update().order_by('user_id').values_list('user_id', flat=True))
+        missing = [user_id for user_id in user_ids if user_id not in existing]
+        if missing:
+            SyncCounter.objects.bulk_create(
+                [SyncCounter(user_id=user_id, seq=0) for user_id in missing],
+                batch_size=1000,
+                ignore_conflicts=True
+            )
+        counters.update(seq=F('seq') + 1)
+        return dict(counters.values_list('user_id', 'seq'))
+
+
+def stamp(instances):
+    """Set `change_seq` (and `created_seq` on new rows) before saving or bulk creating"""
+    seqs = _next_seqs(instance.user_id for instance in instances)
+    for instance in instances:
+        instance.change_seq = seqs[instance.user_id]
+        if instance._state.adding:
+            instance.created_seq = instance.change_seq
+
+
+def change_seq_for(user_ids):
+    """
+    Expression for `change_seq` in a queryset.update() over rows owned
+    by `user_ids`, one new number per user.
+    """
+    seqs = _next_seqs(user_ids)
+    if len(seqs) == 1:
+        return Value(next(iter(seqs.values())))
+    return Case(
+        *(When(user_id=user_id, then=Value(seq)) for user_id, seq in seqs.items()),
+        output_field=BigIntegerField()
+    )
+
+
+def record_deletes(model, rows):
+    """
+    Leave tombstones for deleted rows.
+
+    Args:
+        model: Tombstone model name ('transaction', 'category' or 'budget')
+        rows: (id, user_id) pairs of the deleted rows
+    """
+    # Rows removed along with their user need no tombstone
+    rows = [(pk, user_id) for pk, user_id in rows if not user_being_deleted(user_id)]
+    if not rows:
+        return
+
+    seqs = _next_seqs(user_id for _, user_id in rows)
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(user_id=user_id, model=model, object_id=pk, seq=seqs[user_id])
+            for pk, user_id in rows
+        ],
+        batch_size=1000
+    )
+
+
+class AtomicWritesMixin:
+    """
+    Run unsafe requests in one transaction, so the change sequence number
+    a write takes and the write itself commit together. Error responses
+    roll it back, like ATOMIC_REQUESTS.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            response = super().dispatch(request, *args, **kwargs)
+            # DRF turns exceptions into responses, so atomic() never sees them
+            if response.status_code >= 400:
+                transaction.set_rollback(True)
+            return response
@@ -0,0 +1,114 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from budget.models import Budget
+from budget.v1.serializers import BudgetListSerializer
+from transactions.models import Category, Transaction
+from transactions.v1.serializers import CategorySerializer, TransactionSerializer
+from ..models import Tombstone
+from ..tracking import current_seq
+
+
+class SyncView(APIView):
+    """
+    Transactions, categories and budgets created, updated or deleted since
+    a change token.
+
+    Query params:
+        since: `token` from the previous response; omit it for a full download
+        limit: Changes per page (default 1000, max 5000). Rows sharing one
+            sequence number (a bulk write) always arrive on the same page,
+            so a page can run over the limit.
+
+    Keep requesting with the returned token while `has_more` is true.
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 1000
+    max_limit = 5000
+
+    def get_sources(self, user):
+        """name -> (queryset, serializer class, tombstone model name)"""
+        return {
+            'transactions': (
+                Transaction.objects.for_user(user).with_related(),
+                TransactionSerializer,
+                'transaction',
+            ),
+            'categories': (
+                Category.objects.filter(user=user),
+                CategorySerializer,
+                'category',
+            ),
+            'budgets': (
+                Budget.objects.filter(user=user).select_related('category'),
+                BudgetListSerializer,
+                'budget',
+            ),
+        }
+
+    def get_params(self, request):
+        """Returns (since or None, limit); raises ValueError on bad input"""
+        since = request.query_params.get('since')
+        since = int(since) if since not in (None, '') else None
+        limit = int(request.query_params.get('limit', self.default_limit))
+        if (since is not None and since < 0) or limit < 1:
+            raise ValueError
+        return since, min(limit, self.max_limit)
+
+    def get(self, request):
+        try:
+            since, limit = self.get_params(request)
+        except ValueError:
+            return Response(
+                {'error': 'since and limit must be non-negative integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = request.user
+        sources = self.get_sources(user)
+        tombstones = Tombstone.objects.filter(user=user)
+        # Rows never written since sync was added carry 0, so a full download starts below it
+        lower = since if since is not None else -1
+
+        # Every write numbered up to the counter has committed, so read it first
+        # and only serve changes up to it
+        ceiling = current_seq(user.id)
+        upper = ceiling
+
+        # Find where this page ends from the sequence numbers alone
+        seqs = []
+        for queryset, _, _ in sources.values():
+            seqs += queryset.filter(change_seq__gt=lower, change_seq__lte=ceiling).order_by(
+                'change_seq'
+            ).values_list('change_seq', flat=True)[:limit + 1]
+        if since is not None:
+            seqs += tombstones.filter(seq__gt=lower, seq__lte=ceiling).order_by(
+                'seq'
+            ).values_list('seq', flat=True)[:limit + 1]
+
+        if len(seqs) > limit:
+            upper = sorted(seqs)[limit - 1]
+
+        data = {
+            'token': max(upper, lower, 0),
+            'full': since is None,
+            'has_more': upper < ceiling,
+        }
+
+        deleted = {}
+        if since is not None:
+            for model, object_id in tombstones.filter(seq__gt=lower, seq__lte=upper).values_list('model', 'object_id'):
+                deleted.setdefault(model, []).append(object_id)
+
+        for name, (queryset, serializer_class, model) in sources.items():
+            rows = list(queryset.filter(change_seq__gt=lower, change_seq__lte=upper).order_by('change_seq', 'id'))
+            serialized = serializer_class(rows, many=True, context={'request': request}).data
+            data[name] = {
+                'created': [item for row, item in zip(rows, serialized) if row.created_seq > lower],
+                'updated': [item for row, item in zip(rows, serialized) if row.created_seq <= lower],
+                'deleted': deleted.get(model, []),
+            }
+
+        return Response(data)
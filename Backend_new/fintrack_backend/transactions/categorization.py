@@ -0,0 +1,307 @@
+"""
+Merchant-rule auto-categorization.
+
+A user's active CategorizationRules compile into one MerchantMatcher:
+exact rules become a dict lookup, prefix rules a character trie walked
+along the merchant, regex rules that are plain text an Aho-Corasick
+automaton that finds every one of them in a single pass, and the
+remaining regex rules one combined alternation used to rule out
+merchants no pattern can match. The matching rule with the lowest
+(priority, id) whose amount range fits wins.
+
+Compiled matchers are kept per process and reused until the user's
+rules version (a CategorizationRuleSet row, bumped by
+transactions.signals on any rule change) moves.
+
+Rules run on every transaction write, so regex rules are limited to
+MAX_PATTERN_LENGTH characters and may not repeat a group that itself
+repeats or alternates, the shapes that backtrack exponentially.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from functools import lru_cache
+
+from django.db import IntegrityError, transaction
+
+from .models import CategorizationRule, CategorizationRuleSet
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+
+# What a compiled rule needs at match time; sorts by (priority, id)
+CompiledRule = namedtuple('CompiledRule', ['priority', 'id', 'category_id', 'min_amount', 'max_amount'])
+
+# Compiled matchers kept per process
+MAX_CACHED_MATCHERS = 1000
+
+# Distinct merchants whose candidate rules each matcher remembers
+MERCHANT_CACHE_SIZE = 4096
+
+_WHITESPACE = re.compile(r'\s+')
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+_METACHARACTERS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+_TERMINAL = object()
+
+# Longest regex rule accepted
+MAX_PATTERN_LENGTH = 100
+
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', None)}
+
+
+def normalize(merchant):
+    """Case- and whitespace-insensitive form that rules are matched against"""
+    return _WHITESPACE.sub(' ', merchant or '').strip().casefold()
+
+
+def _backtracks(items, repeated=False):
+    """Whether parsed regex `items` nest a repeat or an alternation inside a repeat"""
+    for op, av in items:
+        if op in _REPEATS:
+            low, high, sub = av
+            if high > 1 and repeated:
+                return True
+            if _backtracks(sub, repeated or high > 1):
+                return True
+        elif op == sre_parse.BRANCH:
+            if repeated:
+                return True
+            if any(_backtracks(branch, repeated) for branch in av[1]):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _backtracks(av[-1], repeated):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _backtracks(av[1], repeated):
+                return True
+        elif op == getattr(sre_parse, 'ATOMIC_GROUP', None):
+            if _backtracks(av, repeated):
+                return True
+        elif op == sre_parse.GROUPREF_EXISTS:
+            if any(branch is not None and _backtracks(branch, repeated) for branch in av[1:]):
+                return True
+    return False
+
+
+def validate_pattern(pattern):
+    """
+    Raise ValueError unless `pattern` is usable as a regex rule.
+    Rules are combined into one expression, so named groups, backreferences
+    and inline flags after the start are rejected, and so are patterns
+    that could backtrack catastrophically.
+    """
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise ValueError(f'Regular expressions are limited to {MAX_PATTERN_LENGTH} characters.')
+
+    try:
+        compiled = re.compile(pattern)
+        re.compile(f'(?:{pattern})|(?:{pattern})')
+    except re.error as exc:
+        raise ValueError(f'Invalid regular expression: {exc}')
+
+    if compiled.groupindex or _BACKREFERENCE.search(pattern):
+        raise ValueError('Named groups and backreferences are not supported.')
+    if _backtracks(sre_parse.parse(pattern)):
+        raise ValueError('Repeating a group that repeats or alternates is not supported.')
+
+
+class LiteralAutomaton:
+    """Aho-Corasick automaton reporting every keyword contained in a text"""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for keyword, value in keywords:
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(value)
+
+        # Breadth-first, so each failure target is complete before it is used
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def __bool__(self):
+        return len(self.goto) > 1
+
+    def find(self, text):
+        found = []
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            found.extend(self.output[state])
+        return found
+
+
+class MerchantMatcher:
+    """All of one user's rules, compiled for matching"""
+
+    def __init__(self, rules):
+        self.exact = {}
+        self.trie = {}
+        literals = []
+        self.patterns = []
+
+        for rule in rules:
+            compiled = CompiledRule(rule.priority, rule.id, rule.category_id, rule.min_amount, rule.max_amount)
+            if rule.match_type == 'exact':
+                self.exact.setdefault(normalize(rule.pattern), []).append(compiled)
+            elif rule.match_type == 'prefix':
+                node = self.trie
+                for char in normalize(rule.pattern):
+                    node = node.setdefault(char, {})
+                node.setdefault(_TERMINAL, []).append(compiled)
+            elif not _METACHARACTERS.search(rule.pattern):
+                literals.append((normalize(rule.pattern), compiled))
+            else:
+                # Rules saved before the current checks are left out rather than run
+                try:
+                    validate_pattern(rule.pattern)
+                except ValueError:
+                    continue
+                self.patterns.append((compiled, re.compile(rule.pattern, re.IGNORECASE | re.DOTALL)))
+
+        self.literals = LiteralAutomaton(literals)
+        self.regex = None
+        if self.patterns:
+            self.regex = re.compile(
+                '|'.join(f'(?:{pattern.pattern})' for _, pattern in self.patterns),
+                re.IGNORECASE | re.DOTALL
+            )
+
+        self.candidates = lru_cache(maxsize=MERCHANT_CACHE_SIZE)(self._candidates)
+
+    def __bool__(self):
+        return bool(self.exact or self.trie or self.literals or self.patterns)
+
+    def _candidates(self, merchant):
+        """Every rule matching a normalized merchant, best first"""
+        found = list(self.exact.get(merchant, ()))
+
+        node = self.trie
+        for char in merchant:
+            found.extend(node.get(_TERMINAL, ()))
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            found.extend(node.get(_TERMINAL, ()))
+
+        if self.literals:
+            found.extend(self.literals.find(merchant))
+
+        # One pass over the combined patterns rules most merchants out
+        if self.regex is not None and self.regex.search(merchant):
+            found.extend(compiled for compiled, pattern in self.patterns if pattern.search(merchant))
+
+        return tuple(sorted(set(found)))
+
+    def match(self, merchant, amount=None):
+        """
+        Returns:
+            int or None: Category id of the best matching rule
+        """
+        for rule in self.candidates(normalize(merchant)):
+            if rule.min_amount is not None and (amount is None or amount < rule.min_amount):
+                continue
+            if rule.max_amount is not None and (amount is None or amount > rule.max_amount):
+                continue
+            return rule.category_id
+        return None
+
+
+_matchers = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def bump_rules_version(user_id):
+    """
+    Make every process recompile the user's matcher on next use. Versions
+    are only compared for equality, and the current time in nanoseconds
+    never repeats one a reused user id may have left in a process.
+    """
+    version = time.time_ns()
+    with transaction.atomic():
+        if CategorizationRuleSet.objects.filter(user_id=user_id).update(version=version):
+            return
+        try:
+            with transaction.atomic():
+                CategorizationRuleSet.objects.create(user_id=user_id, version=version)
+        except IntegrityError:
+            # Created concurrently, fall back to updating it
+            CategorizationRuleSet.objects.filter(user_id=user_id).update(version=version)
+
+
+def rules_version(user_id):
+    """The user's current rules version (0 before their first rule)"""
+    return CategorizationRuleSet.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+
+
+def get_matcher(user_id):
+    """The user's compiled matcher, rebuilt only after their rules change"""
+    # Read the version before loading, so a concurrent change leaves this copy stale
+    version = rules_version(user_id)
+
+    with _matchers_lock:
+        cached = _matchers.get(user_id)
+        if cached is not None and cached[0] == version:
+            _matchers.move_to_end(user_id)
+            return cached[1]
+
+    matcher = MerchantMatcher(CategorizationRule.objects.filter(user_id=user_id, is_active=True))
+
+    with _matchers_lock:
+        _matchers[user_id] = (version, matcher)
+        _matchers.move_to_end(user_id)
+        while len(_matchers) > MAX_CACHED_MATCHERS:
+            _matchers.popitem(last=False)
+
+    return matcher
+
+
+def categorize(transactions):
+    """
+    Fill in the category of unsaved, uncategorized transactions from their
+    owners' rules.
+
+    Returns:
+        int: Number of transactions that were categorized
+    """
+    matchers = {}
+    categorized = 0
+
+    for tx in transactions:
+        if tx.category_id is not None:
+            continue
+        if tx.user_id not in matchers:
+            matchers[tx.user_id] = get_matcher(tx.user_id)
+
+        matcher = matchers[tx.user_id]
+        category_id = matcher.match(tx.merchant, tx.amount) if matcher else None
+        if category_id is not None:
+            tx.category_id = category_id
+            categorized += 1
+
+    return categorized
+
@@ -0,0 +1,111 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.cache import bump_data_version
+from transactions.models import Transaction
+from transactions.seeding import seed_transactions
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data"""
+
+
+def legacy_stats(user):
+    """The original raw-row implementation of TransactionViewSet.stats, kept for comparison"""
+    queryset = Transaction.objects.filter(user=user)
+
+    income_total = queryset.filter(type='income').aggregate(
+        total=Sum('amount')
+    )['total'] or Decimal('0.00')
+    expense_total = queryset.filter(type='expense').aggregate(
+        total=Sum('amount')
+    )['total'] or Decimal('0.00')
+
+    category_breakdown = {}
+    for transaction_type in ['income', 'expense']:
+        categories = queryset.filter(type=transaction_type).values('category').annotate(
+            total=Sum('amount'),
+            count=Count('id')
+        )
+        category_breakdown[transaction_type] = {
+            cat['category']: {'total': float(cat['total']), 'count': cat['count']}
+            for cat in categories
+        }
+
+    return {
+        'total_income': income_total,
+        'total_expenses': expense_total,
+        'balance': income_total - expense_total,
+        'transaction_count': queryset.count(),
+        'category_breakdown': category_breakdown,
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare the legacy and current transaction stats implementations on synthetic data"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=100000,
+                            help='Transactions to seed for the benchmark user')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per implementation')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the seeded data instead of rolling it back')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                if not options['keep']:
+                    raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, options):
+        user = get_user_model().objects.create_user(
+            email='benchmark-stats@example.com',
+            username='benchmark-stats',
+            password='benchmark'
+        )
+
+        started = time.perf_counter()
+        seed_transactions(user, options['transactions'], seed=1)
+        self.stdout.write(
+            f"Seeded {options['transactions']} transactions in {time.perf_counter() - started:.1f}s"
+        )
+
+        client = APIClient()
+        client.force_authenticate(user)
+
+        self.report('before (raw rows)', lambda: legacy_stats(user), options['repeat'])
+        # The endpoint caches its response, so every run starts cold to time
+        # the rollup queries rather than a cache hit
+        self.report(
+            'after (rollups)',
+            lambda: client.get('/api/v1/transactions/stats/'),
+            options['repeat'],
+            setup=lambda: bump_data_version(user.pk)
+        )
+
+    def report(self, label, func, repeat, setup=None):
+        timings = []
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f"{label:<20} queries={len(ctx.captured_queries):<3} "
+            f"median={timings[len(timings) // 2]:.1f}ms min={timings[0]:.1f}ms"
+        )
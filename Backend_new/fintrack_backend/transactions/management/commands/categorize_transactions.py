@@ -0,0 +1,37 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.services import backfill_categories
+
+
+class Command(BaseCommand):
+    help = "Categorize existing uncategorized transactions using each user's categorization rules"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Email of a single user to categorize (defaults to all users)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Transactions read and updated per batch (default 5000)'
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(email=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+
+        started = time.perf_counter()
+        scanned, categorized = backfill_categories(user=user, batch_size=max(options['batch_size'], 1))
+        self.stdout.write(self.style.SUCCESS(
+            f'Categorized {categorized} of {scanned} uncategorized transactions '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
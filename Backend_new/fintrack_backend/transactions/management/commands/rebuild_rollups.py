@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily transaction rollup table from raw transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Email of a single user to rebuild (defaults to all users)'
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(email=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+
+        count = rebuild(user=user)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} rollup rows'))
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    Transaction = apps.get_model("transactions", "Transaction")
+    DailyTransactionRollup = apps.get_model("transactions", "DailyTransactionRollup")
+
+    rows = (
+        Transaction.objects.order_by()
+        .values("user_id", "date", "category_id", "type")
+        .annotate(total=Sum("amount"), rows=Count("id"))
+    )
+
+    DailyTransactionRollup.objects.bulk_create(
+        [
+            DailyTransactionRollup(
+                user_id=row["user_id"],
+                date=row["date"],
+                category_id=row["category_id"],
+                type=row["type"],
+                total=row["total"],
+                count=row["rows"],
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0002_manual_category_migration"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyTransactionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("income", "Income"), ("expense", "Expense")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="transactions.category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transaction_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "date"], name="transaction_rollup_user_date"
+                    )
+                ],
+                "unique_together": {("user", "date", "category", "type")},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0003_daily_transaction_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_user_id_8af7f1_idx",
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "date", "created_at", "id"],
+                name="transaction_user_date_keyset",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+# Trigram GIN indexes backing transaction search on PostgreSQL. They cover
+# UPPER(column) because that is what Django compiles `icontains` to, and
+# lead with user_id (via btree_gin) so a search only touches the user's
+# own rows. Other databases keep the plain LIKE scan.
+SEARCH_INDEXES = {
+    "transaction_merchant_trgm": (
+        "transactions_transaction",
+        "user_id, UPPER(merchant) gin_trgm_ops",
+    ),
+    "transaction_notes_trgm": (
+        "transactions_transaction",
+        "user_id, UPPER(notes) gin_trgm_ops",
+    ),
+    "category_name_trgm": (
+        "transactions_category",
+        "user_id, UPPER(name) gin_trgm_ops",
+    ),
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    for name, (table, columns) in SEARCH_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin ({columns})"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for name in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("transactions", "0004_transaction_keyset_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("transactions", "0007_change_seq"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategorizationRuleSet",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="categorization_rule_set",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_uncategorized_buckets(apps, schema_editor):
+    """Fold duplicate uncategorized buckets into one before they become unique"""
+    DailyTransactionRollup = apps.get_model("transactions", "DailyTransactionRollup")
+
+    duplicates = (
+        DailyTransactionRollup.objects.filter(category__isnull=True)
+        .values("user_id", "date", "type")
+        .annotate(
+            rows=Count("id"),
+            keep=Min("id"),
+            total_sum=Sum("total"),
+            count_sum=Sum("count"),
+        )
+        .filter(rows__gt=1)
+    )
+    for bucket in list(duplicates):
+        rows = DailyTransactionRollup.objects.filter(
+            category__isnull=True,
+            user_id=bucket["user_id"],
+            date=bucket["date"],
+            type=bucket["type"],
+        )
+        rows.exclude(pk=bucket["keep"]).delete()
+        rows.update(total=bucket["total_sum"], count=bucket["count_sum"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0008_categorization_rule_set"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_uncategorized_buckets, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="dailytransactionrollup",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="dailytransactionrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("category__isnull", False)),
+                fields=("user", "date", "category", "type"),
+                name="transaction_rollup_unique_bucket",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailytransactionrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("category__isnull", True)),
+                fields=("user", "date", "type"),
+                name="transaction_rollup_unique_uncategorized",
+            ),
+        ),
+    ]
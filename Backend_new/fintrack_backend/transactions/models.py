@@ -21,6 +21,10 @@ class Category(models.Model):
     type = models.CharField(max_length=10, choices=TYPE_CHOICES, default='expense')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Offline sync bookkeeping (see sync.tracking)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+    created_seq = models.BigIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name_plural = 'Categories'
@@ -28,12 +32,34 @@ class Category(models.Model):
         unique_together = [('user', 'name')]
         indexes = [
             models.Index(fields=['user', 'type'], name='transaction_user_id_f7f68b_idx'),
+            models.Index(fields=['user', 'change_seq'], name='category_user_change_seq'),
         ]
     
     def __str__(self):
         return f"{self.icon} {self.name} ({self.type})"
 
 
+class TransactionQuerySet(models.QuerySet):
+    """Shared query building for transaction lists, reports and exports"""
+
+    def for_user(self, user):
+        """Transactions owned by the given user"""
+        return self.filter(user=user)
+
+    def in_range(self, start_date=None, end_date=None):
+        """Transactions dated within the inclusive range"""
+        queryset = self
+        if start_date:
+            queryset = queryset.filter(date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        return queryset
+
+    def with_related(self):
+        """Join the category so serializers don't fetch it row by row"""
+        return self.select_related('category')
+
+
 class Transaction(models.Model):
     """Transaction model for tracking income and expenses"""
     TYPE_CHOICES = [
@@ -75,14 +101,139 @@ class Transaction(models.Model):
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Offline sync bookkeeping (see sync.tracking)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+    created_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = TransactionQuerySet.as_manager()
     
     class Meta:
         ordering = ['-date', '-created_at']
         indexes = [
-            models.Index(fields=['user', 'date'], name='transaction_user_id_8af7f1_idx'),
+            # Matches the list ordering so keyset pages are index range scans
+            models.Index(fields=['user', 'date', 'created_at', 'id'], name='transaction_user_date_keyset'),
             models.Index(fields=['user', 'category'], name='transaction_user_id_cb8cb9_idx'),
             models.Index(fields=['user', 'type'], name='transaction_user_id_4685bf_idx'),
+            models.Index(fields=['user', 'change_seq'], name='transaction_user_change_seq'),
         ]
     
     def __str__(self):
         return f"{self.merchant} - {self.amount} ({self.type}) on {self.date}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember persisted values so rollups can subtract them on update
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class DailyTransactionRollup(models.Model):
+    """
+    Per-user daily totals by category and type.
+    Maintained incrementally from transaction writes (see transactions.rollups)
+    so analytics read days x categories rows instead of raw transactions.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='transaction_rollups'
+    )
+    date = models.DateField()
+    category = models.ForeignKey(
+        'Category',
+        on_delete=models.CASCADE,
+        related_name='rollups',
+        null=True,
+        blank=True
+    )
+    type = models.CharField(max_length=10, choices=Transaction.TYPE_CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        # NULLs never collide in a plain unique constraint, so uncategorized
+        # buckets get their own
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'date', 'category', 'type'],
+                condition=models.Q(category__isnull=False),
+                name='transaction_rollup_unique_bucket'
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'date', 'type'],
+                condition=models.Q(category__isnull=True),
+                name='transaction_rollup_unique_uncategorized'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date'], name='transaction_rollup_user_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.date} {self.category_id} {self.type}: {self.total} ({self.count})"
+
+
+class CategorizationRule(models.Model):
+    """
+    Maps merchants (and optionally an amount range) to a category.
+    Uncategorized transactions take the category of the first matching
+    rule by (priority, id); see transactions.categorization.
+    """
+    MATCH_CHOICES = [
+        ('exact', 'Exact'),
+        ('prefix', 'Prefix'),
+        ('regex', 'Regular expression'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='categorization_rules'
+    )
+    category = models.ForeignKey(
+        'Category',
+        on_delete=models.CASCADE,
+        related_name='rules'
+    )
+    match_type = models.CharField(max_length=10, choices=MATCH_CHOICES, default='exact')
+    pattern = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text='Merchant text (case-insensitive); a blank prefix matches every merchant'
+    )
+    min_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    max_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    priority = models.IntegerField(default=0, help_text='Lower runs first')
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['priority', 'id']
+        indexes = [
+            models.Index(fields=['user', 'is_active'], name='transaction_rule_user_active'),
+        ]
+
+    def __str__(self):
+        return f"{self.match_type} '{self.pattern}' -> {self.category_id}"
+
+
+class CategorizationRuleSet(models.Model):
+    """
+    Version of a user's categorization rules, bumped on every rule change.
+    Kept in the database so every process sees the same value and knows
+    when to recompile its matcher.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='categorization_rule_set'
+    )
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.version}"
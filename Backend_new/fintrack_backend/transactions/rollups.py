@@ -0,0 +1,205 @@
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import DailyTransactionRollup, Transaction
+
+
+# A signed change to one (user, date, category, type) rollup bucket
+TransactionDelta = namedtuple(
+    'TransactionDelta',
+    ['user_id', 'date', 'category_id', 'type', 'amount', 'count']
+)
+
+ROLLUP_FIELDS = ('user_id', 'date', 'category_id', 'type', 'amount')
+
+# Above this many buckets, read-modify-write in bulk instead of one UPDATE each
+BULK_APPLY_THRESHOLD = 20
+
+
+def delta_for(values, sign=1):
+    """Build a delta from a transaction instance or a dict of its column values"""
+    if isinstance(values, Transaction):
+        values = {field: getattr(values, field) for field in ROLLUP_FIELDS}
+
+    return TransactionDelta(
+        user_id=values['user_id'],
+        date=values['date'],
+        category_id=values['category_id'],
+        type=values['type'],
+        amount=Decimal(str(values['amount'])) * sign,
+        count=sign
+    )
+
+
+def grouped_deltas(queryset, sign=1):
+    """Collapse a transaction queryset into one delta per bucket with a single GROUP BY"""
+    rows = queryset.order_by().values(
+        'user_id', 'date', 'category_id', 'type'
+    ).annotate(
+        total=Sum('amount'),
+        rows=Count('id')
+    )
+
+    return [
+        TransactionDelta(
+            user_id=row['user_id'],
+            date=row['date'],
+            category_id=row['category_id'],
+            type=row['type'],
+            amount=row['total'] * sign,
+            count=row['rows'] * sign
+        )
+        for row in rows
+    ]
+
+
+def merge_deltas(deltas):
+    """Sum deltas that hit the same bucket and drop the ones that cancel out"""
+    merged = {}
+    for delta in deltas:
+        key = (delta.user_id, delta.date, delta.category_id, delta.type)
+        amount, count = merged.get(key, (Decimal('0.00'), 0))
+        merged[key] = (amount + delta.amount, count + delta.count)
+
+    return [
+        TransactionDelta(*key, amount=amount, count=count)
+        for key, (amount, count) in merged.items()
+        if amount or count
+    ]
+
+
+def apply_deltas(deltas):
+    """Add deltas to the rollup table, creating and pruning buckets as needed"""
+    deltas = merge_deltas(deltas)
+
+    with transaction.atomic():
+        if len(deltas) > BULK_APPLY_THRESHOLD:
+            _apply_in_bulk(deltas)
+        else:
+            for delta in deltas:
+                _apply_one(delta)
+
+
+def _apply_one(delta):
+    bucket = DailyTransactionRollup.objects.filter(
+        user_id=delta.user_id,
+        date=delta.date,
+        category_id=delta.category_id,
+        type=delta.type
+    )
+
+    updated = bucket.update(
+        total=F('total') + delta.amount,
+        count=F('count') + delta.count
+    )
+
+    if not updated:
+        try:
+            with transaction.atomic():
+                DailyTransactionRollup.objects.create(
+                    user_id=delta.user_id,
+                    date=delta.date,
+                    category_id=delta.category_id,
+                    type=delta.type,
+                    total=delta.amount,
+                    count=delta.count
+                )
+        except IntegrityError:
+            # Created concurrently, fall back to incrementing it
+            bucket.update(
+                total=F('total') + delta.amount,
+                count=F('count') + delta.count
+            )
+    elif delta.count < 0:
+        bucket.filter(count__lte=0).delete()
+
+
+def _apply_in_bulk(deltas):
+    """Lock the affected buckets once, then bulk update/create/delete them"""
+    existing = DailyTransactionRollup.objects.select_for_update().filter(
+        user_id__in={delta.user_id for delta in deltas},
+        date__gte=min(delta.date for delta in deltas),
+        date__lte=max(delta.date for delta in deltas)
+    )
+    buckets = {
+        (row.user_id, row.date, row.category_id, row.type): row
+        for row in existing
+    }
+
+    to_update, to_create, to_delete = [], [], []
+    for delta in deltas:
+        row = buckets.get((delta.user_id, delta.date, delta.category_id, delta.type))
+        if row is None:
+            to_create.append(delta)
+            continue
+
+        row.total += delta.amount
+        row.count += delta.count
+        if row.count <= 0:
+            to_delete.append(row.pk)
+        else:
+            to_update.append(row)
+
+    DailyTransactionRollup.objects.bulk_update(to_update, ['total', 'count'], batch_size=1000)
+    DailyTransactionRollup.objects.filter(pk__in=to_delete).delete()
+
+    try:
+        with transaction.atomic():
+            DailyTransactionRollup.objects.bulk_create(
+                [
+                    DailyTransactionRollup(
+                        user_id=delta.user_id,
+                        date=delta.date,
+                        category_id=delta.category_id,
+                        type=delta.type,
+                        total=delta.amount,
+                        count=delta.count
+                    )
+                    for delta in to_create
+                ],
+                batch_size=1000
+            )
+    except IntegrityError:
+        # Some buckets were created concurrently, merge them one at a time
+        for delta in to_create:
+            _apply_one(delta)
+
+
+def rebuild(user=None):
+    """
+    Recompute rollups from raw transactions.
+
+    Args:
+        user: Optional user to limit the rebuild to
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    transactions = Transaction.objects.all()
+    rollups = DailyTransactionRollup.objects.all()
+
+    if user is not None:
+        transactions = transactions.filter(user=user)
+        rollups = rollups.filter(user=user)
+
+    with transaction.atomic():
+        rollups.delete()
+        created = DailyTransactionRollup.objects.bulk_create(
+            [
+                DailyTransactionRollup(
+                    user_id=delta.user_id,
+                    date=delta.date,
+                    category_id=delta.category_id,
+                    type=delta.type,
+                    total=delta.amount,
+                    count=delta.count
+                )
+                for delta in grouped_deltas(transactions)
+            ],
+            batch_size=1000
+        )
+
+    return len(created)
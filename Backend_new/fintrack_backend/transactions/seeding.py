@@ -0,0 +1,58 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from .models import Category, Transaction
+from .rollups import rebuild
+
+
+MERCHANTS = [
+    'Grocery Mart', 'City Transit', 'Coffee House', 'Power & Light',
+    'Cinema Plus', 'Pharmacy', 'Book Store', 'Gym Club', 'Online Shop',
+    'Employer Inc', 'Client Payment', 'Dividend',
+]
+
+
+def seed_transactions(user, count, days=730, end_date=None, batch_size=5000, seed=None):
+    """
+    Insert synthetic transactions for a user spread over the last `days` days.
+
+    Args:
+        user: User object (default categories must already exist)
+        count: Number of transactions to create
+        days: Size of the date window
+        end_date: Last day of the window (defaults to today)
+        batch_size: Rows per bulk INSERT
+        seed: Optional random seed for reproducible data
+
+    Returns:
+        int: Number of transactions created
+    """
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    categories = {
+        'income': list(Category.objects.filter(user=user, type='income')),
+        'expense': list(Category.objects.filter(user=user, type='expense')),
+    }
+
+    created = 0
+    while created < count:
+        batch = []
+        for _ in range(min(batch_size, count - created)):
+            # Roughly one income row for every nine expenses
+            tx_type = 'income' if rng.random() < 0.1 else 'expense'
+            high = 5000 if tx_type == 'income' else 300
+            batch.append(Transaction(
+                user=user,
+                category=rng.choice(categories[tx_type]) if categories[tx_type] else None,
+                amount=Decimal(rng.randint(100, high * 100)) / 100,
+                date=end_date - timedelta(days=rng.randrange(days)),
+                merchant=rng.choice(MERCHANTS),
+                type=tx_type,
+            ))
+        Transaction.objects.bulk_create(batch)
+        created += len(batch)
+
+    # bulk_create bypasses the rollup signals
+    rebuild(user=user)
+    return created
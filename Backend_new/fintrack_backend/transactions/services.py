@@ -0,0 +1,154 @@
+from datetime import timedelta
+
+from django.db import transaction as db_transaction
+from django.db.models import Case, DateField, ExpressionWrapper, F, IntegerField, Value, When
+from django.utils import timezone
+
+from core.cache import bump_data_version
+from sync.tracking import change_seq_for, stamp
+from .categorization import get_matcher
+from .models import Transaction
+from .rollups import delta_for, grouped_deltas
+from .signals import transactions_changed
+
+
+def bulk_create_transactions(transactions, batch_size=1000):
+    """
+    Insert transactions with batched INSERTs inside one database transaction.
+
+    bulk_create skips the per-row signals, so derived data (rollups and
+    anything else listening to `transactions_changed`) is updated once
+    for the whole set.
+
+    Returns:
+        list: The created Transaction instances
+    """
+    with db_transaction.atomic():
+        stamp(transactions)
+        created = Transaction.objects.bulk_create(transactions, batch_size=batch_size)
+        transactions_changed.send(
+            sender=Transaction,
+            deltas=[delta_for(tx) for tx in created]
+        )
+
+    return created
+
+
+def bulk_update_transactions(queryset, changes, date_shift=0):
+    """
+    Apply the same field changes to every transaction in `queryset` with
+    one UPDATE statement.
+
+    When category, type or date change, the affected rows are grouped
+    before and after the UPDATE and `transactions_changed` is sent once
+    with both sets of deltas, so rollups move between buckets in bulk.
+
+    Args:
+        queryset: Transactions to change (already limited to their owner)
+        changes: dict of field name -> new value (category, type, notes)
+        date_shift: Days to move each transaction's date by
+
+    Returns:
+        int: Number of transactions updated
+    """
+    changes = dict(changes)
+    if date_shift:
+        changes['date'] = ExpressionWrapper(
+            F('date') + timedelta(days=date_shift),
+            output_field=DateField()
+        )
+    changes['updated_at'] = timezone.now()
+
+    moves_buckets = any(field in changes for field in ('category', 'type', 'date'))
+
+    with db_transaction.atomic():
+        # Pin the target rows first: the changes may stop them matching the filters
+        rows = list(queryset.select_for_update(of=('self',)).values_list('id', 'user_id'))
+        if not rows:
+            return 0
+
+        targets = Transaction.objects.filter(id__in=[pk for pk, _ in rows])
+        before = grouped_deltas(targets, sign=-1) if moves_buckets else []
+        changes['change_seq'] = change_seq_for(user_id for _, user_id in rows)
+        updated = targets.update(**changes)
+
+        if moves_buckets:
+            transactions_changed.send(
+                sender=Transaction,
+                deltas=before + grouped_deltas(targets)
+            )
+        else:
+            # Notes don't touch any totals, only cached responses that show them
+            for user_id in {user_id for _, user_id in rows}:
+                bump_data_version(user_id)
+
+    return updated
+
+
+def backfill_categories(user=None, batch_size=5000):
+    """
+    Categorize existing uncategorized transactions from their owners' rules.
+
+    Rows are read in id order in batches of plain tuples and matched in
+    memory; each batch is written with one UPDATE ... CASE and a single
+    `transactions_changed` with the grouped before/after deltas.
+
+    Args:
+        user: Optional user to limit the backfill to
+        batch_size: Transactions read per batch
+
+    Returns:
+        tuple: (transactions scanned, transactions categorized)
+    """
+    queryset = Transaction.objects.filter(category__isnull=True)
+    if user is not None:
+        queryset = queryset.filter(user=user)
+
+    matchers = {}
+    scanned = categorized = 0
+    last_id = 0
+
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id).order_by('id').values_list('id', 'user_id', 'merchant', 'amount')[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        scanned += len(rows)
+
+        matches = {}
+        for pk, user_id, merchant, amount in rows:
+            if user_id not in matchers:
+                matchers[user_id] = get_matcher(user_id)
+            matcher = matchers[user_id]
+            category_id = matcher.match(merchant, amount) if matcher else None
+            if category_id is not None:
+                matches.setdefault(category_id, []).append(pk)
+
+        if not matches:
+            continue
+
+        with db_transaction.atomic():
+            # Lock the matched rows and drop any categorized since they were read
+            locked = list(Transaction.objects.select_for_update().filter(
+                id__in=[pk for pks in matches.values() for pk in pks],
+                category__isnull=True
+            ).values_list('id', 'user_id'))
+            if not locked:
+                continue
+
+            targets = Transaction.objects.filter(id__in=[pk for pk, _ in locked])
+            before = grouped_deltas(targets, sign=-1)
+            updated = targets.update(
+                category_id=Case(
+                    *(When(id__in=pks, then=Value(category_id)) for category_id, pks in matches.items()),
+                    output_field=IntegerField()
+                ),
+                change_seq=change_seq_for(user_id for _, user_id in locked),
+                updated_at=timezone.now()
+            )
+            transactions_changed.send(sender=Transaction, deltas=before + grouped_deltas(targets))
+        categorized += updated
+
+    return scanned, categorized
@@ -1,44 +1,88 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.db import models
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver, Signal
 from django.conf import settings
 
+from accounts.deletion import user_being_deleted
+from .categorization import bump_rules_version
+from .models import CategorizationRule, Category, Transaction
+from .rollups import ROLLUP_FIELDS, apply_deltas, delta_for
+
+
+# Sent with `deltas`, a list of TransactionDelta, whenever transaction totals change
+transactions_changed = Signal()
+
+_row_signals_deferred = ContextVar('row_signals_deferred', default=False)
+
+
+@contextmanager
+def defer_row_signals():
+    """
+    Skip the per-row transaction receivers inside the block.
+    Bulk operations use this and send `transactions_changed` once for the batch.
+    """
+    token = _row_signals_deferred.set(True)
+    try:
+        yield
+    finally:
+        _row_signals_deferred.reset(token)
+
+
+def row_signals_deferred():
+    """Whether the caller is inside defer_row_signals()"""
+    return _row_signals_deferred.get()
+
+
+DEFAULT_CATEGORIES = [
+    # Income categories
+    {'name': 'Salary', 'icon': '💰', 'type': 'income'},
+    {'name': 'Freelance', 'icon': '💼', 'type': 'income'},
+    {'name': 'Investment', 'icon': '📈', 'type': 'income'},
+    {'name': 'Other Income', 'icon': '💵', 'type': 'income'},
+
+    # Expense categories
+    {'name': 'Food & Dining', 'icon': '🍔', 'type': 'expense'},
+    {'name': 'Transportation', 'icon': '🚗', 'type': 'expense'},
+    {'name': 'Shopping', 'icon': '🛍️', 'type': 'expense'},
+    {'name': 'Utilities', 'icon': '💡', 'type': 'expense'},
+    {'name': 'Entertainment', 'icon': '🎬', 'type': 'expense'},
+    {'name': 'Healthcare', 'icon': '⚕️', 'type': 'expense'},
+    {'name': 'Education', 'icon': '🎓', 'type': 'expense'},
+    {'name': 'Housing', 'icon': '🏠', 'type': 'expense'},
+    {'name': 'Personal Care', 'icon': '💅', 'type': 'expense'},
+    {'name': 'Travel', 'icon': '✈️', 'type': 'expense'},
+    {'name': 'Fitness', 'icon': '🏋️', 'type': 'expense'},
+    {'name': 'Other Expense', 'icon': '📁', 'type': 'expense'},
+]
+
 
 def create_default_categories(user):
     """Create default categories for a new user"""
-    from .models import Category
-    
-    default_categories = [
-        # Income categories
-        {'name': 'Salary', 'icon': '💰', 'type': 'income'},
-        {'name': 'Freelance', 'icon': '💼', 'type': 'income'},
-        {'name': 'Investment', 'icon': '📈', 'type': 'income'},
-        {'name': 'Other Income', 'icon': '💵', 'type': 'income'},
-        
-        # Expense categories
-        {'name': 'Food & Dining', 'icon': '🍔', 'type': 'expense'},
-        {'name': 'Transportation', 'icon': '🚗', 'type': 'expense'},
-        {'name': 'Shopping', 'icon': '🛍️', 'type': 'expense'},
-        {'name': 'Utilities', 'icon': '💡', 'type': 'expense'},
-        {'name': 'Entertainment', 'icon': '🎬', 'type': 'expense'},
-        {'name': 'Healthcare', 'icon': '⚕️', 'type': 'expense'},
-        {'name': 'Education', 'icon': '🎓', 'type': 'expense'},
-        {'name': 'Housing', 'icon': '🏠', 'type': 'expense'},
-        {'name': 'Personal Care', 'icon': '💅', 'type': 'expense'},
-        {'name': 'Travel', 'icon': '✈️', 'type': 'expense'},
-        {'name': 'Fitness', 'icon': '🏋️', 'type': 'expense'},
-        {'name': 'Other Expense', 'icon': '📁', 'type': 'expense'},
-    ]
-    
-    for cat_data in default_categories:
-        Category.objects.get_or_create(
-            user=user,
-            name=cat_data['name'],
-            defaults={
-                'icon': cat_data['icon'],
-                'type': cat_data['type']
-            }
-        )
+    create_default_categories_for_users([user])
+
+
+def create_default_categories_for_users(users, batch_size=1000):
+    """
+    Create default categories for many users with set-based INSERTs.
+    Categories a user already has are skipped via the (user, name) constraint.
+    """
+    Category.objects.bulk_create(
+        [
+            Category(
+                user=user,
+                name=cat_data['name'],
+                icon=cat_data['icon'],
+                type=cat_data['type']
+            )
+            for user in users
+            for cat_data in DEFAULT_CATEGORIES
+        ],
+        batch_size=batch_size,
+        ignore_conflicts=True
+    )
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -46,3 +90,58 @@ def create_user_default_categories(sender, instance, created, **kwargs):
     """Signal to create default categories when a new user is created"""
     if created:
         create_default_categories(instance)
+
+
+@receiver(pre_save, sender=Transaction)
+def capture_previous_transaction(sender, instance, **kwargs):
+    """Remember the persisted values of an updated transaction"""
+    instance._previous_delta = None
+    if instance._state.adding or _row_signals_deferred.get():
+        return
+
+    loaded = getattr(instance, '_loaded_values', {})
+    if not all(field in loaded for field in ROLLUP_FIELDS):
+        loaded = Transaction.objects.filter(pk=instance.pk).values(*ROLLUP_FIELDS).first()
+
+    if loaded:
+        instance._previous_delta = delta_for(loaded, sign=-1)
+
+
+@receiver(post_save, sender=Transaction)
+def transaction_saved(sender, instance, created, **kwargs):
+    """Signal to move a saved transaction's amount into its new bucket"""
+    if _row_signals_deferred.get():
+        return
+
+    deltas = [delta_for(instance)]
+    if instance._previous_delta:
+        deltas.insert(0, instance._previous_delta)
+
+    instance._loaded_values = {field: getattr(instance, field) for field in ROLLUP_FIELDS}
+    transactions_changed.send(sender=Transaction, deltas=deltas)
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    """Signal to remove a deleted transaction's amount from its bucket"""
+    # When the whole user goes, the same cascade deletes their rollups
+    if _row_signals_deferred.get() or user_being_deleted(instance.user_id):
+        return
+
+    transactions_changed.send(sender=Transaction, deltas=[delta_for(instance, sign=-1)])
+
+
+@receiver(transactions_changed)
+def update_daily_rollups(sender, deltas, **kwargs):
+    """Keep DailyTransactionRollup in step with transaction writes"""
+    apply_deltas(deltas)
+
+
+@receiver(post_save, sender=CategorizationRule)
+@receiver(post_delete, sender=CategorizationRule)
+def invalidate_rule_matcher(sender, instance, **kwargs):
+    """Signal to recompile the owner's matcher after any rule change"""
+    # When the whole user goes, the same cascade deletes their rule set
+    if user_being_deleted(instance.user_id):
+        return
+    bump_rules_version(instance.user_id)
@@ -1,3 +1,660 @@
-from django.test import TestCase
+import csv
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from accounts.models import User
+from .categorization import MerchantMatcher, get_matcher
+from .models import CategorizationRule, Category, DailyTransactionRollup, Transaction
+from .v1.search import TransactionSearchFilter
+
+
+class TransactionTestCase(APITestCase):
+    """Shared fixtures for transaction API tests"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='tx@example.com', username='tx', password='pass12345'
+        )
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.get(user=self.user, name='Food & Dining')
+        self.salary = Category.objects.get(user=self.user, name='Salary')
+
+    def create_transaction(self, **kwargs):
+        values = {
+            'user': self.user,
+            'category': self.food,
+            'amount': Decimal('10.00'),
+            'date': date(2025, 1, 10),
+            'merchant': 'Cafe',
+            'type': 'expense',
+        }
+        values.update(kwargs)
+        return Transaction.objects.create(**values)
+
+    def rollup_totals(self):
+        return {
+            (r.date, r.category_id, r.type): (r.total, r.count)
+            for r in DailyTransactionRollup.objects.filter(user=self.user)
+        }
+
+
+class DailyRollupTests(TransactionTestCase):
+    """Rollups stay in step with every kind of transaction write"""
+
+    def test_create_update_delete(self):
+        first = self.create_transaction()
+        self.create_transaction(amount=Decimal('5.50'))
+        self.assertEqual(
+            self.rollup_totals(),
+            {(date(2025, 1, 10), self.food.id, 'expense'): (Decimal('15.50'), 2)}
+        )
+
+        first.date = date(2025, 1, 11)
+        first.save()
+        self.assertEqual(
+            self.rollup_totals(),
+            {
+                (date(2025, 1, 10), self.food.id, 'expense'): (Decimal('5.50'), 1),
+                (date(2025, 1, 11), self.food.id, 'expense'): (Decimal('10.00'), 1),
+            }
+        )
+
+        first.delete()
+        self.assertEqual(
+            self.rollup_totals(),
+            {(date(2025, 1, 10), self.food.id, 'expense'): (Decimal('5.50'), 1)}
+        )
+
+    def test_api_update_and_bulk_delete(self):
+        tx = self.create_transaction()
+        other = self.create_transaction(category=None, amount=Decimal('3.00'))
+
+        response = self.client.patch(
+            f'/api/v1/transactions/{tx.id}/', {'amount': '20.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.rollup_totals()[(date(2025, 1, 10), self.food.id, 'expense')],
+            (Decimal('20.00'), 1)
+        )
+
+        response = self.client.delete(
+            '/api/v1/transactions/bulk_delete/', {'ids': [tx.id, other.id]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.rollup_totals(), {})
+
+    def test_uncategorized_bucket_is_unique(self):
+        self.create_transaction(category=None)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyTransactionRollup.objects.create(
+                user=self.user, date=date(2025, 1, 10), category=None, type='expense', total=1, count=1
+            )
+
+    def test_rebuild_command(self):
+        self.create_transaction()
+        self.create_transaction(type='income', category=self.salary, amount=Decimal('100.00'))
+        expected = self.rollup_totals()
+
+        DailyTransactionRollup.objects.all().delete()
+        call_command('rebuild_rollups', stdout=StringIO())
+
+        self.assertEqual(self.rollup_totals(), expected)
+
+    def test_stats_reads_rollups(self):
+        self.create_transaction()
+        self.create_transaction(date=date(2025, 2, 1))
+        self.create_transaction(type='income', category=self.salary, amount=Decimal('100.00'))
+
+        response = self.client.get('/api/v1/transactions/stats/', {'end_date': '2025-01-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_income'], '100.00')
+        self.assertEqual(response.data['total_expenses'], '10.00')
+        self.assertEqual(response.data['transaction_count'], 2)
+        self.assertEqual(
+            response.data['category_breakdown']['expense'],
+            {self.food.id: {'total': 10.0, 'count': 1}}
+        )
+
+    def test_stats_query_count(self):
+        self.create_transaction()
+        self.create_transaction(type='income', category=self.salary, amount=Decimal('100.00'))
+
+        # One conditional aggregate for the totals, one grouped query for the breakdown
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/transactions/stats/')
+
+        self.assertEqual(response.data['balance'], '90.00')
+        self.assertEqual(
+            response.data['category_breakdown']['income'],
+            {self.salary.id: {'total': 100.0, 'count': 1}}
+        )
+
+
+class KeysetPaginationTests(TransactionTestCase):
+    """Transaction list pages by keyset cursor over (date, created_at, id)"""
+
+    def setUp(self):
+        super().setUp()
+        # Several rows share a date so the tie-breakers matter
+        self.transactions = [
+            self.create_transaction(date=date(2025, 1, day), amount=Decimal(amount))
+            for day, amount in [(1, '5'), (2, '1'), (2, '9'), (2, '3'), (3, '7'), (3, '2'), (4, '8')]
+        ]
+
+    def collect(self, url, params):
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            if not response.data['next']:
+                return pages
+            response = self.client.get(response.data['next'])
+
+    def test_walks_all_pages_in_order(self):
+        pages = self.collect('/api/v1/transactions/', {'page_size': 3})
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        expected = Transaction.objects.filter(user=self.user).order_by('-date', '-created_at', '-id')
+        self.assertEqual(ids, [tx.id for tx in expected])
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        self.assertIsNone(pages[0]['previous'])
+
+        previous = self.client.get(pages[2]['previous'])
+        self.assertEqual(previous.data['results'], pages[1]['results'])
+
+    def test_filters_and_ordering(self):
+        self.create_transaction(type='income', category=self.salary, amount=Decimal('50'))
+
+        pages = self.collect('/api/v1/transactions/', {'page_size': 2, 'type': 'expense', 'ordering': 'amount'})
+        amounts = [row['amount'] for page in pages for row in page['results']]
+        self.assertEqual(amounts, ['1.00', '2.00', '3.00', '5.00', '7.00', '8.00', '9.00'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/v1/transactions/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class TransactionQueryCountTests(TransactionTestCase):
+    """List endpoints must not fetch categories row by row"""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def add_transactions(self, count):
+        categories = list(Category.objects.filter(user=self.user))
+        for index in range(count):
+            self.create_transaction(category=categories[index % len(categories)])
+
+    def test_list_and_recent_are_bounded(self):
+        self.add_transactions(2)
+        baseline = {url: self.count_queries(url) for url in ('/api/v1/transactions/', '/api/v1/transactions/recent/')}
+
+        self.add_transactions(10)
+        for url, count in baseline.items():
+            self.assertEqual(self.count_queries(url), count, url)
+
+    def test_benchmark_stats_times_uncached_runs(self):
+        out = StringIO()
+        call_command('benchmark_stats', '--transactions', '50', '--repeat', '2', stdout=out)
+
+        after = next(line for line in out.getvalue().splitlines() if line.startswith('after'))
+        self.assertNotIn('queries=0 ', after)
+
+
+class BulkImportTests(TransactionTestCase):
+
+    def test_json_import_reports_row_errors(self):
+        rows = [
+            {'date': '2025-01-10', 'merchant': 'Cafe', 'category': 'food & dining', 'type': 'expense', 'amount': '4.50'},
+            {'date': '2025-01-11', 'merchant': 'Employer', 'category': self.salary.id, 'type': 'income', 'amount': 1000},
+            {'date': 'yesterday', 'merchant': '', 'category': 'Nope', 'type': 'gift', 'amount': '-1'},
+        ]
+
+        response = self.client.post('/api/v1/transactions/bulk_import/', rows, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertEqual(
+            set(response.data['errors'][0]['errors']),
+            {'date', 'merchant', 'category', 'type', 'amount'}
+        )
+        self.assertEqual(
+            self.rollup_totals(),
+            {
+                (date(2025, 1, 10), self.food.id, 'expense'): (Decimal('4.50'), 1),
+                (date(2025, 1, 11), self.salary.id, 'income'): (Decimal('1000.00'), 1),
+            }
+        )
+
+    def test_json_import_rejects_odd_values(self):
+        rows = [
+            {'date': '2025-01-10', 'merchant': 'Cafe', 'type': 'expense', 'amount': '4.50', 'notes': 5},
+            {'date': '2025-01-10', 'merchant': 'Cafe', 'type': 'expense', 'amount': '4.50', 'notes': {'a': 1}},
+            {'date': '2025-01-10', 'merchant': 'Cafe', 'type': 'expense', 'amount': '4.50', 'category': '\u00b2'},
+            {'date': '2025-01-10', 'merchant': 'Cafe', 'type': 'expense', 'amount': '4.50', 'category': True},
+        ]
+
+        response = self.client.post('/api/v1/transactions/bulk_import/', rows, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(
+            [(error['row'], set(error['errors'])) for error in response.data['errors']],
+            [(1, {'notes'}), (2, {'category'}), (3, {'category'})]
+        )
+        self.assertEqual(Transaction.objects.get(user=self.user).notes, '5')
+
+    def test_csv_import_round_trips_export(self):
+        self.create_transaction(notes='Lunch, with team')
+        self.create_transaction(category=None, type='income', amount=Decimal('20.00'))
+        export = self.client.get(
+            '/api/v1/reports/export-csv/',
+            {'start_date': '2025-01-01', 'end_date': '2025-01-31'}
+        )
+        upload = SimpleUploadedFile('export.csv', b''.join(export.streaming_content), content_type='text/csv')
+
+        response = self.client.post(
+            '/api/v1/transactions/bulk_import/?batch_size=1', {'file': upload}, format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(Transaction.objects.filter(user=self.user, notes='Lunch, with team').count(), 2)
+
+    def test_rejects_empty_payload(self):
+        response = self.client.post('/api/v1/transactions/bulk_import/', [], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_unreadable_csv(self):
+        latin1 = 'Date,Merchant,Category,Type,Amount,Notes\n2025-01-10,Café,,expense,4.50,\n'.encode('latin-1')
+        oversized = b'Date,Merchant,Category,Type,Amount,Notes\n2025-01-10,' + b'x' * (csv.field_size_limit() + 1)
+
+        for name, content in (('latin1.csv', latin1), ('oversized.csv', oversized)):
+            upload = SimpleUploadedFile(name, content, content_type='text/csv')
+            response = self.client.post('/api/v1/transactions/bulk_import/', {'file': upload}, format='multipart')
+            self.assertEqual(response.status_code, 400, name)
+            self.assertIn('error', response.json())
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+
+class TransactionWriteTests(TransactionTestCase):
+
+    def payload(self, **kwargs):
+        values = {
+            'amount': '12.50', 'date': '2025-01-10', 'merchant': 'Cafe',
+            'type': 'expense', 'category': self.food.id
+        }
+        values.update(kwargs)
+        return values
+
+    @staticmethod
+    def own_queries(queries):
+        """Queries against transactions and categories, leaving out derived data"""
+        return [
+            query['sql'].split()[0] for query in queries.captured_queries
+            if '"transactions_transaction"' in query['sql'] or '"transactions_category"' in query['sql']
+        ]
+
+    def test_create_is_one_lookup_and_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/v1/transactions/', self.payload(), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['category_detail']['name'], 'Food & Dining')
+        self.assertEqual(self.own_queries(queries), ['SELECT', 'INSERT'])
+
+    def test_rejects_another_users_category(self):
+        stranger = User.objects.create_user(email='w@example.com', username='w', password='pass12345')
+        foreign = Category.objects.filter(user=stranger).first()
+
+        response = self.client.post('/api/v1/transactions/', self.payload(category=foreign.id), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.data)
+
+        tx = self.create_transaction()
+        response = self.client.patch(f'/api/v1/transactions/{tx.id}/', {'category': foreign.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_create(self):
+        CategorizationRule.objects.create(user=self.user, match_type='exact', pattern='payroll', category=self.salary)
+        rows = [self.payload(merchant=f'Cafe {index}') for index in range(10)]
+        rows.append(self.payload(merchant='Payroll', type='income', amount='900.00', category=None))
+        del rows[-1]['category']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/v1/transactions/', rows, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 11)
+        self.assertEqual(response.data[-1]['category_detail']['name'], 'Salary')
+        self.assertTrue(all(item['id'] for item in response.data))
+        self.assertEqual(self.own_queries(queries), ['SELECT', 'INSERT'])
+        self.assertEqual(
+            self.rollup_totals(),
+            {
+                (date(2025, 1, 10), self.food.id, 'expense'): (Decimal('125.00'), 10),
+                (date(2025, 1, 10), self.salary.id, 'income'): (Decimal('900.00'), 1),
+            }
+        )
+
+    def test_batch_is_all_or_nothing(self):
+        response = self.client.post(
+            '/api/v1/transactions/',
+            [self.payload(), self.payload(category=999999), self.payload(amount='0')],
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        # Errors are keyed by the position of each invalid row
+        self.assertEqual(set(response.data), {1, 2})
+        self.assertIn('category', response.data[1])
+        self.assertIn('amount', response.data[2])
+        self.assertFalse(Transaction.objects.exists())
+
+
+class BulkUpdateTests(TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.shopping = Category.objects.get(user=self.user, name='Shopping')
+
+    def test_recategorize_by_ids_moves_rollups(self):
+        first = self.create_transaction()
+        second = self.create_transaction(amount=Decimal('5.00'), date=date(2025, 1, 11))
+        untouched = self.create_transaction(amount=Decimal('1.00'))
+        stranger = User.objects.create_user(email='bu@example.com', username='bu', password='pass12345')
+        foreign = self.create_transaction(user=stranger, category=None)
+
+        response = self.client.patch(
+            '/api/v1/transactions/bulk_update/',
+            {'ids': [first.id, second.id, foreign.id], 'category': self.shopping.id},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'updated': 2, 'skipped': 1})
+        self.assertEqual(Transaction.objects.filter(category=self.shopping).count(), 2)
+        untouched.refresh_from_db()
+        foreign.refresh_from_db()
+        self.assertEqual((untouched.category, foreign.category), (self.food, None))
+        self.assertEqual(
+            self.rollup_totals(),
+            {
+                (date(2025, 1, 10), self.food.id, 'expense'): (Decimal('1.00'), 1),
+                (date(2025, 1, 10), self.shopping.id, 'expense'): (Decimal('10.00'), 1),
+                (date(2025, 1, 11), self.shopping.id, 'expense'): (Decimal('5.00'), 1),
+            }
+        )
+
+    def test_filter_targets_and_date_shift(self):
+        self.create_transaction(merchant='Grocer')
+        self.create_transaction(merchant='Grocer', date=date(2025, 1, 31))
+        self.create_transaction(merchant='Cinema')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                '/api/v1/transactions/bulk_update/?merchant=grocer',
+                {'date_shift': 2, 'notes': 'moved'},
+                format='json'
+            )
+
+        self.assertEqual(response.json(), {'updated': 2, 'skipped': 0})
+        self.assertEqual(
+            sorted(Transaction.objects.filter(notes='moved').values_list('date', flat=True)),
+            [date(2025, 1, 12), date(2025, 2, 2)]
+        )
+        self.assertEqual(
+            len([query for query in queries.captured_queries if query['sql'].startswith('UPDATE "transactions_transaction"')]),
+            1
+        )
+        self.assertEqual(
+            self.rollup_totals(),
+            {
+                (date(2025, 1, 10), self.food.id, 'expense'): (Decimal('10.00'), 1),
+                (date(2025, 1, 12), self.food.id, 'expense'): (Decimal('10.00'), 1),
+                (date(2025, 2, 2), self.food.id, 'expense'): (Decimal('10.00'), 1),
+            }
+        )
+
+    def test_rejects_foreign_category_and_missing_targets(self):
+        tx = self.create_transaction()
+        stranger = User.objects.create_user(email='bu2@example.com', username='bu2', password='pass12345')
+        foreign_category = Category.objects.filter(user=stranger).first()
+
+        response = self.client.patch(
+            '/api/v1/transactions/bulk_update/',
+            {'ids': [tx.id], 'category': foreign_category.id},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.json())
+
+        response = self.client.patch('/api/v1/transactions/bulk_update/', {'type': 'income'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.patch('/api/v1/transactions/bulk_update/', {'ids': [tx.id]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        tx.refresh_from_db()
+        self.assertEqual(tx.category, self.food)
+
+
+class CategorizationRuleTests(TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.shopping = Category.objects.get(user=self.user, name='Shopping')
+        self.travel = Category.objects.get(user=self.user, name='Travel')
+
+    def rule(self, match_type, pattern, category, **kwargs):
+        return CategorizationRule.objects.create(
+            user=self.user, match_type=match_type, pattern=pattern, category=category, **kwargs
+        )
+
+    def test_matcher_priorities_and_amount_ranges(self):
+        self.rule('exact', 'Amazon', self.shopping)
+        self.rule('prefix', 'amazon web', self.travel, priority=-1)
+        self.rule('regex', r'uber\s*eats', self.food)
+        self.rule('regex', r'uber', self.travel, priority=1)
+        self.rule('prefix', '', self.food, priority=10, min_amount=Decimal('1000.00'))
+        matcher = MerchantMatcher(CategorizationRule.objects.filter(user=self.user))
+
+        self.assertEqual(matcher.match('  AMAZON '), self.shopping.id)
+        self.assertEqual(matcher.match('Amazon Web Services'), self.travel.id)
+        self.assertEqual(matcher.match('UBER   EATS 123'), self.food.id)
+        self.assertEqual(matcher.match('Uber trip'), self.travel.id)
+        self.assertIsNone(matcher.match('Corner shop', Decimal('5.00')))
+        self.assertEqual(matcher.match('Corner shop', Decimal('1500.00')), self.food.id)
+
+    def test_matcher_is_cached_until_rules_change(self):
+        rule = self.rule('exact', 'cinema', self.shopping)
+        matcher = get_matcher(self.user.id)
+
+        # Only the shared rules version is read
+        with self.assertNumQueries(1):
+            self.assertIs(get_matcher(self.user.id), matcher)
+
+        rule.category = self.travel
+        rule.save()
+        self.assertEqual(get_matcher(self.user.id).match('Cinema'), self.travel.id)
+
+    def test_matcher_skips_unsafe_stored_patterns(self):
+        self.rule('regex', '(a+)+$', self.food)
+        self.rule('regex', r'^(?:uber|lyft)\s+\w+', self.travel)
+        matcher = MerchantMatcher(CategorizationRule.objects.filter(user=self.user))
+
+        self.assertIsNone(matcher.match('a' * 40 + '!'))
+        self.assertEqual(matcher.match('Lyft ride'), self.travel.id)
+
+    def test_applied_on_create_and_import(self):
+        self.rule('prefix', 'amzn', self.shopping)
+
+        response = self.client.post('/api/v1/transactions/', {
+            'amount': '12.00', 'date': '2025-01-10', 'merchant': 'AMZN Mktp', 'type': 'expense'
+        }, format='json')
+        self.assertEqual(response.data['category'], self.shopping.id)
+
+        # An explicit null keeps the transaction uncategorized
+        response = self.client.post('/api/v1/transactions/', {
+            'amount': '12.00', 'date': '2025-01-10', 'merchant': 'AMZN Mktp', 'type': 'expense', 'category': None
+        }, format='json')
+        self.assertIsNone(response.data['category'])
+
+        response = self.client.post('/api/v1/transactions/bulk_import/', [
+            {'date': '2025-01-11', 'merchant': 'amzn digital', 'type': 'expense', 'amount': '3.00'},
+            {'date': '2025-01-11', 'merchant': 'Bakery', 'type': 'expense', 'amount': '4.00'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            dict(Transaction.objects.filter(date=date(2025, 1, 11)).values_list('merchant', 'category')),
+            {'amzn digital': self.shopping.id, 'Bakery': None}
+        )
+
+    def test_backfill_command_and_apply_endpoint(self):
+        for index in range(5):
+            self.create_transaction(category=None, merchant=f'Shell Station {index}')
+        self.create_transaction(category=None, merchant='Bakery')
+        self.rule('regex', r'^shell\b', self.travel)
+
+        out = StringIO()
+        call_command('categorize_transactions', '--batch-size', '2', stdout=out)
+        self.assertIn('Categorized 5 of 6', out.getvalue())
+        self.assertEqual(
+            self.rollup_totals(),
+            {
+                (date(2025, 1, 10), self.travel.id, 'expense'): (Decimal('50.00'), 5),
+                (date(2025, 1, 10), None, 'expense'): (Decimal('10.00'), 1),
+            }
+        )
+
+        self.rule('exact', 'bakery', self.food)
+        response = self.client.post('/api/v1/categorization-rules/apply/')
+        self.assertEqual(response.json(), {'scanned': 1, 'categorized': 1})
+
+    def test_rule_api_validation(self):
+        stranger = User.objects.create_user(email='rules@example.com', username='rules', password='pass12345')
+        url = '/api/v1/categorization-rules/'
+
+        response = self.client.post(url, {'match_type': 'regex', 'pattern': '(?P<x>a)', 'category': self.food.id})
+        self.assertIn('pattern', response.json())
+        response = self.client.post(url, {'match_type': 'regex', 'pattern': '([', 'category': self.food.id})
+        self.assertIn('pattern', response.json())
+        for pattern in ('(a+)+$', '(?:x*y?)*z', '(ab|a)+c', 'a' * 101):
+            response = self.client.post(url, {'match_type': 'regex', 'pattern': pattern, 'category': self.food.id})
+            self.assertIn('pattern', response.json(), pattern)
+        response = self.client.post(url, {
+            'match_type': 'exact', 'pattern': 'x', 'category': Category.objects.filter(user=stranger).first().id
+        })
+        self.assertIn('category', response.json())
+        response = self.client.post(url, {
+            'match_type': 'prefix', 'pattern': '', 'category': self.food.id, 'min_amount': '5', 'max_amount': '1'
+        })
+        self.assertIn('max_amount', response.json())
+
+        response = self.client.post(url, {'match_type': 'exact', 'pattern': 'Cafe', 'category': self.food.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.client.get(url).json()), 1)
+
+
+class TransactionSearchTests(TransactionTestCase):
+
+    def test_search_matches_merchant_notes_and_category_name(self):
+        cafe = self.create_transaction(merchant='Corner Cafe')
+        noted = self.create_transaction(merchant='Market', notes='weekly groceries', category=None)
+        salary = self.create_transaction(merchant='Employer', type='income', category=self.salary)
+
+        def search(term):
+            response = self.client.get('/api/v1/transactions/', {'search': term})
+            self.assertEqual(response.status_code, 200)
+            return {row['id'] for row in response.data['results']}
+
+        self.assertEqual(search('corner'), {cafe.id})
+        self.assertEqual(search('grocer'), {noted.id})
+        self.assertEqual(search('salary'), {salary.id})
+        self.assertEqual(search('dining cafe'), {cafe.id})
+
+    def test_postgres_search_resolves_categories_in_one_query(self):
+        request = Request(APIRequestFactory().get('/', {'search': 'din cafe sal'}))
+        request.user = self.user
+
+        with mock.patch.object(connection, 'vendor', 'postgresql'), self.assertNumQueries(1):
+            queryset = TransactionSearchFilter().filter_queryset(request, Transaction.objects.all(), None)
+
+        sql = str(queryset.query)
+        self.assertIn(f'"category_id" IN ({self.food.id})', sql)
+        self.assertIn(f'"category_id" IN ({self.salary.id})', sql)
+
+
+class TrendsTests(TransactionTestCase):
+
+    def trends(self, **params):
+        response = self.client.get('/api/v1/transactions/trends/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['date'], float(row['income']), float(row['expense'])) for row in response.json()]
+
+    def test_daily_window_is_zero_filled(self):
+        self.create_transaction(date=date(2025, 1, 1))
+        self.create_transaction(date=date(2025, 1, 3), type='income', category=self.salary, amount=Decimal('50.00'))
+        self.create_transaction(date=date(2025, 1, 9))
+
+        self.assertEqual(self.trends(start_date='2025-01-02', end_date='2025-01-04'), [
+            ('2025-01-02', 0, 0),
+            ('2025-01-03', 50, 0),
+            ('2025-01-04', 0, 0),
+        ])
+
+    def test_granularities(self):
+        self.create_transaction(date=date(2025, 1, 6))
+        self.create_transaction(date=date(2025, 1, 12))
+        self.create_transaction(date=date(2025, 3, 31))
+
+        self.assertEqual(self.trends(start_date='2025-01-08', end_date='2025-01-20', granularity='week'), [
+            ('2025-01-06', 0, 10),
+            ('2025-01-13', 0, 0),
+            ('2025-01-20', 0, 0),
+        ])
+        self.assertEqual(
+            [row[2] for row in self.trends(start_date='2025-01-01', end_date='2025-03-31', granularity='month')],
+            [20, 0, 10]
+        )
+        self.assertEqual(self.trends(start_date='2024-06-01', end_date='2025-12-31', granularity='year'), [
+            ('2024-01-01', 0, 0),
+            ('2025-01-01', 0, 30),
+        ])
+
+    def test_defaults_to_last_30_days(self):
+        self.assertEqual(len(self.trends()), 30)
+
+    def test_rejects_bad_params(self):
+        for params in ({'granularity': 'hour'}, {'start_date': '2025-13-01'}, {'start_date': '2025-02-01', 'end_date': '2025-01-01'}):
+            response = self.client.get('/api/v1/transactions/trends/', params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_limits_range_and_reaches_the_last_date(self):
+        for params in (
+            {'start_date': '0001-01-01', 'end_date': '2025-01-01'},
+            {'start_date': '2000-01-01', 'end_date': '2060-01-01', 'granularity': 'month'},
+            {'end_date': '0001-01-01'},
+        ):
+            response = self.client.get('/api/v1/transactions/trends/', params)
+            self.assertEqual(response.status_code, 400, params)
+
+        self.assertEqual(self.trends(start_date='9990-01-01', end_date='9999-12-31', granularity='year')[-1][0], '9999-01-01')
+        self.assertEqual(len(self.trends(start_date='9999-12-01', end_date='9999-12-31', granularity='month')), 1)
+        self.assertEqual(len(self.trends(start_date='9999-12-25', end_date='9999-12-31', granularity='week')), 2)
@@ -1,11 +1,12 @@
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from sync.tracking import AtomicWritesMixin
 from ..models import Category
 from .serializers import CategorySerializer
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(AtomicWritesMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing categories.
     Supports CRUD operations for custom user categories.
@@ -0,0 +1,148 @@
+import csv
+import io
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from ..models import Category, Transaction
+
+
+# Same column layout as ReportExportCSVView
+CSV_COLUMNS = ['Date', 'Merchant', 'Category', 'Type', 'Amount', 'Notes']
+
+MAX_AMOUNT = Decimal('99999999.99')
+
+# None while notes is an unbounded TextField
+MAX_NOTES_LENGTH = Transaction._meta.get_field('notes').max_length
+
+
+class TransactionImporter:
+    """
+    Validate imported rows and turn them into unsaved Transaction objects.
+
+    Categories are resolved by id or (case-insensitive) name against a
+    single lookup of the user's categories, so validation never touches
+    the database per row.
+    """
+    transaction_types = {choice[0] for choice in Transaction.TYPE_CHOICES}
+
+    def __init__(self, user):
+        self.user = user
+        self.categories_by_id = {}
+        self.categories_by_name = {}
+        for category in Category.objects.filter(user=user):
+            self.categories_by_id[category.id] = category
+            self.categories_by_name[category.name.casefold()] = category
+
+    @staticmethod
+    def read_csv(uploaded_file):
+        """
+        Read an uploaded CSV (with or without a BOM) into row dicts keyed by lowercase column.
+        Raises ValueError when the file is not UTF-8 or not valid CSV.
+        """
+        text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+        reader = csv.DictReader(text)
+        try:
+            return [
+                {(key or '').strip().lower(): value for key, value in row.items()}
+                for row in reader
+            ]
+        except UnicodeDecodeError:
+            raise ValueError('The file must be UTF-8 encoded')
+        except csv.Error as exc:
+            raise ValueError(f'Invalid CSV on line {reader.line_num}: {exc}')
+
+    def validate(self, rows):
+        """
+        Returns:
+            tuple: (list of Transaction objects, list of per-row error dicts)
+        """
+        transactions = []
+        errors = []
+
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors.append({'row': index, 'errors': {'non_field_errors': ['Expected an object']}})
+                continue
+
+            row_errors = {}
+            values = {
+                'date': self._parse_date(row.get('date'), row_errors),
+                'merchant': self._parse_merchant(row.get('merchant'), row_errors),
+                'category': self._parse_category(row.get('category'), row_errors),
+                'type': self._parse_type(row.get('type'), row_errors),
+                'amount': self._parse_amount(row.get('amount'), row_errors),
+                'notes': self._parse_notes(row.get('notes'), row_errors),
+            }
+
+            if row_errors:
+                errors.append({'row': index, 'errors': row_errors})
+            else:
+                transactions.append(Transaction(user=self.user, **values))
+
+        return transactions, errors
+
+    @staticmethod
+    def _parse_date(value, errors):
+        try:
+            return date.fromisoformat(str(value).strip())
+        except (TypeError, ValueError):
+            errors['date'] = ['Enter a valid date (YYYY-MM-DD).']
+
+    @staticmethod
+    def _parse_merchant(value, errors):
+        merchant = str(value or '').strip()
+        if not merchant:
+            errors['merchant'] = ['This field is required.']
+        elif len(merchant) > 255:
+            errors['merchant'] = ['Ensure this field has no more than 255 characters.']
+        return merchant
+
+    def _parse_category(self, value, errors):
+        if value in (None, ''):
+            return None
+
+        category = None
+        if isinstance(value, int) and not isinstance(value, bool):
+            category = self.categories_by_id.get(value)
+        elif isinstance(value, str) and value.strip().isascii() and value.strip().isdecimal():
+            category = self.categories_by_id.get(int(value))
+        if category is None:
+            category = self.categories_by_name.get(str(value).strip().casefold())
+
+        if category is None:
+            errors['category'] = [f'Unknown category "{value}".']
+        return category
+
+    def _parse_type(self, value, errors):
+        transaction_type = str(value or '').strip().lower()
+        if transaction_type not in self.transaction_types:
+            errors['type'] = [f'"{value}" is not a valid choice.']
+        return transaction_type
+
+    @staticmethod
+    def _parse_notes(value, errors):
+        if value is None:
+            return None
+        # JSON rows may carry numbers; anything else is not text
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            errors['notes'] = ['Not a valid string.']
+            return None
+
+        notes = str(value).strip()
+        if MAX_NOTES_LENGTH is not None and len(notes) > MAX_NOTES_LENGTH:
+            errors['notes'] = [f'Ensure this field has no more than {MAX_NOTES_LENGTH} characters.']
+        return notes or None
+
+    @staticmethod
+    def _parse_amount(value, errors):
+        try:
+            amount = Decimal(str(value).strip())
+        except (InvalidOperation, TypeError):
+            errors['amount'] = ['A valid number is required.']
+            return None
+
+        if not amount.is_finite() or amount < Decimal('0.01') or amount > MAX_AMOUNT:
+            errors['amount'] = ['Ensure this value is between 0.01 and 99999999.99.']
+        elif amount.as_tuple().exponent < -2:
+            errors['amount'] = ['Ensure that there are no more than 2 decimal places.']
+        return amount
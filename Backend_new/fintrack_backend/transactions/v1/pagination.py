@@ -0,0 +1,159 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+KeysetCursor = namedtuple('KeysetCursor', ['position', 'reverse'])
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder without the millisecond truncation of datetimes"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on the full ordering key.
+
+    DRF's CursorPagination only stores the first ordering field plus an
+    offset, which degrades to OFFSET scans when many rows share a date.
+    This cursor stores every ordering value (with `id` as a tie-breaker),
+    so each page is a `WHERE (date, created_at, id) < (...)` range scan on
+    the matching composite index, whatever the depth.
+
+    Ordering fields must be non-nullable.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-date', '-created_at')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor.reverse if self.cursor else False
+        ordering = self.ordering
+        if reverse:
+            ordering = [self._flip(field) for field in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if self.cursor:
+            queryset = queryset.filter(self._seek(ordering, self.cursor.position))
+
+        # Fetch one extra row to find out whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """Use the ordering applied by OrderingFilter, falling back to the default"""
+        ordering = [
+            field for field in queryset.query.order_by
+            if isinstance(field, str)
+        ] or list(self.ordering)
+
+        # A unique tie-breaker makes every position a strict total order
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(KeysetCursor(self._position(self.page[-1]), reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(KeysetCursor(self._position(self.page[0]), reverse=True))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position = payload['p']
+            if len(position) != len(self.ordering):
+                raise ValueError('Cursor does not match ordering')
+            position = [
+                self._to_python(field, value)
+                for field, value in zip(self.ordering, position)
+            ]
+            return KeysetCursor(position, bool(payload.get('r')))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        payload = {'p': cursor.position}
+        if cursor.reverse:
+            payload['r'] = 1
+
+        encoded = urlsafe_b64encode(
+            json.dumps(payload, cls=CursorEncoder).encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, instance):
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    def _to_python(self, field, value):
+        try:
+            return self.model._meta.get_field(field.lstrip('-')).to_python(value)
+        except FieldDoesNotExist:
+            # Annotations are stored as plain JSON values
+            return value
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _seek(ordering, position):
+        """
+        Build the row-value comparison `(a, b, c) > (x, y, z)` as
+        a >= x AND (a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)),
+        honouring each field's direction. The redundant leading bound gives
+        the planner an index range to start from.
+        """
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): value for f, value in zip(ordering[:index], position)}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': position[index]}))
+
+        first = ordering[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+
+        return bound & reduce(lambda left, right: left | right, clauses)
@@ -0,0 +1,38 @@
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from ..models import CategorizationRule
+from ..services import backfill_categories
+from .serializers import CategorizationRuleSerializer
+
+
+class CategorizationRuleViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for managing merchant categorization rules.
+    Rules fill in the category of new and imported transactions that
+    arrive without one.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = CategorizationRuleSerializer
+
+    def get_queryset(self):
+        """Return rules for the authenticated user only"""
+        return CategorizationRule.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        """Automatically set the user when creating a rule"""
+        serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        """Ensure user ownership on update"""
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['post'])
+    def apply(self, request):
+        """Categorize the user's existing uncategorized transactions with the current rules"""
+        scanned, categorized = backfill_categories(user=request.user)
+        return Response(
+            {'scanned': scanned, 'categorized': categorized},
+            status=status.HTTP_200_OK
+        )
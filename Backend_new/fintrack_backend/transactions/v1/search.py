@@ -0,0 +1,75 @@
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from rest_framework import filters
+
+from ..models import Category
+
+
+class TransactionSearchFilter(filters.SearchFilter):
+    """
+    Ranked substring search over merchant, notes and category name.
+
+    On PostgreSQL each term must occur somewhere in one of the fields
+    (case-insensitive, anywhere in the text, not only at the start of a
+    word) and is served by the trigram GIN indexes from migration 0005.
+    Categories matching any term are read from the user's small category
+    table in one query, so the main query stays on one table. Results are
+    annotated with `search_rank`, the best trigram word similarity summed
+    over the terms. Other databases fall back to the standard
+    SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        categories = Category.objects.filter(
+            reduce(or_, (Q(name__icontains=term) for term in terms)),
+            user=request.user
+        ).values_list('id', 'name')
+        # icontains compiles to UPPER(...) LIKE UPPER(...), so match the same way
+        categories = [(category_id, name.upper()) for category_id, name in categories]
+
+        ranks = []
+        for term in terms:
+            category_ids = [category_id for category_id, name in categories if term.upper() in name]
+
+            queryset = queryset.filter(
+                Q(merchant__icontains=term)
+                | Q(notes__icontains=term)
+                | Q(category_id__in=category_ids)
+            )
+            ranks.append(Greatest(
+                TrigramWordSimilarity(term, 'merchant'),
+                TrigramWordSimilarity(term, Coalesce('notes', Value('')))
+            ))
+
+        return queryset.annotate(
+            search_rank=reduce(lambda left, right: left + right, ranks)
+        )
+
+
+class TransactionOrderingFilter(filters.OrderingFilter):
+    """
+    Order ranked search results by `search_rank` unless the client picked
+    an ordering, and ignore `search_rank` when no rank was computed.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view) or []
+
+        if 'search_rank' not in queryset.query.annotations:
+            ordering = [field for field in ordering if field.lstrip('-') != 'search_rank']
+        elif not request.query_params.get(self.ordering_param):
+            ordering = ['-search_rank', *ordering]
+
+        if ordering:
+            return queryset.order_by(*ordering)
+        return queryset
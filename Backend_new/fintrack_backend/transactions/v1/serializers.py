@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from ..models import Transaction, Category
+from ..categorization import categorize, validate_pattern
+from ..models import CategorizationRule, Transaction, Category
+from ..services import bulk_create_transactions
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -11,8 +13,72 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Category id limited to the requesting user's own categories.
+    Batches resolve ids from the categories preloaded into the context
+    instead of querying row by row.
+    """
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Category.objects.none()
+        return Category.objects.filter(user=request.user)
+
+    def to_internal_value(self, data):
+        categories = self.context.get('categories')
+        if categories is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            category = categories.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if category is None:
+            self.fail('does_not_exist', pk_value=data)
+        return category
+
+
+class TransactionBatchSerializer(serializers.ListSerializer):
+    """
+    Creates an array of transactions at once: the user's categories are
+    loaded in one query for the whole batch and the rows are inserted
+    with bulk_create_transactions.
+    """
+    max_batch_size = 500
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', self.max_batch_size)
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        request = self.context.get('request')
+        if request is not None:
+            self._context['categories'] = {
+                category.id: category
+                for category in Category.objects.filter(user=request.user)
+            }
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        transactions = [Transaction(**attrs) for attrs in validated_data]
+
+        # Rows that sent no category at all take one from the user's rules
+        categorize([tx for tx, attrs in zip(transactions, validated_data) if 'category' not in attrs])
+        categories = self.context.get('categories', {})
+        for tx in transactions:
+            if tx.category_id in categories:
+                tx.category = categories[tx.category_id]
+
+        return bulk_create_transactions(transactions)
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     """Full serializer for Transaction model"""
+    category = UserCategoryField(required=False, allow_null=True)
     category_detail = CategorySerializer(source='category', read_only=True)
     
     class Meta:
@@ -22,6 +88,7 @@ class TransactionSerializer(serializers.ModelSerializer):
             'type', 'notes', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = TransactionBatchSerializer
 
 
 class TransactionListSerializer(serializers.ModelSerializer):
@@ -44,3 +111,65 @@ class TransactionStatsSerializer(serializers.Serializer):
     balance = serializers.DecimalField(max_digits=10, decimal_places=2)
     transaction_count = serializers.IntegerField()
     category_breakdown = serializers.DictField()
+
+
+class CategorizationRuleSerializer(serializers.ModelSerializer):
+    """Serializer for CategorizationRule; categories are limited to the user's own"""
+
+    class Meta:
+        model = CategorizationRule
+        fields = [
+            'id', 'category', 'match_type', 'pattern', 'min_amount', 'max_amount',
+            'priority', 'is_active', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            self.fields['category'].queryset = Category.objects.filter(user=request.user)
+
+    def validate(self, attrs):
+        match_type = attrs.get('match_type', getattr(self.instance, 'match_type', 'exact'))
+        pattern = attrs.get('pattern', getattr(self.instance, 'pattern', ''))
+        min_amount = attrs.get('min_amount', getattr(self.instance, 'min_amount', None))
+        max_amount = attrs.get('max_amount', getattr(self.instance, 'max_amount', None))
+
+        if match_type == 'regex':
+            try:
+                validate_pattern(pattern)
+            except ValueError as exc:
+                raise serializers.ValidationError({'pattern': [str(exc)]})
+        if match_type != 'prefix' and not pattern.strip():
+            raise serializers.ValidationError({'pattern': ['This field may not be blank.']})
+        if min_amount is not None and max_amount is not None and min_amount > max_amount:
+            raise serializers.ValidationError({'max_amount': ['Must be greater than or equal to min_amount.']})
+        return attrs
+
+
+class TransactionBulkUpdateSerializer(serializers.Serializer):
+    """
+    Validates a bulk edit: optional target ids plus the fields to change.
+    Only categories owned by the requesting user are accepted.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.none(), required=False, allow_null=True)
+    type = serializers.ChoiceField(choices=Transaction.TYPE_CHOICES, required=False)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    date_shift = serializers.IntegerField(required=False, min_value=-3650, max_value=3650)
+
+    PATCH_FIELDS = ['category', 'type', 'notes', 'date_shift']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            self.fields['category'].queryset = Category.objects.filter(user=request.user)
+
+    def validate(self, attrs):
+        if not any(field in attrs for field in self.PATCH_FIELDS):
+            raise serializers.ValidationError(
+                f"Provide at least one of: {', '.join(self.PATCH_FIELDS)}"
+            )
+        return attrs
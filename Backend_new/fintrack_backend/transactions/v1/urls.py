@@ -2,11 +2,13 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import TransactionViewSet
 from .category_views import CategoryViewSet
+from .rule_views import CategorizationRuleViewSet
 
 # Create router for viewsets
 router = DefaultRouter()
 router.register(r'transactions', TransactionViewSet, basename='transaction')
 router.register(r'categories', CategoryViewSet, basename='category')
+router.register(r'categorization-rules', CategorizationRuleViewSet, basename='categorization-rule')
 
 urlpatterns = [
     path('', include(router.urls)),
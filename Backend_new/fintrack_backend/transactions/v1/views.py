@@ -1,34 +1,105 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from rest_framework.serializers import ListSerializer
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Count, Q
+from django.db import transaction as db_transaction
+from django.db.models import F, Sum, Q
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 from decimal import Decimal
-from ..models import Transaction
+from core.cache import cached_response
+from sync.tracking import AtomicWritesMixin, record_deletes
+from ..categorization import categorize, get_matcher
+from ..models import Transaction, DailyTransactionRollup
+from ..rollups import grouped_deltas
+from ..services import bulk_create_transactions, bulk_update_transactions
+from ..signals import defer_row_signals, transactions_changed
 from .serializers import (
     TransactionSerializer,
     TransactionListSerializer,
-    TransactionStatsSerializer
+    TransactionStatsSerializer,
+    TransactionBulkUpdateSerializer
 )
 from .filters import TransactionFilter
+from .importers import TransactionImporter
+from .pagination import KeysetPagination
+from .search import TransactionSearchFilter, TransactionOrderingFilter
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+# Database truncation for each trends granularity; days are already dates
+TREND_TRUNCATIONS = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+# Longest range trends will fill in, in periods of each granularity
+TREND_MAX_PERIODS = {
+    'day': 1096,
+    'week': 520,
+    'month': 600,
+    'year': 100,
+}
+
+
+def period_start(day, granularity):
+    """First day of the period containing `day`, matching the Trunc functions"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def period_count(start_date, end_date, granularity):
+    """Number of periods from the one containing `start_date` to the one containing `end_date`"""
+    if granularity == 'week':
+        return (period_start(end_date, granularity) - period_start(start_date, granularity)).days // 7 + 1
+    if granularity == 'month':
+        return (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+    if granularity == 'year':
+        return end_date.year - start_date.year + 1
+    return (end_date - start_date).days + 1
+
+
+def next_period(period, granularity):
+    """First day of the period after `period`"""
+    if granularity == 'week':
+        return period + timedelta(weeks=1)
+    if granularity == 'month':
+        return (period + timedelta(days=32)).replace(day=1)
+    if granularity == 'year':
+        return period.replace(year=period.year + 1)
+    return period + timedelta(days=1)
+
+
+class TransactionViewSet(AtomicWritesMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing transactions.
     Supports CRUD operations, filtering, searching, and ordering.
+    Create also accepts an array body to add a batch in one request.
     """
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, TransactionSearchFilter, TransactionOrderingFilter]
     filterset_class = TransactionFilter
-    search_fields = ['merchant', 'category', 'notes']
-    ordering_fields = ['date', 'amount', 'created_at']
+    search_fields = ['merchant', 'category__name', 'notes']
+    ordering_fields = ['date', 'amount', 'created_at', 'search_rank']
     ordering = ['-date', '-created_at']
+    import_batch_size = 1000
+    max_import_batch_size = 5000
 
     def get_queryset(self):
         """Return transactions for the authenticated user only"""
-        return Transaction.objects.filter(user=self.request.user)
+        return Transaction.objects.for_user(self.request.user).with_related()
 
     def get_serializer_class(self):
         """Use lightweight serializer for list view"""
@@ -36,21 +107,44 @@ class TransactionViewSet(viewsets.ModelViewSet):
             return TransactionListSerializer
         return TransactionSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        """Treat an array body on create as a batch of transactions"""
+        if self.action == 'create' and isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
     def perform_create(self, serializer):
-        """Automatically set the user when creating a transaction"""
-        serializer.save(user=self.request.user)
+        """
+        Automatically set the user when creating a transaction, and the
+        category from the user's rules when none was sent
+        """
+        if isinstance(serializer, ListSerializer):
+            # The batch serializer applies the rules itself
+            serializer.save(user=self.request.user)
+            return
+
+        extra = {}
+        if 'category' not in serializer.validated_data:
+            category_id = get_matcher(self.request.user.id).match(
+                serializer.validated_data.get('merchant'),
+                serializer.validated_data.get('amount')
+            )
+            if category_id is not None:
+                extra['category_id'] = category_id
+        serializer.save(user=self.request.user, **extra)
 
     def perform_update(self, serializer):
         """Ensure user ownership on update"""
         serializer.save(user=self.request.user)
 
     @action(detail=False, methods=['get'])
+    @cached_response('transactions.stats')
     def stats(self, request):
         """
         Get transaction statistics for the authenticated user.
         Optional query params: start_date, end_date
         """
-        queryset = self.get_queryset()
+        queryset = DailyTransactionRollup.objects.filter(user=request.user)
 
         # Apply date filters if provided
         start_date = request.query_params.get('start_date')
@@ -61,35 +155,32 @@ class TransactionViewSet(viewsets.ModelViewSet):
         if end_date:
             queryset = queryset.filter(date__lte=end_date)
 
-        # Calculate totals
-        income_total = queryset.filter(type='income').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
-
-        expense_total = queryset.filter(type='expense').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
-
-        # Category breakdown
-        category_breakdown = {}
-        for transaction_type in ['income', 'expense']:
-            categories = queryset.filter(type=transaction_type).values('category').annotate(
-                total=Sum('amount'),
-                count=Count('id')
-            )
-            category_breakdown[transaction_type] = {
-                cat['category']: {
-                    'total': float(cat['total']),
-                    'count': cat['count']
-                }
-                for cat in categories
+        # Totals in one pass using conditional aggregation
+        totals = queryset.aggregate(
+            income=Sum('total', filter=Q(type='income')),
+            expense=Sum('total', filter=Q(type='expense')),
+            count=Sum('count')
+        )
+        income_total = totals['income'] or Decimal('0.00')
+        expense_total = totals['expense'] or Decimal('0.00')
+
+        # Category breakdown for both types in one grouped query
+        category_breakdown = {'income': {}, 'expense': {}}
+        categories = queryset.values('type', 'category').annotate(
+            total=Sum('total'),
+            count=Sum('count')
+        )
+        for cat in categories:
+            category_breakdown[cat['type']][cat['category']] = {
+                'total': float(cat['total']),
+                'count': cat['count']
             }
 
         stats_data = {
             'total_income': income_total,
             'total_expenses': expense_total,
             'balance': income_total - expense_total,
-            'transaction_count': queryset.count(),
+            'transaction_count': totals['count'] or 0,
             'category_breakdown': category_breakdown
         }
 
@@ -110,13 +201,112 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        deleted_count = self.get_queryset().filter(id__in=ids).delete()[0]
+        queryset = self.get_queryset().filter(id__in=ids)
+
+        # Update rollups and tombstones once for the whole batch instead of once per row
+        with db_transaction.atomic():
+            deltas = grouped_deltas(queryset, sign=-1)
+            record_deletes('transaction', queryset.values_list('id', 'user_id'))
+            with defer_row_signals():
+                deleted_count = queryset.delete()[0]
+            transactions_changed.send(sender=Transaction, deltas=deltas)
 
         return Response(
             {'message': f'{deleted_count} transactions deleted successfully'},
             status=status.HTTP_200_OK
         )
 
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        """
+        Apply one change to many transactions with a single UPDATE.
+        Targets are the given ids, the transactions matching the list
+        filters in the query string (start_date, category, search, ...),
+        or the ids that also match those filters when both are given.
+        Expected payload: {"ids": [1, 2, 3], "category": 4, "type": "expense",
+        "notes": "...", "date_shift": -1}; every change field is optional
+        but at least one is required.
+        """
+        serializer = TransactionBulkUpdateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        filter_params = set(self.filterset_class.base_filters) | {TransactionSearchFilter.search_param}
+        ids = data.get('ids')
+        if ids is None and not filter_params & set(request.query_params):
+            return Response(
+                {'error': 'Provide transaction IDs or at least one filter'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+
+        updated = bulk_update_transactions(
+            queryset,
+            {field: data[field] for field in ('category', 'type', 'notes') if field in data},
+            date_shift=data.get('date_shift', 0)
+        )
+
+        return Response(
+            {
+                'updated': updated,
+                'skipped': len(set(ids)) - updated if ids is not None else 0
+            },
+            status=status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def bulk_import(self, request):
+        """
+        Import many transactions in one request.
+        Accepts a JSON array (or {"transactions": [...]}) of objects with
+        date, merchant, category (id or name), type, amount and notes, or a
+        CSV upload in the `file` field using the export column layout.
+        Rows without a category get one from the user's categorization rules.
+        Valid rows are inserted; invalid rows are reported by position.
+        Optional query param: batch_size
+        """
+        if 'file' in request.FILES:
+            try:
+                rows = TransactionImporter.read_csv(request.FILES['file'])
+            except ValueError as exc:
+                return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            rows = request.data
+            if isinstance(rows, dict):
+                rows = rows.get('transactions')
+
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {'error': 'No transactions provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            batch_size = int(request.query_params.get('batch_size', self.import_batch_size))
+        except ValueError:
+            return Response(
+                {'error': 'batch_size must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        batch_size = min(max(batch_size, 1), self.max_import_batch_size)
+
+        transactions, errors = TransactionImporter(request.user).validate(rows)
+        categorize(transactions)
+        if transactions:
+            bulk_create_transactions(transactions, batch_size=batch_size)
+
+        return Response(
+            {
+                'created': len(transactions),
+                'failed': len(errors),
+                'errors': errors
+            },
+            status=status.HTTP_201_CREATED if transactions else status.HTTP_400_BAD_REQUEST
+        )
+
     @action(detail=False, methods=['get'])
     def categories(self, request):
         """Get list of available categories"""
@@ -127,6 +317,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return Response(categories)
 
     @action(detail=False, methods=['get'])
+    @cached_response('transactions.recent')
     def recent(self, request):
         """Get recent transactions (last 10)"""
         recent_transactions = self.get_queryset()[:10]
@@ -134,31 +325,69 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @cached_response('transactions.trends')
     def trends(self, request):
         """
-        Get daily spending trends.
+        Get income and expense totals per period, zero-filled.
+        Optional query params: start_date, end_date (default: last 30 days),
+        granularity (day, week, month or year; default: day)
         """
-        from django.db.models.functions import TruncDate
-
-        queryset = self.get_queryset()
-        
-        # Default to last 30 days if no date range provided
-        # (Logic can be enhanced to support custom ranges)
-        
-        trends = queryset.annotate(
-            date_only=TruncDate('date')
-        ).values('date_only').annotate(
-            income=Sum('amount', filter=Q(type='income')),
-            expense=Sum('amount', filter=Q(type='expense'))
-        ).order_by('date_only')
-
-        # Format for frontend
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in TREND_TRUNCATIONS:
+            return Response(
+                {'error': f"granularity must be one of: {', '.join(TREND_TRUNCATIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            end_date = request.query_params.get('end_date')
+            end_date = parse_date(end_date) if end_date else timezone.localdate()
+            start_date = request.query_params.get('start_date')
+            start_date = parse_date(start_date) if start_date else end_date - timedelta(days=29)
+        except (TypeError, ValueError, OverflowError):
+            start_date = end_date = None
+
+        if not start_date or not end_date or start_date > end_date:
+            return Response(
+                {'error': 'start_date and end_date must be valid dates (YYYY-MM-DD) in order'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_periods = TREND_MAX_PERIODS[granularity]
+        if period_count(start_date, end_date, granularity) > max_periods:
+            return Response(
+                {'error': f'The range may span at most {max_periods} periods at {granularity} granularity'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Range scan on the (user, date) rollup index, grouped in the database
+        truncate = TREND_TRUNCATIONS[granularity]
+        totals = DailyTransactionRollup.objects.filter(
+            user=request.user,
+            date__gte=start_date,
+            date__lte=end_date
+        ).annotate(
+            period=truncate('date') if truncate else F('date')
+        ).values('period').annotate(
+            income=Sum('total', filter=Q(type='income')),
+            expense=Sum('total', filter=Q(type='expense'))
+        ).order_by()
+        totals = {entry['period']: entry for entry in totals}
+
+        # Fill empty periods while walking the range once, stopping at the
+        # last one so nothing is computed past date.max
         data = []
-        for entry in trends:
+        period = period_start(start_date, granularity)
+        last = period_start(end_date, granularity)
+        while True:
+            entry = totals.get(period, {})
             data.append({
-                'date': entry['date_only'],
-                'income': entry['income'] or 0,
-                'expense': entry['expense'] or 0
+                'date': period,
+                'income': entry.get('income') or Decimal('0.00'),
+                'expense': entry.get('expense') or Decimal('0.00')
             })
+            if period >= last:
+                break
+            period = next_period(period, granularity)
 
         return Response(data)
\ No newline at end of file
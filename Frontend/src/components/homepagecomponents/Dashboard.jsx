@@ -19,14 +19,10 @@ export function Dashboard() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [statsData, recentData, trendsData] = await Promise.all([
-          transactionService.getStats(),
-          transactionService.getRecent(),
-          transactionService.getTrends()
-        ]);
-        setStats(statsData);
-        setRecentTransactions(recentData);
-        setTrends(trendsData);
+        const dashboard = await transactionService.getDashboard();
+        setStats(dashboard.stats);
+        setRecentTransactions(dashboard.recent);
+        setTrends(dashboard.trends);
       } catch (error) {
         console.error("Failed to fetch dashboard data", error);
       } finally {
@@ -14,6 +14,8 @@ import categoryService from '../../services/category';
 
 export function Transactions() {
   const [transactions, setTransactions] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [categories, setCategories] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
   const [filterCategory, setFilterCategory] = useState('all');
@@ -35,10 +37,15 @@ export function Transactions() {
   });
 
   useEffect(() => {
-    fetchTransactions();
     fetchCategories();
   }, []);
 
+  // Filters, search and sorting run on the server, which pages the results
+  useEffect(() => {
+    const timer = setTimeout(fetchTransactions, searchQuery ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchQuery, filterCategory, filterType, sortBy, sortOrder]);
+
   const fetchCategories = async () => {
     try {
       const data = await categoryService.getAll();
@@ -48,10 +55,19 @@ export function Transactions() {
     }
   };
 
+  const listParams = () => {
+    const params = { ordering: `${sortOrder === 'desc' ? '-' : ''}${sortBy}` };
+    if (searchQuery.trim()) params.search = searchQuery.trim();
+    if (filterCategory !== 'all') params.category = filterCategory;
+    if (filterType !== 'all') params.type = filterType;
+    return params;
+  };
+
   const fetchTransactions = async () => {
     try {
-      const data = await transactionService.getAll();
-      setTransactions(data);
+      const data = await transactionService.getPage(listParams());
+      setTransactions(data.results);
+      setNextPage(data.next);
     } catch (error) {
       console.error("Failed to fetch transactions", error);
     } finally {
@@ -59,6 +75,20 @@ export function Transactions() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+      const data = await transactionService.getPageAt(nextPage);
+      setTransactions(current => [...current, ...data.results]);
+      setNextPage(data.next);
+    } catch (error) {
+      console.error("Failed to fetch transactions", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const resetForm = () => {
     setFormData({
       amount: '',
@@ -136,25 +166,6 @@ export function Transactions() {
     });
   };
 
-  // Filter and sort transactions
-  let filteredTransactions = transactions.filter(t => {
-    const categoryName = t.category_detail?.name || '';
-    const matchesSearch = t.merchant.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      categoryName.toLowerCase().includes(searchQuery.toLowerCase());
-    const matchesCategory = filterCategory === 'all' || t.category?.toString() === filterCategory;
-    const matchesType = filterType === 'all' || t.type === filterType;
-    return matchesSearch && matchesCategory && matchesType;
-  });
-
-  filteredTransactions.sort((a, b) => {
-    const multiplier = sortOrder === 'asc' ? 1 : -1;
-    if (sortBy === 'date') {
-      return multiplier * (new Date(a.date).getTime() - new Date(b.date).getTime());
-    } else {
-      return multiplier * (a.amount - b.amount);
-    }
-  });
-
   if (loading) return <div>Loading...</div>;
 
   return (
@@ -319,7 +330,7 @@ export function Transactions() {
               </TableRow>
             </TableHeader>
             <TableBody>
-              {filteredTransactions.map((transaction) => (
+              {transactions.map((transaction) => (
                 <TableRow key={transaction.id}>
                   <TableCell>{transaction.date}</TableCell>
                   <TableCell>{transaction.merchant}</TableCell>
@@ -438,11 +449,19 @@ export function Transactions() {
             </TableBody>
           </Table>
 
-          {filteredTransactions.length === 0 && (
+          {transactions.length === 0 && (
             <div className="text-center py-12">
               <p className="text-slate-500">No transactions found</p>
             </div>
           )}
+
+          {nextPage && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
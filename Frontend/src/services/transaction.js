@@ -2,11 +2,29 @@ import api from './api';
 
 const transactionService = {
     // CRUD Operations
-    getAll: async (params) => {
+    // One page of the cursor-paginated list: { next, previous, results }
+    getPage: async (params) => {
         const response = await api.get('/transactions/', { params });
         return response.data;
     },
 
+    // Follows a `next` or `previous` link from getPage
+    getPageAt: async (url) => {
+        const response = await api.get(url);
+        return response.data;
+    },
+
+    // Walks every page; only for views that need the full history at once
+    getAll: async (params) => {
+        let response = await api.get('/transactions/', { params });
+        const results = [...response.data.results];
+        while (response.data.next) {
+            response = await api.get(response.data.next);
+            results.push(...response.data.results);
+        }
+        return results;
+    },
+
     getById: async (id) => {
         const response = await api.get(`/transactions/${id}/`);
         return response.data;
@@ -17,6 +35,12 @@ const transactionService = {
         return response.data;
     },
 
+    // Up to 500 transactions in one request; all are created or none are
+    createMany: async (items) => {
+        const response = await api.post('/transactions/', items);
+        return response.data;
+    },
+
     update: async (id, data) => {
         const response = await api.put(`/transactions/${id}/`, data);
         return response.data;
@@ -43,6 +67,12 @@ const transactionService = {
         return response.data;
     },
 
+    // Stats, trends, recent, budgets, budget summary and report stats in one request
+    getDashboard: async (params) => {
+        const response = await api.get('/dashboard/', { params });
+        return response.data;
+    },
+
     getCategories: async () => {
         const response = await api.get('/transactions/categories/');
         return response.data;
@@ -51,6 +81,12 @@ const transactionService = {
     bulkDelete: async (ids) => {
         const response = await api.delete('/transactions/bulk_delete/', { data: { ids } });
         return response.data;
+    },
+
+    // changes: any of category, type, notes, date_shift; params: list filters used instead of ids
+    bulkUpdate: async (ids, changes, params) => {
+        const response = await api.patch('/transactions/bulk_update/', ids ? { ids, ...changes } : changes, { params });
+        return response.data;
     }
 };
 